@@ -0,0 +1,134 @@
+# task_manager/archive.py
+import gzip
+import json
+import os
+
+from indexes import TaskIdIndex
+from models import TaskPriority
+from storage import TaskEncoder, TaskDecoder
+
+
+class TaskArchive:
+    """Cold storage for completed tasks.
+
+    Tasks are written to gzip-compressed JSON-lines segments that are never
+    rewritten; every archive run appends a new segment. A small manifest keeps
+    precomputed counters so statistics never have to open a segment, and each
+    segment has a sorted list of its task ids next to it, so a lookup by id
+    or id prefix only decompresses the segment that holds the task.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self.manifest_path = os.path.join(archive_path, self.MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+        self._id_indexes = {}  # segment file -> TaskIdIndex, loaded on demand
+
+    def _empty_manifest(self):
+        return {
+            "segments": [],
+            "total": 0,
+            "by_priority": {priority.name: 0 for priority in TaskPriority},
+            "completed_by_day": {}
+        }
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return self._empty_manifest()
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def append(self, tasks):
+        """Write tasks to a new segment and fold them into the counters."""
+        if not tasks:
+            return None
+        os.makedirs(self.archive_path, exist_ok=True)
+        # Another process may have appended a segment since we last looked
+        self.manifest = self._load_manifest()
+
+        segment_name = f"segment-{len(self.manifest['segments']) + 1:05d}.jsonl.gz"
+        segment_path = os.path.join(self.archive_path, segment_name)
+        tmp_path = segment_path + ".tmp"
+        encoder = TaskEncoder()
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for task in tasks:
+                f.write(encoder.encode(task))
+                f.write("\n")
+        os.replace(tmp_path, segment_path)
+        ids_path = self._ids_path(segment_name)
+        with open(ids_path + ".tmp", 'w') as f:
+            f.writelines(task_id + "\n" for task_id in sorted(task.id for task in tasks))
+        os.replace(ids_path + ".tmp", ids_path)
+
+        by_priority = self.manifest["by_priority"]
+        completed_by_day = self.manifest["completed_by_day"]
+        for task in tasks:
+            by_priority[task.priority.name] += 1
+            if task.completed_at:
+                day = task.completed_at.date().isoformat()
+                completed_by_day[day] = completed_by_day.get(day, 0) + 1
+
+        self.manifest["segments"].append({"file": segment_name, "count": len(tasks)})
+        self.manifest["total"] += len(tasks)
+        self._write_manifest()
+        return segment_name
+
+    def _ids_path(self, segment_name):
+        return os.path.join(self.archive_path, segment_name.split(".")[0] + ".ids")
+
+    def _iter_segment(self, segment):
+        segment_path = os.path.join(self.archive_path, segment["file"])
+        with gzip.open(segment_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line, cls=TaskDecoder)
+
+    def _segment_ids(self, segment):
+        index = self._id_indexes.get(segment["file"])
+        if index is None:
+            index = TaskIdIndex()
+            ids_path = self._ids_path(segment["file"])
+            if os.path.exists(ids_path):
+                with open(ids_path, 'r') as f:
+                    index.ids = [line.rstrip("\n") for line in f if line.strip()]
+            else:
+                # Segments written before id lists existed are read once instead
+                index.rebuild(self._iter_segment(segment))
+            self._id_indexes[segment["file"]] = index
+        return index
+
+    def iter_tasks(self):
+        """Yield archived tasks one segment at a time."""
+        for segment in self.manifest["segments"]:
+            yield from self._iter_segment(segment)
+
+    def find_ids(self, prefix, limit=None):
+        """Return archived task ids starting with prefix, sorted, at most ``limit`` of them."""
+        matches = []
+        for segment in self.manifest["segments"]:
+            matches.extend(self._segment_ids(segment).find(prefix, limit))
+        return sorted(matches)[:limit]
+
+    def get_task(self, task_id):
+        """Return the archived task with this id, or None."""
+        for segment in self.manifest["segments"]:
+            if self._segment_ids(segment).find(task_id, 1) == [task_id]:
+                for task in self._iter_segment(segment):
+                    if task.id == task_id:
+                        return task
+        return None
+
+    def get_statistics(self):
+        return {
+            "total": self.manifest["total"],
+            "by_priority": dict(self.manifest["by_priority"]),
+            "completed_by_day": dict(self.manifest["completed_by_day"])
+        }
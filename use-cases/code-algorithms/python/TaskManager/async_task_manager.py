@@ -0,0 +1,193 @@
+# task_manager/async_task_manager.py
+import asyncio
+import queue
+import threading
+import time
+
+from task_manager import TaskManager
+
+
+class AsyncTaskManager:
+    """Awaitable TaskManager for asyncio code.
+
+    Every call runs on one dedicated writer thread, so storage I/O never blocks
+    the event loop and the storage is only ever used from a single thread.
+    Mutations that arrive within ``commit_window`` seconds of each other are
+    run inside one storage transaction and therefore written in one commit.
+
+    At most ``max_pending`` calls may be waiting for the writer; further calls
+    wait (without blocking the loop) until earlier ones complete. Use one
+    AsyncTaskManager from a single event loop.
+    """
+
+    def __init__(self, storage_path="tasks.json", storage=None, task_manager=None,
+                 commit_window=0.002, max_batch=256, max_pending=1024):
+        self.task_manager = task_manager or TaskManager(storage_path, storage=storage)
+        self.commit_window = commit_window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._slots = asyncio.Semaphore(max_pending)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run_writer, name="task-writer", daemon=True)
+        self._thread.start()
+
+    # Writer thread
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        # Reads are answered straight away; a write waits briefly for company
+        if first[1]:
+            deadline = time.monotonic() + self.commit_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                batch.append(item)
+        return batch
+
+    def _run_writer(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            results = []
+            try:
+                with self.task_manager.storage.transaction():
+                    for call, _, loop, future in batch:
+                        try:
+                            results.append((call(), None))
+                        except Exception as e:
+                            results.append((None, e))
+            except Exception as e:
+                # The commit itself failed, so none of the batch was written
+                results = [(None, e)] * len(batch)
+            for (_, _, loop, future), (result, error) in zip(batch, results):
+                try:
+                    loop.call_soon_threadsafe(self._resolve, future, result, error)
+                except RuntimeError:
+                    pass  # the event loop has been closed
+
+    # Event loop side
+
+    def _resolve(self, future, result, error):
+        self._slots.release()
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def _submit(self, call, write):
+        if self._closed:
+            raise RuntimeError("AsyncTaskManager is closed")
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((call, write, loop, future))
+        return await future
+
+    def _write(self, method, *args, **kwargs):
+        return self._submit(lambda: method(*args, **kwargs), True)
+
+    def _read(self, method, *args, **kwargs):
+        return self._submit(lambda: method(*args, **kwargs), False)
+
+    def run(self, function, *args, write=False):
+        """Await ``function(*args)`` run on the writer thread.
+
+        Use this for anything that reads or changes ``task_manager`` or its
+        storage directly; pass ``write=True`` if it changes tasks.
+        """
+        return self._submit(lambda: function(*args), write)
+
+    async def close(self):
+        """Finish every queued call, then stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # TaskManager methods
+
+    def create_task(self, title, description="", priority_value=2, due_date_str=None, tags=None):
+        return self._write(self.task_manager.create_task, title, description, priority_value,
+                           due_date_str, tags)
+
+    def list_tasks(self, status_filter=None, priority_filter=None, show_overdue=False,
+                   include_archived=False):
+        return self._read(self.task_manager.list_tasks, status_filter, priority_filter,
+                          show_overdue, include_archived)
+
+    def iter_tasks(self, status_filter=None, priority_filter=None, show_overdue=False,
+                   include_archived=False):
+        # A generator cannot leave the writer thread, so this returns a list
+        return self._read(lambda: list(self.task_manager.iter_tasks(
+            status_filter, priority_filter, show_overdue, include_archived)))
+
+    def list_tasks_page(self, cursor=None, limit=50, status_filter=None, priority_filter=None):
+        return self._read(self.task_manager.list_tasks_page, cursor, limit, status_filter,
+                          priority_filter)
+
+    def search(self, query, status_filter=None, priority_filter=None, limit=None):
+        return self._read(self.task_manager.search, query, status_filter, priority_filter, limit)
+
+    def get_due_calendar(self, start=None, days=30):
+        return self._read(self.task_manager.get_due_calendar, start, days)
+
+    def get_top_priority_tasks(self, limit=5):
+        return self._read(self.task_manager.get_top_priority_tasks, limit)
+
+    def update_task_status(self, task_id, new_status_value):
+        return self._write(self.task_manager.update_task_status, task_id, new_status_value)
+
+    def update_task_priority(self, task_id, new_priority_value):
+        return self._write(self.task_manager.update_task_priority, task_id, new_priority_value)
+
+    def update_task_due_date(self, task_id, due_date_str):
+        return self._write(self.task_manager.update_task_due_date, task_id, due_date_str)
+
+    def delete_task(self, task_id):
+        return self._write(self.task_manager.delete_task, task_id)
+
+    def resolve_task_id(self, task_id_prefix):
+        return self._read(self.task_manager.resolve_task_id, task_id_prefix)
+
+    def get_task_details(self, task_id):
+        return self._read(self.task_manager.get_task_details, task_id)
+
+    def add_tag_to_task(self, task_id, tag):
+        return self._write(self.task_manager.add_tag_to_task, task_id, tag)
+
+    def remove_tag_from_task(self, task_id, tag):
+        return self._write(self.task_manager.remove_tag_from_task, task_id, tag)
+
+    def archive_completed_tasks(self, older_than_days=30):
+        return self._write(self.task_manager.archive_completed_tasks, older_than_days)
+
+    def bulk_update(self, query, **changes):
+        return self._write(self.task_manager.bulk_update, query, **changes)
+
+    def bulk_add_tag(self, query, tag):
+        return self._write(self.task_manager.bulk_add_tag, query, tag)
+
+    def bulk_delete(self, query):
+        return self._write(self.task_manager.bulk_delete, query)
+
+    def get_statistics(self):
+        return self._read(self.task_manager.get_statistics)
@@ -1,87 +1,209 @@
 # task_manager/cli.py
+# Only argparse is imported up front: every run pays for module imports and
+# parser construction before it does any work, so the storage stack is
+# imported once the command is known and only the chosen subparser is built.
 import argparse
-from datetime import datetime
+import sys
 
-from task_manager import TaskManager
-from models import TaskStatus, TaskPriority
+import instrumentation
 
 
-def format_task(task):
-    status_symbol = {
-        TaskStatus.TODO: "[ ]",
-        TaskStatus.IN_PROGRESS: "[>]",
-        TaskStatus.REVIEW: "[?]",
-        TaskStatus.DONE: "[✓]"
-    }
+STATUS_CHOICES = ["todo", "in_progress", "review", "done"]
+PRIORITY_CHOICES = [1, 2, 3, 4]
+# The keys of renderers.RENDERERS, listed here so parsing does not import it
+FORMAT_CHOICES = ["table", "jsonl", "csv"]
+
+# The task filters shared by list and the bulk commands
+FILTER_ARGUMENTS = [
+    (("-s", "--status"), {"help": "Filter by status", "choices": STATUS_CHOICES}),
+    (("-p", "--priority"), {"help": "Filter by priority", "type": int, "choices": PRIORITY_CHOICES}),
+    (("-o", "--overdue"), {"help": "Show only overdue tasks", "action": "store_true"}),
+]
+
+# Options given before the command, for finding out where a run spends its time
+GLOBAL_ARGUMENTS = [
+    (("--profile",), {"help": "Print phase timings and counters to stderr", "action": "store_true"}),
+    (("--trace",), {"metavar": "FILE", "help": "Write phase timings as a JSON trace"}),
+    (("--cprofile",), {"metavar": "FILE", "help": "Run under cProfile and save its stats (.prof)"}),
+]
+GLOBAL_OPTIONS_WITH_VALUES = {"--trace", "--cprofile"}
+
+# Command name -> (help, [(flags, add_argument options), ...])
+COMMANDS = {
+    "create": ("Create a new task", [
+        (("title",), {"help": "Task title"}),
+        (("-d", "--description"), {"help": "Task description", "default": ""}),
+        (("-p", "--priority"), {"help": "Task priority (1-4)", "type": int, "choices": PRIORITY_CHOICES, "default": 2}),
+        (("-u", "--due"), {"help": "Due date (YYYY-MM-DD)", "default": None}),
+        (("-t", "--tags"), {"help": "Comma-separated tags", "default": ""}),
+    ]),
+    "list": ("List all tasks", FILTER_ARGUMENTS + [
+        (("-a", "--include-archived"), {"help": "Include archived tasks", "action": "store_true"}),
+        (("-f", "--format"), {"help": "Output format", "choices": FORMAT_CHOICES, "default": "table"}),
+    ]),
+    "search": ("Search task titles and descriptions", [
+        (("query",), {"help": "Search terms; end a term with * to match it as a prefix"}),
+        (("-s", "--status"), {"help": "Filter by status", "choices": STATUS_CHOICES}),
+        (("-p", "--priority"), {"help": "Filter by priority", "type": int, "choices": PRIORITY_CHOICES}),
+        (("-n", "--limit"), {"help": "Maximum number of results", "type": int, "default": 20}),
+        (("-f", "--format"), {"help": "Output format", "choices": FORMAT_CHOICES, "default": "table"}),
+    ]),
+
+    # Update task commands
+    "status": ("Update task status", [
+        (("task_id",), {"help": "Task ID"}),
+        (("status",), {"help": "New status", "choices": STATUS_CHOICES}),
+    ]),
+    "priority": ("Update task priority", [
+        (("task_id",), {"help": "Task ID"}),
+        (("priority",), {"help": "New priority", "type": int, "choices": PRIORITY_CHOICES}),
+    ]),
+    "due": ("Update task due date", [
+        (("task_id",), {"help": "Task ID"}),
+        (("due_date",), {"help": "New due date (YYYY-MM-DD)"}),
+    ]),
+
+    # Bulk commands apply to every task matching the filters, in one write
+    "bulk-update": ("Update all tasks matching the filters", FILTER_ARGUMENTS + [
+        (("--set-status",), {"help": "New status", "choices": STATUS_CHOICES}),
+        (("--set-priority",), {"help": "New priority", "type": int, "choices": PRIORITY_CHOICES}),
+        (("--set-due",), {"help": "New due date (YYYY-MM-DD)"}),
+    ]),
+    "bulk-tag": ("Add a tag to all tasks matching the filters", [
+        (("tag",), {"help": "Tag to add"}),
+    ] + FILTER_ARGUMENTS),
+    "bulk-delete": ("Delete all tasks matching the filters", FILTER_ARGUMENTS + [
+        (("--all",), {"help": "Allow deleting every task when no filter is given", "action": "store_true"}),
+    ]),
 
-    priority_symbol = {
-        TaskPriority.LOW: "!",
-        TaskPriority.MEDIUM: "!!",
-        TaskPriority.HIGH: "!!!",
-        TaskPriority.URGENT: "!!!!"
+    # Tag management
+    "tag": ("Add tag to task", [
+        (("task_id",), {"help": "Task ID"}),
+        (("tag",), {"help": "Tag to add"}),
+    ]),
+    "untag": ("Remove tag from task", [
+        (("task_id",), {"help": "Task ID"}),
+        (("tag",), {"help": "Tag to remove"}),
+    ]),
+
+    # Other commands
+    "show": ("Show task details", [
+        (("task_id",), {"help": "Task ID"}),
+    ]),
+    "delete": ("Delete a task", [
+        (("task_id",), {"help": "Task ID"}),
+    ]),
+    "stats": ("Show task statistics", []),
+    "calendar": ("Show how many open tasks are due each day", [
+        (("--start",), {"help": "First day (YYYY-MM-DD), default today"}),
+        (("--days",), {"help": "Number of days to show", "type": int, "default": 30}),
+    ]),
+    "archive": ("Archive completed tasks", [
+        (("--days",), {"help": "Archive tasks completed more than this many days ago", "type": int, "default": 30}),
+    ]),
+    "migrate": ("Copy all tasks to another storage format", [
+        (("--from",), {"dest": "source", "help": "Source file (.json, .jsonl, .jsonl.gz or .db)", "default": "tasks.json"}),
+        (("--to",), {"dest": "destination", "help": "Destination file (.json, .jsonl, .jsonl.gz or .db)", "required": True}),
+        (("--batch-size",), {"help": "Tasks written per batch", "type": int, "default": 1000}),
+        (("--restart",), {"help": "Start over instead of resuming", "action": "store_true"}),
+    ]),
+}
+
+
+def filter_query(args):
+    return {
+        "status_filter": args.status,
+        "priority_filter": args.priority,
+        "show_overdue": args.overdue
     }
 
-    due_str = f"Due: {task.due_date.strftime('%Y-%m-%d')}" if task.due_date else "No due date"
-    tags_str = f"Tags: {', '.join(task.tags)}" if task.tags else "No tags"
 
-    return (
-        f"{status_symbol[task.status]} {task.id[:8]} - {priority_symbol[task.priority]} {task.title}\n"
-        f"  {task.description}\n"
-        f"  {due_str} | {tags_str}\n"
-        f"  Created: {task.created_at.strftime('%Y-%m-%d %H:%M')}"
-    )
+def find_command(argv):
+    """Return the command name in argv: its first argument that is not a global option."""
+    arguments = iter(argv)
+    for arg in arguments:
+        if arg in GLOBAL_OPTIONS_WITH_VALUES:
+            next(arguments, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
 
-def main():
-    parser = argparse.ArgumentParser(description="Task Manager CLI")
-    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
-    # Create task command
-    create_parser = subparsers.add_parser("create", help="Create a new task")
-    create_parser.add_argument("title", help="Task title")
-    create_parser.add_argument("-d", "--description", help="Task description", default="")
-    create_parser.add_argument("-p", "--priority", help="Task priority (1-4)", type=int, choices=[1, 2, 3, 4], default=2)
-    create_parser.add_argument("-u", "--due", help="Due date (YYYY-MM-DD)", default=None)
-    create_parser.add_argument("-t", "--tags", help="Comma-separated tags", default="")
+def build_parser(argv=None):
+    """Build the parser, with a subparser only for the command argv selects.
 
-    # List tasks command
-    list_parser = subparsers.add_parser("list", help="List all tasks")
-    list_parser.add_argument("-s", "--status", help="Filter by status", choices=["todo", "in_progress", "review", "done"])
-    list_parser.add_argument("-p", "--priority", help="Filter by priority", type=int, choices=[1, 2, 3, 4])
-    list_parser.add_argument("-o", "--overdue", help="Show only overdue tasks", action="store_true")
+    Without a known command (no arguments, --help or a typo) every command is
+    added, so the help and error messages list them all as before.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    command = find_command(argv)
+    names = [command] if command in COMMANDS else list(COMMANDS)
+    parser = argparse.ArgumentParser(description="Task Manager CLI")
+    for flags, options in GLOBAL_ARGUMENTS:
+        parser.add_argument(*flags, **options)
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+    for name in names:
+        help_text, arguments = COMMANDS[name]
+        subparser = subparsers.add_parser(name, help=help_text)
+        for flags, options in arguments:
+            subparser.add_argument(*flags, **options)
+    return parser
 
-    # Update task commands
-    update_status_parser = subparsers.add_parser("status", help="Update task status")
-    update_status_parser.add_argument("task_id", help="Task ID")
-    update_status_parser.add_argument("status", help="New status", choices=["todo", "in_progress", "review", "done"])
 
-    update_priority_parser = subparsers.add_parser("priority", help="Update task priority")
-    update_priority_parser.add_argument("task_id", help="Task ID")
-    update_priority_parser.add_argument("priority", help="New priority", type=int, choices=[1, 2, 3, 4])
+def render(lines):
+    """Write output lines through renderers.write_lines; returns the number written."""
+    from renderers import write_lines
+    with instrumentation.phase("cli.render"):
+        written = write_lines(lines)
+    instrumentation.count("lines_rendered", written)
+    return written
 
-    update_due_parser = subparsers.add_parser("due", help="Update task due date")
-    update_due_parser.add_argument("task_id", help="Task ID")
-    update_due_parser.add_argument("due_date", help="New due date (YYYY-MM-DD)")
 
-    # Tag management
-    add_tag_parser = subparsers.add_parser("tag", help="Add tag to task")
-    add_tag_parser.add_argument("task_id", help="Task ID")
-    add_tag_parser.add_argument("tag", help="Tag to add")
+def main(argv=None):
+    parser = build_parser(argv)
+    args = parser.parse_args(argv)
+    if args.profile or args.trace or args.cprofile:
+        instrumentation.start(args.profile, args.trace, args.cprofile)
+    try:
+        with instrumentation.phase(f"cli.{args.command}"):
+            run_command(args, parser)
+    except ValueError as e:
+        # Imported only now: storage is loaded by the time it can raise this
+        from storage import ArchivedTaskError
+        if not isinstance(e, ArchivedTaskError):
+            raise
+        print(e)
+    finally:
+        instrumentation.finish()
 
-    remove_tag_parser = subparsers.add_parser("untag", help="Remove tag from task")
-    remove_tag_parser.add_argument("task_id", help="Task ID")
-    remove_tag_parser.add_argument("tag", help="Tag to remove")
 
-    # Other commands
-    show_parser = subparsers.add_parser("show", help="Show task details")
-    show_parser.add_argument("task_id", help="Task ID")
+def run_command(args, parser):
+    # Migration streams the files itself; loading the store first would defeat that
+    if args.command == "migrate":
+        from migrate import MigrationError, migrate
+        try:
+            count = migrate(args.source, args.destination, args.batch_size, args.restart)
+        except (MigrationError, OSError) as e:
+            print(f"\nMigration failed: {e}")
+            return
+        print(f"\nMigrated and verified {count} tasks from {args.source} to {args.destination}")
+        return
 
-    delete_parser = subparsers.add_parser("delete", help="Delete a task")
-    delete_parser.add_argument("task_id", help="Task ID")
+    if args.command is None:
+        parser.print_help()
+        return
 
-    stats_parser = subparsers.add_parser("stats", help="Show task statistics")
+    with instrumentation.phase("cli.open_storage"):
+        from task_manager import TaskManager
+        task_manager = TaskManager()
 
-    args = parser.parse_args()
-    task_manager = TaskManager()
+    # Accept any unique prefix of a task id, such as the 8 characters `list` shows
+    if getattr(args, "task_id", None):
+        try:
+            args.task_id = task_manager.resolve_task_id(args.task_id) or args.task_id
+        except ValueError as e:
+            print(e)
+            return
 
     if args.command == "create":
         tags = [tag.strip() for tag in args.tags.split(",")] if args.tags else []
@@ -96,14 +218,21 @@ def main():
             print(f"Created task with ID: {task_id}")
 
     elif args.command == "list":
-        tasks = task_manager.list_tasks(args.status, args.priority, args.overdue)
-        if tasks:
-            for task in tasks:
-                print(format_task(task))
-                print("-" * 50)
-        else:
+        from renderers import RENDERERS
+        # Tasks are rendered as they are found, so output starts immediately
+        # (and cli.render includes filtering them)
+        tasks = task_manager.iter_tasks(args.status, args.priority, args.overdue, args.include_archived)
+        written = render(RENDERERS[args.format](tasks))
+        if not written and args.format == "table":
             print("No tasks found matching the criteria.")
 
+    elif args.command == "search":
+        from renderers import RENDERERS
+        tasks = task_manager.search(args.query, args.status, args.priority, args.limit)
+        written = render(RENDERERS[args.format](tasks))
+        if not written and args.format == "table":
+            print("No tasks found matching the search.")
+
     elif args.command == "status":
         if task_manager.update_task_status(args.task_id, args.status):
             print(f"Updated task status to {args.status}")
@@ -122,6 +251,35 @@ def main():
         else:
             print("Failed to update task due date. Task not found or invalid date.")
 
+    elif args.command == "bulk-update":
+        changes = {}
+        if args.set_status:
+            changes["status"] = args.set_status
+        if args.set_priority:
+            changes["priority"] = args.set_priority
+        if args.set_due:
+            changes["due_date"] = args.set_due
+        if not changes:
+            print("Nothing to update. Use --set-status, --set-priority or --set-due.")
+            return
+        try:
+            count = task_manager.bulk_update(filter_query(args), **changes)
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD")
+            return
+        print(f"Updated {count} tasks")
+
+    elif args.command == "bulk-tag":
+        count = task_manager.bulk_add_tag(filter_query(args), args.tag)
+        print(f"Added tag '{args.tag}' to {count} tasks")
+
+    elif args.command == "bulk-delete":
+        if not (args.status or args.priority or args.overdue or args.all):
+            print("Refusing to delete every task. Add a filter or pass --all.")
+            return
+        count = task_manager.bulk_delete(filter_query(args))
+        print(f"Deleted {count} tasks")
+
     elif args.command == "tag":
         if task_manager.add_tag_to_task(args.task_id, args.tag):
             print(f"Added tag '{args.tag}' to task")
@@ -135,6 +293,7 @@ def main():
             print("Failed to remove tag. Task or tag not found.")
 
     elif args.command == "show":
+        from renderers import format_task
         task = task_manager.get_task_details(args.task_id)
         if task:
             print(format_task(task))
@@ -158,9 +317,26 @@ def main():
             print(f"  {priority}: {count}")
         print(f"Overdue tasks: {stats['overdue']}")
         print(f"Completed in last 7 days: {stats['completed_last_week']}")
+        if stats['by_tag']:
+            print(f"Top tags (open tasks):")
+            for tag, count in stats['by_tag'].items():
+                print(f"  {tag}: {count}")
 
-    else:
-        parser.print_help()
+    elif args.command == "calendar":
+        try:
+            calendar = task_manager.get_due_calendar(args.start, args.days)
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD")
+            return
+        render(
+            f"{day.isoformat()} {day.strftime('%a')} {entry['count']:4d}  "
+            f"{' '.join(task_id[:8] for task_id in entry['task_ids'])}".rstrip()
+            for day, entry in calendar.items()
+        )
+
+    elif args.command == "archive":
+        count = task_manager.archive_completed_tasks(args.days)
+        print(f"Archived {count} completed tasks")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
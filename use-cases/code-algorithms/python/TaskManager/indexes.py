@@ -0,0 +1,625 @@
+# task_manager/indexes.py
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+
+from models import TaskPriority, TaskStatus
+
+
+class TaskIdIndex:
+    """Sorted task ids, so a short id prefix resolves with a binary search.
+
+    Like every index here it is kept current by TaskStorage: ``rebuild`` after
+    a full load and ``on_change`` for each committed change.
+    """
+
+    def __init__(self):
+        self.ids = []
+
+    def rebuild(self, tasks):
+        self.ids = sorted(task.id for task in tasks)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def copy(self):
+        index = TaskIdIndex()
+        index.ids = list(self.ids)
+        return index
+
+    def add(self, task_id):
+        i = bisect_left(self.ids, task_id)
+        if i == len(self.ids) or self.ids[i] != task_id:
+            self.ids.insert(i, task_id)
+
+    def remove(self, task_id):
+        i = bisect_left(self.ids, task_id)
+        if i < len(self.ids) and self.ids[i] == task_id:
+            del self.ids[i]
+
+    def find(self, prefix, limit=None):
+        """Return ids starting with prefix, in sorted order, at most ``limit`` of them."""
+        matches = []
+        i = bisect_left(self.ids, prefix)
+        while i < len(self.ids) and self.ids[i].startswith(prefix):
+            if limit is not None and len(matches) >= limit:
+                break
+            matches.append(self.ids[i])
+            i += 1
+        return matches
+
+    def iter_after(self, task_id=None):
+        """Yield ids in sorted order, starting after ``task_id`` (from the start if None)."""
+        ids = self.ids
+        i = bisect_right(ids, task_id) if task_id is not None else 0
+        while i < len(ids):
+            yield ids[i]
+            i += 1
+
+    def on_change(self, op, task, changes):
+        if op == "put":
+            self.add(task.id)
+        elif op == "delete":
+            self.remove(task.id)
+
+
+class TextIndex:
+    """Inverted index over task titles and descriptions.
+
+    Each term maps to a posting dict of ``{task_id: term frequency}``, and the
+    vocabulary is kept sorted so ``term*`` prefix queries are a binary search.
+    Results are ranked with BM25; a prefix term scores as its best-matching
+    completion.
+
+    Postings are also kept in impact order for top-k queries: ``impacts``
+    maps a term to ``{term frequency: task ids sorted by (length, id)}``.
+    For a given frequency a shorter task always has the higher BM25 weight,
+    whatever the average length, so merging a term's lists yields its
+    postings best first. ``search`` with a limit reads those streams with the
+    threshold algorithm and stops once no unread task can make the top k,
+    instead of scoring every match.
+    """
+
+    FIELDS = ("title", "description")
+    TOKEN_PATTERN = re.compile(r"\w+")
+    K1 = 1.2
+    B = 0.75
+    # Most postings a top-k search reads from one stream at a time
+    READ_BLOCK = 64
+
+    def __init__(self):
+        self.postings = {}
+        self.impacts = {}
+        self.terms = []
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    @classmethod
+    def tokenize(cls, text):
+        return cls.TOKEN_PATTERN.findall(text.lower()) if text else []
+
+    def _task_tokens(self, task):
+        tokens = []
+        for field in self.FIELDS:
+            tokens.extend(self.tokenize(getattr(task, field)))
+        return tokens
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            frequencies = self._add_postings(task.id, self._task_tokens(task))
+            for term, frequency in frequencies.items():
+                self.impacts[term].setdefault(frequency, []).append(task.id)
+        self.terms = sorted(self.postings)
+        # Sorting each list once is much cheaper than inserting in order; the
+        # sort is stable, so sorting by id and then by length orders by both
+        length = self.doc_lengths.__getitem__
+        for by_frequency in self.impacts.values():
+            for task_ids in by_frequency.values():
+                task_ids.sort()
+                task_ids.sort(key=length)
+
+    def copy(self):
+        index = TextIndex()
+        index.postings = {term: dict(posting) for term, posting in self.postings.items()}
+        index.impacts = {
+            term: {frequency: list(task_ids) for frequency, task_ids in by_frequency.items()}
+            for term, by_frequency in self.impacts.items()
+        }
+        index.terms = list(self.terms)
+        index.doc_terms = dict(self.doc_terms)
+        index.doc_lengths = dict(self.doc_lengths)
+        index.total_length = self.total_length
+        return index
+
+    def _impact_key(self, task_id):
+        return self.doc_lengths[task_id], task_id
+
+    def _add_postings(self, task_id, tokens):
+        # Everything but the impact lists; returns {term: frequency}
+        frequencies = {}
+        for term in tokens:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, frequency in frequencies.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self.impacts[term] = {}
+            posting[task_id] = frequency
+        self.doc_terms[task_id] = tuple(frequencies)
+        self.doc_lengths[task_id] = len(tokens)
+        self.total_length += len(tokens)
+        return frequencies
+
+    def add(self, task_id, tokens):
+        self.remove(task_id)
+        frequencies = self._add_postings(task_id, tokens)
+        impact_key = self._impact_key
+        for term, frequency in frequencies.items():
+            by_frequency = self.impacts[term]
+            if not by_frequency:
+                insort(self.terms, term)
+            insort(by_frequency.setdefault(frequency, []), task_id, key=impact_key)
+
+    def remove(self, task_id):
+        # Postings are found from the task's own terms, not its current text
+        terms = self.doc_terms.pop(task_id, None)
+        if terms is None:
+            return
+        key = self._impact_key(task_id)
+        for term in terms:
+            posting = self.postings[term]
+            by_frequency = self.impacts[term]
+            frequency = posting.pop(task_id)
+            task_ids = by_frequency[frequency]
+            del task_ids[bisect_left(task_ids, key, key=self._impact_key)]
+            if not task_ids:
+                del by_frequency[frequency]
+            if not posting:
+                del self.postings[term]
+                del self.impacts[term]
+                del self.terms[bisect_left(self.terms, term)]
+        self.total_length -= self.doc_lengths.pop(task_id)
+
+    def on_change(self, op, task, changes):
+        if op == "put":
+            self.add(task.id, self._task_tokens(task))
+        elif op == "delete":
+            self.remove(task.id)
+        elif op == "patch" and any(field in changes for field in self.FIELDS):
+            self.add(task.id, self._task_tokens(task))
+
+    def _expand(self, term):
+        # "term*" matches every indexed term starting with "term"
+        if not term.endswith("*"):
+            return [term] if term in self.postings else []
+        prefix = term[:-1]
+        expanded = []
+        i = bisect_left(self.terms, prefix)
+        while i < len(self.terms) and self.terms[i].startswith(prefix):
+            expanded.append(self.terms[i])
+            i += 1
+        return expanded
+
+    def _length_norms(self):
+        """Return ``(base, slope)``: BM25 weighs a frequency ``f`` in a task of ``length`` tokens as
+        ``idf * f * (K1 + 1) / (f + base + slope * length)``."""
+        doc_count = len(self.doc_lengths)
+        average_length = (self.total_length / doc_count if doc_count else 0) or 1
+        return self.K1 * (1 - self.B), self.K1 * self.B / average_length
+
+    def _group(self, expanded):
+        """Return ``{term: (posting, idf)}`` for the completions of one query term."""
+        doc_count = len(self.doc_lengths)
+        group = {}
+        for term in expanded:
+            posting = self.postings[term]
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            group[term] = posting, idf
+        return group
+
+    def _score(self, task_id, groups, length_norm):
+        # Sum of each query term's best-matching completion, or None if one has no match
+        k1 = self.K1
+        score = 0.0
+        terms = None
+        for group in groups:
+            matches = group.values()
+            if len(group) > 1:
+                if terms is None:
+                    terms = self.doc_terms[task_id]
+                if len(terms) < len(group):
+                    matches = [group[term] for term in terms if term in group]
+            best = None
+            for posting, idf in matches:
+                frequency = posting.get(task_id)
+                if frequency is not None:
+                    weight = idf * frequency * (k1 + 1) / (frequency + length_norm)
+                    if best is None or weight > best:
+                        best = weight
+            if best is None:
+                return None
+            score += best
+        return score
+
+    def _stream(self, group, base, slope):
+        """Yield ``(-weight, first task_id, task_ids)`` blocks for a query term, best first.
+
+        Every task in a block has the same weight, and blocks of equal
+        weight come in id order. A task under several completions of a
+        prefix comes up once for each; the first time carries its best weight.
+        """
+        k1 = self.K1
+        length_of = self.doc_lengths.__getitem__
+
+        def weight(idf, frequency, task_id):
+            return -(idf * frequency * (k1 + 1) / (frequency + (base + slope * length_of(task_id))))
+
+        # One entry per impact list: (-weight, first task_id, start, task_ids, idf, frequency)
+        heap = [
+            (weight(idf, frequency, task_ids[0]), task_ids[0], 0, task_ids, idf, frequency)
+            for term, (_, idf) in group.items()
+            for frequency, task_ids in self.impacts[term].items()
+        ]
+        heapq.heapify(heap)
+        while heap:
+            head, first_id, start, task_ids, idf, frequency = heap[0]
+            # Tasks of one length share a weight and are adjacent; hand them out
+            # in blocks so they are filtered together rather than one at a time
+            end = bisect_right(task_ids, length_of(first_id), start,
+                               min(start + self.READ_BLOCK, len(task_ids)), key=length_of)
+            yield head, first_id, task_ids[start:end]
+            if end < len(task_ids):
+                heapq.heapreplace(heap, (weight(idf, frequency, task_ids[end]), task_ids[end], end,
+                                         task_ids, idf, frequency))
+            else:
+                heapq.heappop(heap)
+
+    def search(self, query, limit=None, accept=None):
+        """Return ``[(score, task_id)]`` for tasks matching every query term, best first.
+
+        ``accept`` is an optional predicate on task ids applied before scoring.
+        """
+        query_terms = []
+        for raw in query.split():
+            tokens = self.tokenize(raw)
+            if tokens and raw.endswith("*"):
+                tokens[-1] += "*"
+            query_terms.extend(tokens)
+        if not query_terms:
+            return []
+
+        groups = []
+        for term in query_terms:
+            expanded = self._expand(term)
+            if not expanded:
+                return []
+            groups.append(self._group(expanded))
+        # Scoring the rarest term first rejects most non-matching tasks at once
+        groups.sort(key=lambda group: sum(len(posting) for posting, _ in group.values()))
+        if limit is None:
+            return self._score_all(groups, accept)
+        return self._top(groups, limit, accept) if limit > 0 else []
+
+    def _score_all(self, groups, accept):
+        # Every query term must match; intersect starting from the rarest
+        candidates = None
+        for group in groups:
+            if len(group) == 1:
+                (posting, _), = group.values()
+                matches = posting.keys()
+            else:
+                matches = set().union(*(posting for posting, _ in group.values()))
+            if candidates is None:
+                candidates = set(matches)
+            else:
+                candidates.intersection_update(matches)
+            if not candidates:
+                return []
+        base, slope = self._length_norms()
+        doc_lengths = self.doc_lengths
+        ranked = [(self._score(task_id, groups, base + slope * doc_lengths[task_id]), task_id)
+                  for task_id in candidates if accept is None or accept(task_id)]
+        return sorted(ranked, key=lambda x: (-x[0], x[1]))
+
+    def _top(self, groups, limit, accept):
+        """The ``limit`` best matches, by the threshold algorithm over each term's stream.
+
+        Streams are read in turn, a block at a time, and every task read
+        that matches every term is scored in full. The sum of the weights at
+        the head of each stream bounds the score of any task not read yet,
+        so once the k-th best score beats it, no unread task can make the
+        top k.
+        """
+        base, slope = self._length_norms()
+        streams = [self._stream(group, base, slope) for group in groups]
+        heads = []
+        for stream in streams:
+            head = next(stream, None)
+            if head is None:
+                return []
+            heads.append(head)
+
+        # Tasks lacking a query term are dropped before they are scored: a
+        # word's posting, or a prefix's completions, must hold each task
+        filters = [(next(iter(group.values()))[0], None) if len(group) == 1 else (None, group.keys())
+                   for group in groups]
+        doc_terms = self.doc_terms
+        doc_lengths = self.doc_lengths
+        top = []  # (-score, task_id), best first, at most limit long
+        seen = set()
+        exhausted = False
+        while not exhausted:
+            if len(top) == limit:
+                threshold = -sum(head[0] for head in heads)
+                worst_score, worst_id = -top[-1][0], top[-1][1]
+                # An unread task only ties the bound by matching every head's
+                # weight, and equal weights come in id order within a stream
+                if worst_score > threshold or (worst_score == threshold
+                                               and worst_id < max(head[1] for head in heads)):
+                    break
+            for i, stream in enumerate(streams):
+                # Take about READ_BLOCK tasks from each stream per round, even
+                # where a prefix's completions come in many small blocks
+                task_ids = []
+                while len(task_ids) < self.READ_BLOCK:
+                    task_ids.extend(heads[i][2])
+                    head = next(stream, None)
+                    if head is None:
+                        # Every task matching this term is now read, so is every result
+                        exhausted = True
+                        break
+                    heads[i] = head
+                # Set operations keep the filtering in C; the order tasks are
+                # scored in does not matter
+                task_ids = set(task_ids) - seen
+                seen |= task_ids
+                for j, (posting, completions) in enumerate(filters):
+                    if j == i:
+                        continue
+                    if posting is not None:
+                        task_ids = posting.keys() & task_ids
+                    else:
+                        task_ids = {task_id for task_id in task_ids
+                                    if not completions.isdisjoint(doc_terms[task_id])}
+                for task_id in task_ids:
+                    if accept is None or accept(task_id):
+                        score = self._score(task_id, groups, base + slope * doc_lengths[task_id])
+                        if score is not None and (len(top) < limit or (-score, task_id) < top[-1]):
+                            insort(top, (-score, task_id))
+                            del top[limit:]
+                if exhausted:
+                    break
+        return [(-score, task_id) for score, task_id in top]
+
+
+class TaskCountsIndex:
+    """Running totals behind TaskManager.get_statistics.
+
+    Counts by status and priority are kept as plain counters, and completion
+    times are kept sorted so the number of tasks completed since any moment
+    is a binary search. Overdue counts come from DueCalendarIndex.
+    """
+
+    FIELDS = ("status", "priority", "completed_at")
+
+    def __init__(self):
+        self.by_status = {status: 0 for status in TaskStatus}
+        self.by_priority = {priority: 0 for priority in TaskPriority}
+        self.completed = []
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            self.by_status[task.status] += 1
+            self.by_priority[task.priority] += 1
+            if task.completed_at:
+                self.completed.append((task.completed_at, task.id))
+        self.completed.sort()
+
+    def copy(self):
+        index = TaskCountsIndex()
+        index.by_status = dict(self.by_status)
+        index.by_priority = dict(self.by_priority)
+        index.completed = list(self.completed)
+        return index
+
+    def _apply(self, task_id, status, priority, completed_at, delta):
+        self.by_status[status] += delta
+        self.by_priority[priority] += delta
+        if not completed_at:
+            return
+        entry = (completed_at, task_id)
+        if delta > 0:
+            insort(self.completed, entry)
+        else:
+            i = bisect_left(self.completed, entry)
+            if i < len(self.completed) and self.completed[i] == entry:
+                del self.completed[i]
+
+    def on_change(self, op, task, changes):
+        current = [getattr(task, field) for field in self.FIELDS]
+        if op == "put":
+            self._apply(task.id, *current, 1)
+        elif op == "delete":
+            self._apply(task.id, *current, -1)
+        elif op == "patch" and any(field in changes for field in self.FIELDS):
+            old = [changes[field][0] if field in changes else getattr(task, field) for field in self.FIELDS]
+            self._apply(task.id, *old, -1)
+            self._apply(task.id, *current, 1)
+
+    def count_completed_since(self, since):
+        return len(self.completed) - bisect_left(self.completed, (since,))
+
+
+class DueCalendarIndex:
+    """Open (not done) tasks with a due date, bucketed by due day.
+
+    ``buckets`` maps each day to ``{task_id: due_date}`` and ``days`` keeps
+    the days that have tasks sorted, so a calendar costs one lookup per day
+    and everything due before a moment is a walk over the earliest buckets.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.days = []
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            if task.due_date and task.status != TaskStatus.DONE:
+                self.buckets.setdefault(task.due_date.date(), {})[task.id] = task.due_date
+        self.days = sorted(self.buckets)
+
+    def copy(self):
+        index = DueCalendarIndex()
+        index.buckets = {day: dict(bucket) for day, bucket in self.buckets.items()}
+        index.days = list(self.days)
+        return index
+
+    def add(self, task_id, due_date):
+        day = due_date.date()
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = self.buckets[day] = {}
+            insort(self.days, day)
+        bucket[task_id] = due_date
+
+    def remove(self, task_id, due_date):
+        day = due_date.date()
+        bucket = self.buckets.get(day)
+        if bucket is None or bucket.pop(task_id, None) is None:
+            return
+        if not bucket:
+            del self.buckets[day]
+            del self.days[bisect_left(self.days, day)]
+
+    def on_change(self, op, task, changes):
+        if op == "put":
+            if task.due_date and task.status != TaskStatus.DONE:
+                self.add(task.id, task.due_date)
+        elif op == "delete":
+            if task.due_date:
+                self.remove(task.id, task.due_date)
+        elif op == "patch" and ("due_date" in changes or "status" in changes):
+            old_due = changes["due_date"][0] if "due_date" in changes else task.due_date
+            if old_due:
+                self.remove(task.id, old_due)
+            if task.due_date and task.status != TaskStatus.DONE:
+                self.add(task.id, task.due_date)
+
+    def day(self, day):
+        """Return ``{task_id: due_date}`` for tasks due on ``day``."""
+        return self.buckets.get(day, {})
+
+    def iter_due_before(self, moment):
+        """Yield ids of open tasks due strictly before ``moment``, earliest day first."""
+        last_day = moment.date()
+        for day in self.days:
+            if day > last_day:
+                return
+            for task_id, due_date in self.buckets[day].items():
+                if day < last_day or due_date < moment:
+                    yield task_id
+
+    def count_due_before(self, moment):
+        last_day = moment.date()
+        count = 0
+        for day in self.days[:bisect_left(self.days, last_day)]:
+            count += len(self.buckets[day])
+        return count + sum(1 for due_date in self.day(last_day).values() if due_date < moment)
+
+
+class TagIndex:
+    """Which tasks carry each tag, and how many of them are still open.
+
+    ``task_ids`` maps a tag to the ids of every task carrying it and
+    ``open_counts`` to the number of those that are not done. A tag listed
+    twice on one task counts once. Tags are also
+    bucketed by open count (``tags_by_count``, with the counts in use kept
+    sorted in ``counts``), so the most used tags are read from the top
+    buckets without looking at any task or every tag.
+    """
+
+    def __init__(self):
+        self.task_ids = {}
+        self.open_counts = {}
+        self.tags_by_count = {}
+        self.counts = []
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            self._apply(task.id, task.tags, task.status, 1)
+
+    def copy(self):
+        index = TagIndex()
+        index.task_ids = {tag: set(task_ids) for tag, task_ids in self.task_ids.items()}
+        index.open_counts = dict(self.open_counts)
+        index.tags_by_count = {count: set(tags) for count, tags in self.tags_by_count.items()}
+        index.counts = list(self.counts)
+        return index
+
+    def _move(self, tag, old_count, new_count):
+        # Counts only step by one, so each change touches two buckets
+        if old_count:
+            bucket = self.tags_by_count[old_count]
+            bucket.discard(tag)
+            if not bucket:
+                del self.tags_by_count[old_count]
+                del self.counts[bisect_left(self.counts, old_count)]
+        if new_count:
+            bucket = self.tags_by_count.get(new_count)
+            if bucket is None:
+                bucket = self.tags_by_count[new_count] = set()
+                insort(self.counts, new_count)
+            bucket.add(tag)
+
+    def _apply(self, task_id, tags, status, delta):
+        is_open = status != TaskStatus.DONE
+        for tag in set(tags):
+            if delta > 0:
+                self.task_ids.setdefault(tag, set()).add(task_id)
+            else:
+                task_ids = self.task_ids.get(tag)
+                if task_ids is None or task_id not in task_ids:
+                    continue
+                task_ids.discard(task_id)
+                if not task_ids:
+                    del self.task_ids[tag]
+            if is_open:
+                old_count = self.open_counts.get(tag, 0)
+                count = old_count + delta
+                if count:
+                    self.open_counts[tag] = count
+                else:
+                    self.open_counts.pop(tag, None)
+                self._move(tag, old_count, count)
+
+    def on_change(self, op, task, changes):
+        if op == "put":
+            self._apply(task.id, task.tags, task.status, 1)
+        elif op == "delete":
+            self._apply(task.id, task.tags, task.status, -1)
+        elif op == "patch" and ("tags" in changes or "status" in changes):
+            old_tags = changes["tags"][0] if "tags" in changes else task.tags
+            old_status = changes["status"][0] if "status" in changes else task.status
+            self._apply(task.id, old_tags, old_status, -1)
+            self._apply(task.id, task.tags, task.status, 1)
+
+    def top_open(self, limit):
+        """Return ``[(tag, open task count)]`` for the most used tags, most used first.
+
+        Buckets are read from the highest count down until ``limit`` tags are
+        found; tags with equal counts are ordered by name, which only sorts
+        within the last bucket needed.
+        """
+        top = []
+        for count in reversed(self.counts):
+            if len(top) >= limit:
+                break
+            tags = heapq.nsmallest(limit - len(top), self.tags_by_count[count])
+            top.extend((tag, count) for tag in tags)
+        return top
@@ -0,0 +1,182 @@
+# task_manager/instrumentation.py
+"""Opt-in timings and counters for finding out where an operation spends its time.
+
+Storage, the task manager, scoring and the CLI mark their phases (load,
+decode, filtering, scoring, rendering, save) with ``phase(name)`` and count
+what they did with ``count(name, amount)``: tasks decoded, bytes written,
+queries answered from an index versus by scanning every task. Both do
+nothing until instrumentation is started, so they cost one function call
+when it is off.
+
+Start it from the environment:
+
+    TASK_MANAGER_PROFILE=1          print a summary line to stderr on exit
+    TASK_MANAGER_TRACE=trace.json   write a JSON trace on exit
+    TASK_MANAGER_CPROFILE=run.prof  also run under cProfile and save its stats
+
+or with ``cli.py --profile``, ``--trace FILE`` and ``--cprofile FILE``. The
+trace uses the Trace Event Format, so chrome://tracing or Perfetto can
+show it as a timeline; ``python -m pstats run.prof`` reads the cProfile stats.
+"""
+import atexit
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+# Each environment variable matches the start() argument of the same role
+PROFILE_ENV = "TASK_MANAGER_PROFILE"
+TRACE_ENV = "TASK_MANAGER_TRACE"
+CPROFILE_ENV = "TASK_MANAGER_CPROFILE"
+
+# Past this many phase runs, phases are still totalled but left out of the trace
+MAX_TRACE_EVENTS = 100_000
+
+enabled = False
+phases = {}    # name -> [calls, seconds]
+counters = {}  # name -> total
+events = []    # (name, start, seconds, depth), in the order phases ended
+
+_NO_PHASE = nullcontext()
+_depth = 0
+_started = None
+_outputs = None
+_profiler = None
+_finish_registered = False
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        _depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _depth
+        elapsed = time.perf_counter() - self.start
+        _depth -= 1
+        totals = phases.get(self.name)
+        if totals is None:
+            totals = phases[self.name] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += elapsed
+        if len(events) < MAX_TRACE_EVENTS:
+            events.append((self.name, self.start, elapsed, _depth))
+        return False
+
+
+def phase(name):
+    """Context manager timing one run of the named phase."""
+    if not enabled:
+        return _NO_PHASE
+    return _Phase(name)
+
+
+def count(name, amount=1):
+    """Add ``amount`` to the named counter."""
+    if enabled:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def reset():
+    """Forget everything recorded so far."""
+    global _started
+    phases.clear()
+    counters.clear()
+    del events[:]
+    _started = time.perf_counter()
+
+
+def start(summary=False, trace_path=None, cprofile_path=None):
+    """Start recording; the requested reports are written by finish() or at exit."""
+    global enabled, _outputs, _profiler, _finish_registered
+    if enabled:
+        return
+    enabled = True
+    reset()
+    _outputs = (summary, trace_path, cprofile_path)
+    if cprofile_path:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if not _finish_registered:
+        atexit.register(finish)
+        _finish_registered = True
+
+
+def finish(stream=None):
+    """Stop recording and write the reports start() was asked for."""
+    global enabled, _profiler
+    if not enabled:
+        return
+    enabled = False
+    summary, trace_path, cprofile_path = _outputs
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(cprofile_path)
+        _profiler = None
+    if trace_path:
+        import json
+        with open(trace_path, "w") as f:
+            json.dump(trace(), f)
+    if summary:
+        stream = stream or sys.stderr
+        stream.write(summary_line() + "\n")
+        stream.flush()
+
+
+def report():
+    """Return the totals as ``{"total_ms", "phases": {name: {"calls", "ms"}}, "counters"}``."""
+    total = time.perf_counter() - _started if _started is not None else 0.0
+    return {
+        "total_ms": round(total * 1000, 3),
+        "phases": {
+            name: {"calls": calls, "ms": round(seconds * 1000, 3)}
+            for name, (calls, seconds) in phases.items()
+        },
+        "counters": dict(counters),
+    }
+
+
+def summary_line():
+    """Return the totals on one line, slowest phase first."""
+    totals = report()
+    parts = [f"total {totals['total_ms']:.1f}ms"]
+    for name, entry in sorted(totals["phases"].items(), key=lambda item: -item[1]["ms"]):
+        calls = f" x{entry['calls']}" if entry["calls"] > 1 else ""
+        parts.append(f"{name} {entry['ms']:.1f}ms{calls}")
+    parts.extend(f"{name}={value}" for name, value in sorted(totals["counters"].items()))
+    return "profile: " + " | ".join(parts)
+
+
+def trace():
+    """Return the recorded phases as a Trace Event Format document, plus the totals."""
+    origin = _started if _started is not None else 0.0
+    pid = os.getpid()
+    trace_events = [
+        {"name": name, "ph": "X", "ts": round((begin - origin) * 1e6, 1),
+         "dur": round(seconds * 1e6, 1), "pid": pid, "tid": 0, "args": {"depth": depth}}
+        for name, begin, seconds, depth in events
+    ]
+    if counters:
+        trace_events.append({"name": "counters", "ph": "C", "ts": round((time.perf_counter() - origin) * 1e6, 1),
+                             "pid": pid, "tid": 0, "args": dict(counters)})
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms", "summary": report()}
+
+
+def start_from_environment():
+    """Start recording if any of the environment variables asks for it."""
+    summary = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+    trace_path = os.environ.get(TRACE_ENV) or None
+    cprofile_path = os.environ.get(CPROFILE_ENV) or None
+    if summary or trace_path or cprofile_path:
+        start(summary, trace_path, cprofile_path)
+
+
+start_from_environment()
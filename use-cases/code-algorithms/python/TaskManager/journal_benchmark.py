@@ -0,0 +1,86 @@
+# task_manager/journal_benchmark.py
+"""Measure journal write throughput with several concurrent writer processes.
+
+For each writer count, that many processes open the same store and add
+tasks as fast as they can, one commit per task. Prints the total commits per
+second, then reloads the store and checks that every commit is in the
+journal exactly once, as a complete record:
+
+    python journal_benchmark.py --writers 1 2 4 8 --commits 200 --payload 8192
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from models import Task
+from storage import TaskStorage
+
+
+def _writer(storage_path, writer, commits, payload, barrier):
+    storage = TaskStorage(storage_path)
+    # Start timing only once every writer has loaded the store
+    barrier.wait()
+    for i in range(commits):
+        storage.add_task(Task(f"writer {writer} commit {i}", payload))
+
+
+def run_writers(storage_path, writers, commits, payload=""):
+    """Run ``writers`` processes doing ``commits`` commits each; return the seconds taken."""
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(writers + 1)
+    processes = [
+        context.Process(target=_writer, args=(storage_path, writer, commits, payload, barrier))
+        for writer in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    failed = [process.exitcode for process in processes if process.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"{len(failed)} writer(s) failed")
+    return elapsed
+
+
+def check_store(storage_path, writers, commits):
+    """Raise ValueError unless every commit of every writer was stored exactly once."""
+    with open(storage_path + ".journal", "rb") as f:
+        for number, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                raise ValueError(f"journal line {number} is incomplete")
+            json.loads(line)
+    titles = sorted(task.title for task in TaskStorage(storage_path).tasks.values())
+    expected = sorted(f"writer {writer} commit {i}" for writer in range(writers) for i in range(commits))
+    if titles != expected:
+        raise ValueError(f"expected {len(expected)} tasks, found {len(titles)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure concurrent journal write throughput")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--commits", type=int, default=200, help="commits per writer")
+    parser.add_argument("--payload", type=int, default=0, help="description size in bytes")
+    args = parser.parse_args()
+
+    for writers in args.writers:
+        temp_dir = tempfile.mkdtemp()
+        try:
+            storage_path = os.path.join(temp_dir, "tasks.json")
+            TaskStorage(storage_path)
+            elapsed = run_writers(storage_path, writers, args.commits, "x" * args.payload)
+            check_store(storage_path, writers, args.commits)
+        finally:
+            shutil.rmtree(temp_dir)
+        total = writers * args.commits
+        print(f"{writers:>3} writers: {total} commits in {elapsed:.2f}s, {total / elapsed:,.0f} commits/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# task_manager/load_test.py
+"""Load-test the HTTP task service against a large resident store.
+
+Seeds an in-memory store, serves it with uvicorn on a local port and drives
+it from a pool of client threads, then prints requests per second and
+latency percentiles for each endpoint:
+
+    python load_test.py --tasks 1000000 --requests 20000 --concurrency 32
+
+Needs fastapi and uvicorn.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from memory_storage import MemoryTaskStorage
+from models import Task, TaskPriority, TaskStatus
+
+WORDS = ["report", "review", "deploy", "design", "meeting", "invoice", "backup", "release",
+         "budget", "draft", "email", "plan", "test", "fix", "update", "migrate"]
+
+
+def seed_tasks(count, rng):
+    now = datetime.now()
+    statuses = list(TaskStatus)
+    priorities = list(TaskPriority)
+    tasks = []
+    for i in range(count):
+        task = Task(
+            f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+            f"{rng.choice(WORDS)} for item {i}",
+            rng.choice(priorities),
+            now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.5 else None,
+            [rng.choice(WORDS)] if rng.random() < 0.3 else []
+        )
+        task.status = rng.choice(statuses)
+        tasks.append(task)
+    return tasks
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Client:
+    """One keep-alive connection per worker thread."""
+
+    def __init__(self, port):
+        self.port = port
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        start = time.perf_counter()
+        connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                           headers=headers)
+        response = connection.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - start
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} returned {response.status}")
+        return elapsed
+
+
+def build_requests(count, task_ids, rng):
+    """Return a shuffled request mix: mostly page reads, some creates and summaries."""
+    mix = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            cursor = rng.choice(task_ids)
+            status = rng.choice(["", "&status=todo"])
+            mix.append(("list", "GET", f"/tasks/?limit=50&cursor={cursor}{status}", None))
+        elif roll < 0.8:
+            mix.append(("create", "POST", "/tasks/",
+                        {"title": f"load test {i}", "priority": rng.randint(1, 4)}))
+        elif roll < 0.9:
+            mix.append(("get", "GET", f"/tasks/{rng.choice(task_ids)[:8]}", None))
+        elif roll < 0.95:
+            mix.append(("stats", "GET", "/tasks/stats", None))
+        else:
+            mix.append(("top-priority", "GET", "/tasks/top-priority?limit=10", None))
+    return mix
+
+
+def serve(tasks, port):
+    import uvicorn
+    import service
+
+    manager = service.ResidentTaskManager(MemoryTaskStorage(tasks))
+    service.app.dependency_overrides[service.get_manager] = lambda: manager
+    uvicorn.run(service.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def start_server(tasks, port):
+    """Serve the tasks from a forked process, so clients do not share its GIL."""
+    process = multiprocessing.get_context("fork").Process(target=serve, args=(tasks, port), daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            if not process.is_alive():
+                raise RuntimeError("the service failed to start")
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the task service")
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks to seed")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Client threads")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    tasks = seed_tasks(args.tasks, rng)
+    server = start_server(tasks, args.port)
+    print(f"Seeded and indexed {args.tasks} tasks in {time.perf_counter() - start:.1f}s")
+
+    client = Client(args.port)
+    mix = build_requests(args.requests, [task.id for task in tasks], rng)
+    del tasks
+
+    # Warm the summary caches so the first stats call is not counted as typical
+    client.request("GET", "/tasks/stats")
+    client.request("GET", "/tasks/top-priority?limit=10")
+
+    latencies = {}
+    lock = threading.Lock()
+
+    def send(item):
+        name, method, path, body = item
+        elapsed = client.request(method, path, body)
+        with lock:
+            latencies.setdefault(name, []).append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(send, mix))
+    wall = time.perf_counter() - start
+
+    server.terminate()
+    server.join()
+
+    everything = sorted(value for values in latencies.values() for value in values)
+    print(f"{'endpoint':<14}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        print(f"{name:<14}{len(values):>10}{percentile(values, 0.5) * 1000:>10.2f}"
+              f"{percentile(values, 0.99) * 1000:>10.2f}")
+    print(f"{'all':<14}{len(everything):>10}{percentile(everything, 0.5) * 1000:>10.2f}"
+          f"{percentile(everything, 0.99) * 1000:>10.2f}")
+    print(f"{len(everything) / wall:.0f} requests/s over {wall:.1f}s "
+          f"with {args.concurrency} clients")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# task_manager/memory_storage.py
+import copy
+import json
+import os
+from contextlib import contextmanager
+
+from storage import TaskStorage, TaskEncoder, TaskDecoder
+
+
+class MemoryTaskStorage(TaskStorage):
+    """TaskStorage that keeps tasks in memory only.
+
+    Changes go through the same change tracking, change feed and indexes as
+    TaskStorage, but a commit never touches the filesystem, which makes it a
+    good fit for tests and for services that embed a TaskManager. Given a
+    ``snapshot_path``, tasks are loaded from that JSON file and written back to
+    it every ``snapshot_every`` commits and on ``compact()``.
+
+    ``fork()`` returns an independent copy that shares task objects with this
+    storage until one side modifies them. Modify tasks obtained from
+    ``get_task`` (as TaskManager does); objects returned by the listing and
+    search methods may be shared and should be treated as read-only.
+    """
+
+    def __init__(self, tasks=None, snapshot_path=None, snapshot_every=None):
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self._commits = 0
+        self._token = object()
+        self._initial_tasks = tasks or []
+        super().__init__(storage_path=snapshot_path or ":memory:")
+
+    def _own(self, task):
+        # Tasks carrying another token are shared with a fork and copied before use
+        task._cow_token = self._token
+        return self._track(task)
+
+    def load(self):
+        self.tasks = {}
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    for task in json.load(f, cls=TaskDecoder):
+                        self.tasks[task.id] = self._own(task)
+            except Exception as e:
+                print(f"Error loading tasks: {e}")
+        for task in self._initial_tasks:
+            task.clear_changes()
+            self.tasks[task.id] = self._own(task)
+        self._initial_tasks = []
+        self._notify("reset", None)
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        yield
+
+    def refresh(self, keep=None):
+        pass  # nothing else can change an in-memory store
+
+    def _get_archive(self, create=False):
+        return None
+
+    def archive_completed_tasks(self, completed_before):
+        return 0  # there is no cold tier in memory
+
+    def _encode_records(self, events):
+        # Nothing is written, so commits skip encoding; snapshots encode tasks themselves
+        return events
+
+    def _write_journal(self, records):
+        self._commits += 1
+        if self.snapshot_every and self._commits % self.snapshot_every == 0:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        if not self.snapshot_path:
+            return
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(list(self.tasks.values()), f, cls=TaskEncoder, indent=2)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def add_task(self, task):
+        self._own(task)
+        return super().add_task(task)
+
+    def get_task(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is not None and task.__dict__.get("_cow_token") is not self._token:
+            task = self._own(copy.copy(task))
+            self.tasks[task_id] = task
+        return task
+
+    def fork(self):
+        """Return a copy-on-write copy of this storage.
+
+        Only the task dict and the indexes are copied; task objects are
+        copied lazily by whichever side modifies them first.
+        """
+        self.save()
+        child = MemoryTaskStorage()
+        child.tasks = dict(self.tasks)
+        for name, _ in self.INDEXES:
+            setattr(child, name, getattr(self, name).copy())
+        if self._text_index is not None:
+            child._text_index = self._text_index.copy()
+        # Tasks held so far now count as shared on this side too
+        self._token = object()
+        return child
@@ -0,0 +1,610 @@
+# task_manager/migrate.py
+"""Copy tasks between storage formats without loading them all into memory.
+
+Supported formats, chosen by file extension:
+
+- ``json``: a TaskStorage file (``tasks.json``). As a source its journal is
+  applied too; as a destination a plain snapshot is written.
+- ``jsonl``: one task per line.
+- ``gzip`` (``.gz``, such as ``tasks.jsonl.gz``): JSON lines compressed
+  with gzip, as archive segments are stored. This is the binary format;
+  it is written one gzip member per batch.
+- ``sqlite`` (``.db``, ``.sqlite``, ``.sqlite3``): a ``tasks`` table with one
+  column per task field.
+
+Tasks are read incrementally and written in batches. With every batch the
+destination records how far into the source it got, so an interrupted
+migration resumes after the last committed batch. A checksum of every task
+written is kept with that position and checked against what the
+destination holds once the migration is complete.
+"""
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+TASK_FIELDS = ("id", "title", "description", "status", "priority", "due_date", "tags",
+               "created_at", "updated_at", "completed_at", "version")
+
+FORMATS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".gz": "gzip",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+}
+
+READ_CHUNK_SIZE = 1024 * 1024
+# Give up on an array element that grows past this without parsing
+MAX_ELEMENT_SIZE = 64 * 1024 * 1024
+CHECKSUM_MODULUS = 2 ** 256
+
+
+class MigrationError(Exception):
+    pass
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise MigrationError(f"Unknown format for {path}; use one of: {', '.join(sorted(FORMATS))}")
+    return FORMATS[extension]
+
+
+def normalize_task(data):
+    """Return the task with exactly TASK_FIELDS, in the form every format stores."""
+    if not isinstance(data, dict) or not data.get("id"):
+        raise MigrationError(f"Not a task: {str(data)[:80]}")
+    task = {field: data.get(field) for field in TASK_FIELDS}
+    task["tags"] = list(task["tags"] or [])
+    task["version"] = task["version"] or 1
+    return task
+
+
+def task_checksum(task):
+    line = json.dumps(task, sort_keys=True, separators=(",", ":"))
+    return int.from_bytes(hashlib.sha256(line.encode("utf-8")).digest(), "big")
+
+
+def add_checksum(checksum, task):
+    # A sum does not depend on order, so a destination can be read back in any order
+    return (checksum + task_checksum(task)) % CHECKSUM_MODULUS
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class JsonArrayReader:
+    """Incremental parser for a file holding one JSON array.
+
+    Iterating yields the array's elements while holding only the unparsed
+    part of the current chunk in memory. ``offset()`` is the byte offset
+    just after the last element yielded; a reader created with that offset
+    continues with the next element.
+    """
+
+    def __init__(self, f, offset=0, chunk_size=READ_CHUNK_SIZE):
+        self.file = f
+        self.file.seek(offset)
+        self.start_offset = offset
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        # Chunks can end inside a multi-byte character
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        # Bytes are counted up to buffer[counted], which is at byte counted_offset
+        self.counted = 0
+        self.counted_offset = offset
+
+    def offset(self):
+        # Only the text consumed since the last call is encoded to count its bytes
+        if self.counted != self.position:
+            self.counted_offset += len(self.buffer[self.counted:self.position].encode("utf-8"))
+            self.counted = self.position
+        return self.counted_offset
+
+    def _read_more(self):
+        chunk = self.file.read(self.chunk_size)
+        text = self.text_decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            return False
+        self.offset()
+        self.buffer = self.buffer[self.position:] + text
+        self.position = self.counted = 0
+        if len(self.buffer) > MAX_ELEMENT_SIZE:
+            raise MigrationError(f"Invalid JSON or oversized task after byte {self.counted_offset}")
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next character, or None at the end of the file."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read_more():
+                return None
+
+    def __iter__(self):
+        first = self.start_offset == 0
+        if first:
+            if self._peek() != "[":
+                raise MigrationError("The source does not contain a JSON array")
+            self.position += 1
+        while True:
+            char = self._peek()
+            if char is None:
+                raise MigrationError("The source ends before its JSON array is closed")
+            if char == "]":
+                return
+            if not first:
+                if char != ",":
+                    raise MigrationError(f"Expected ',' at byte {self.offset()}")
+                self.position += 1
+                self._peek()
+            first = False
+            while True:
+                try:
+                    value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                    break
+                except json.JSONDecodeError:
+                    if not self._read_more():
+                        raise MigrationError(f"Invalid or truncated JSON at byte {self.offset()}")
+            yield value
+
+
+# ─── Sources ─────────────────────────────────────────────────
+# A source yields (position, task) pairs; position is a JSON value that
+# iter_tasks accepts to continue after that task.
+
+class JsonSource:
+    """A TaskStorage snapshot with its journal applied.
+
+    The journal is folded per task id into a private temporary SQLite
+    database up front, which spills to disk rather than growing in memory
+    with the store; the snapshot itself is streamed and each of its tasks
+    looked up in the fold. Tasks added by the journal follow the snapshot's
+    tasks.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.journal = self._fold_journal()
+
+    def fingerprint(self):
+        journal = file_fingerprint(self.journal_path) if os.path.exists(self.journal_path) else None
+        return [file_fingerprint(self.path), journal]
+
+    def fraction_done(self, position):
+        offset = position[0]
+        return offset / os.path.getsize(self.path) if offset is not None else None
+
+    def _fold_journal(self):
+        # An empty file name makes SQLite keep the database in a temporary file
+        folded = sqlite3.connect("")
+        folded.execute(
+            "CREATE TABLE journal (id TEXT PRIMARY KEY, seq INTEGER NOT NULL, op TEXT NOT NULL, "
+            "task TEXT, in_snapshot INTEGER NOT NULL DEFAULT 0)"
+        )
+        if not os.path.exists(self.journal_path):
+            return folded
+        # Replacing a row keeps its seq, so journal-only tasks come out in the order first seen
+        upsert = ("INSERT INTO journal (id, seq, op, task) VALUES (?, ?, ?, ?) "
+                  "ON CONFLICT (id) DO UPDATE SET op = excluded.op, task = excluded.task")
+        with folded, open(self.journal_path, "rb") as f:
+            for seq, line in enumerate(f):
+                if not line.endswith(b"\n") or not line.strip():
+                    continue  # a writer may be mid-append
+                record = json.loads(line)
+                op = record["op"]
+                if op == "put":
+                    folded.execute(upsert, (record["task"]["id"], seq, "put", json.dumps(record["task"])))
+                elif op == "delete":
+                    folded.execute(upsert, (record["id"], seq, "delete", None))
+                else:
+                    state = self._journal_state(record["id"], folded)
+                    if state is None:
+                        state = ("patch", {})
+                    elif state[0] == "delete":
+                        continue
+                    state[1].update(record["fields"], version=record["version"])
+                    folded.execute(upsert, (record["id"], seq, state[0], json.dumps(state[1])))
+        return folded
+
+    def _journal_state(self, task_id, folded=None):
+        """Return (op, fields) folded from the journal for task_id, or None."""
+        row = (folded or self.journal).execute(
+            "SELECT op, task FROM journal WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]) if row[1] is not None else None
+
+    def _has_journal(self, op=None):
+        query = "SELECT 1 FROM journal" + (" WHERE op = ?" if op else "") + " LIMIT 1"
+        return self.journal.execute(query, (op,) if op else ()).fetchone() is not None
+
+    def iter_tasks(self, position=None):
+        offset, added = position if position else (0, 0)
+        with self.journal:
+            self.journal.execute("UPDATE journal SET in_snapshot = 0")
+        # Puts for tasks the snapshot has are yielded in the snapshot task's place
+        if offset != 0 and self._has_journal("put"):
+            self._mark_in_snapshot(offset)
+        has_journal = self._has_journal()
+        if offset is not None:
+            with open(self.path, "rb") as f:
+                reader = JsonArrayReader(f, offset)
+                for task in reader:
+                    state = self._journal_state(task.get("id")) if has_journal else None
+                    if state is not None:
+                        op, fields = state
+                        if op == "delete":
+                            continue
+                        if op == "put":
+                            self._set_in_snapshot(fields["id"])
+                            task = fields
+                        else:
+                            task.update(fields)
+                    yield [reader.offset(), 0], task
+
+        # Then the tasks only the journal has
+        cursor = self.journal.execute(
+            "SELECT task FROM journal WHERE op = 'put' AND in_snapshot = 0 ORDER BY seq LIMIT -1 OFFSET ?",
+            (added,)
+        )
+        for index, (task,) in enumerate(cursor, added + 1):
+            yield [None, index], json.loads(task)
+
+    def _set_in_snapshot(self, task_id):
+        # Left uncommitted: only this connection reads the fold
+        self.journal.execute("UPDATE journal SET in_snapshot = 1 WHERE id = ?", (task_id,))
+
+    def _mark_in_snapshot(self, end_offset):
+        """Flag the journal's puts for tasks the snapshot holds before end_offset (None for anywhere)."""
+        with open(self.path, "rb") as f:
+            reader = JsonArrayReader(f)
+            for task in reader:
+                if end_offset is not None and reader.offset() > end_offset:
+                    break
+                self._set_in_snapshot(task.get("id"))
+
+
+class JsonlSource:
+    def __init__(self, path):
+        self.path = path
+
+    def fingerprint(self):
+        return [file_fingerprint(self.path)]
+
+    def fraction_done(self, position):
+        return position / os.path.getsize(self.path)
+
+    def iter_tasks(self, position=None):
+        with open(self.path, "rb") as f:
+            f.seek(position or 0)
+            while True:
+                line = f.readline()
+                if not line:
+                    return
+                if line.strip():
+                    yield f.tell(), json.loads(line)
+
+
+class SqliteSource:
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.last_rowid = self.connection.execute("SELECT MAX(rowid) FROM tasks").fetchone()[0] or 0
+
+    def fingerprint(self):
+        return [file_fingerprint(self.path)]
+
+    def fraction_done(self, position):
+        return position / self.last_rowid if self.last_rowid else None
+
+    def iter_tasks(self, position=None):
+        cursor = self.connection.execute(
+            f"SELECT rowid, {', '.join(TASK_FIELDS)} FROM tasks WHERE rowid > ? ORDER BY rowid",
+            (position or 0,)
+        )
+        for row in cursor:
+            yield row[0], SqliteDestination.row_to_task(row[1:])
+
+
+class GzipSource(JsonlSource):
+    """JSON lines compressed with gzip, as one member or several concatenated ones."""
+
+    def fraction_done(self, position):
+        return position[0] / os.path.getsize(self.path)
+
+    def iter_tasks(self, position=None):
+        # A position is [byte offset of a gzip member, lines of that member read]
+        member_offset, skip = position if position else (0, 0)
+        with open(self.path, "rb") as f:
+            f.seek(member_offset)
+            compressed = f.read(READ_CHUNK_SIZE)
+            while compressed:
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                pending = b""
+                line_number = 0
+                while True:
+                    try:
+                        lines = (pending + decompressor.decompress(compressed)).split(b"\n")
+                    except zlib.error as e:
+                        raise MigrationError(f"Invalid gzip data after byte {member_offset}: {e}")
+                    pending = b"" if decompressor.eof else lines.pop()
+                    for line in lines:
+                        line_number += 1
+                        if line_number > skip and line.strip():
+                            yield [member_offset, line_number], json.loads(line)
+                    if decompressor.eof:
+                        break
+                    compressed = f.read(READ_CHUNK_SIZE)
+                    if not compressed:
+                        raise MigrationError(f"The source ends inside the gzip member at byte {member_offset}")
+                # The next member starts where this one's data ends
+                compressed = decompressor.unused_data or f.read(READ_CHUNK_SIZE)
+                member_offset = f.tell() - len(compressed)
+                skip = 0
+
+
+SOURCES = {"json": JsonSource, "jsonl": JsonlSource, "gzip": GzipSource, "sqlite": SqliteSource}
+
+
+# ─── Destinations ────────────────────────────────────────────
+# A destination commits a batch together with the progress record that
+# lets an interrupted migration resume, and can read its tasks back.
+
+class FileDestination:
+    """Shared logic for destinations that are a single growing file.
+
+    Progress lives in ``<path>.migration`` and records the file size at the
+    last committed batch; anything written after that is cut off on resume.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.progress_path = path + ".migration"
+        self.file = None
+
+    def load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return None
+        with open(self.progress_path) as f:
+            return json.load(f)
+
+    def start(self, progress):
+        if progress is None:
+            self.remove_progress()
+            self.file = open(self.path, "wb")
+            self._write_header()
+        else:
+            self.file = open(self.path, "r+b")
+            self.file.truncate(progress["size"])
+            self.file.seek(progress["size"])
+
+    def _write_header(self):
+        pass
+
+    def write_batch(self, tasks, progress, first):
+        self.file.write(self._encode_batch(tasks, first))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        progress["size"] = self.file.tell()
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def finish(self):
+        self._write_footer()
+        self.file.close()
+
+    def _write_footer(self):
+        pass
+
+    def remove_progress(self):
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+
+
+class JsonlDestination(FileDestination):
+    def _encode_batch(self, tasks, first):
+        return "".join(json.dumps(task) + "\n" for task in tasks).encode("utf-8")
+
+    def iter_tasks(self):
+        return (task for _, task in JsonlSource(self.path).iter_tasks())
+
+
+class GzipDestination(JsonlDestination):
+    """JSON lines in gzip. Each batch is a complete gzip member, so a resume
+    can cut the file after any committed batch."""
+
+    def _encode_batch(self, tasks, first):
+        return gzip.compress(super()._encode_batch(tasks, first), mtime=0)
+
+    def iter_tasks(self):
+        return (task for _, task in GzipSource(self.path).iter_tasks())
+
+
+class JsonDestination(FileDestination):
+    """Writes a TaskStorage snapshot (a JSON array) that TaskStorage can open."""
+
+    def _write_header(self):
+        self.file.write(b"[")
+
+    def _encode_batch(self, tasks, first):
+        text = ",".join("\n" + json.dumps(task, indent=2) for task in tasks)
+        return (text if first else "," + text).encode("utf-8")
+
+    def _write_footer(self):
+        self.file.write(b"\n]\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def iter_tasks(self):
+        with open(self.path, "rb") as f:
+            yield from JsonArrayReader(f)
+
+
+class SqliteDestination:
+    """A ``tasks`` table; progress is committed in the same transaction as each batch."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS migration_progress (id INTEGER PRIMARY KEY CHECK (id = 1), state TEXT)"
+        )
+
+    def load_progress(self):
+        row = self.connection.execute("SELECT state FROM migration_progress").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def start(self, progress):
+        with self.connection:
+            if progress is None:
+                self.connection.execute("DELETE FROM migration_progress")
+                self.connection.execute("DROP TABLE IF EXISTS tasks")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT, status TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, due_date TEXT, tags TEXT NOT NULL, created_at TEXT, "
+                "updated_at TEXT, completed_at TEXT, version INTEGER NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date)")
+
+    @staticmethod
+    def task_to_row(task):
+        return tuple(json.dumps(task[field]) if field == "tags" else task[field] for field in TASK_FIELDS)
+
+    @staticmethod
+    def row_to_task(row):
+        task = dict(zip(TASK_FIELDS, row))
+        task["tags"] = json.loads(task["tags"])
+        return task
+
+    def write_batch(self, tasks, progress, first):
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in TASK_FIELDS)})",
+                [self.task_to_row(task) for task in tasks]
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO migration_progress (id, state) VALUES (1, ?)",
+                (json.dumps(progress),)
+            )
+
+    def finish(self):
+        pass
+
+    def iter_tasks(self):
+        cursor = self.connection.execute(f"SELECT {', '.join(TASK_FIELDS)} FROM tasks")
+        return (self.row_to_task(row) for row in cursor)
+
+    def remove_progress(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM migration_progress")
+
+
+DESTINATIONS = {"json": JsonDestination, "jsonl": JsonlDestination, "gzip": GzipDestination,
+                "sqlite": SqliteDestination}
+
+
+# ─── Migration ───────────────────────────────────────────────
+
+def print_progress(count, fraction, rate, stream=None):
+    """Rewrite one status line; the caller ends it with a newline when done."""
+    stream = stream or sys.stdout
+    done = f" ({fraction:.0%})" if fraction is not None else ""
+    stream.write(f"\rMigrated {count:,} tasks{done} at {rate:,.0f} tasks/s")
+    stream.flush()
+
+
+def migrate(source_path, destination_path, batch_size=1000, restart=False, progress=print_progress):
+    """Copy every task from source_path to destination_path.
+
+    Resumes an interrupted migration to the same destination unless
+    ``restart`` is set. After every batch ``progress(count, fraction, rate)``
+    is called with the tasks migrated so far, the fraction of the source
+    read (None if unknown) and the tasks per second of this run. Returns
+    the number of tasks in the destination; raises MigrationError if its
+    checksum does not match the tasks written.
+    """
+    source = SOURCES[detect_format(source_path)](source_path)
+    destination_exists = os.path.exists(destination_path) and os.path.getsize(destination_path) > 0
+    destination = DESTINATIONS[detect_format(destination_path)](destination_path)
+
+    state = None if restart else destination.load_progress()
+    if state is None and destination_exists and not restart:
+        raise MigrationError(f"{destination_path} already exists; use --restart to overwrite it")
+    if state is not None and (state["source"] != os.path.abspath(source_path)
+                              or state["fingerprint"] != source.fingerprint()):
+        raise MigrationError(
+            f"{destination_path} holds an unfinished migration from another or a changed source; "
+            "use --restart to start over"
+        )
+    destination.start(state)
+    if state is None:
+        state = {
+            "source": os.path.abspath(source_path),
+            "fingerprint": source.fingerprint(),
+            "position": None,
+            "count": 0,
+            "checksum": "0",
+        }
+
+    count = start_count = state["count"]
+    checksum = int(state["checksum"], 16)
+    start_time = time.perf_counter()
+
+    def commit(batch, position):
+        destination.write_batch(batch, dict(state, position=position, count=count + len(batch),
+                                            checksum=format(checksum, "x")), first=count == 0)
+        if progress:
+            elapsed = time.perf_counter() - start_time
+            rate = (count + len(batch) - start_count) / elapsed if elapsed else 0
+            progress(count + len(batch), source.fraction_done(position), rate)
+        return count + len(batch)
+
+    batch = []
+    for position, task in source.iter_tasks(state["position"]):
+        task = normalize_task(task)
+        batch.append(task)
+        checksum = add_checksum(checksum, task)
+        if len(batch) >= batch_size:
+            count = commit(batch, position)
+            batch = []
+    if batch:
+        count = commit(batch, position)
+    destination.finish()
+
+    # Read everything back and compare with what was written
+    written = 0
+    written_checksum = 0
+    for task in destination.iter_tasks():
+        written += 1
+        written_checksum = add_checksum(written_checksum, normalize_task(task))
+    if written != count or written_checksum != checksum:
+        raise MigrationError(
+            f"Checksum mismatch: wrote {count} tasks but {destination_path} holds {written} "
+            "that do not match; run again with --restart"
+        )
+    destination.remove_progress()
+    return count
@@ -16,8 +16,23 @@ class TaskStatus(Enum):
     DONE = "done"
 
 class Task:
+    """A single task.
+
+    Assignments to task fields are tracked: ``get_changes()`` returns the fields
+    modified since the last ``clear_changes()`` together with their previous
+    values, and ``version`` increases with every change. Storage uses this to
+    persist per-field deltas instead of whole tasks. Mutable fields such as
+    ``tags`` must be reassigned, not mutated in place, to be tracked.
+    ``saved_version`` is the version as of the last ``clear_changes()``, so
+    ``version - saved_version`` counts the unsaved changes.
+    """
+
+    UNTRACKED_FIELDS = ("id", "version")
+
     def __init__(self, title, description="", priority=TaskPriority.MEDIUM,
                  due_date=None, tags=None):
+        self._changes = None
+        self._on_dirty = None
         self.id = str(uuid.uuid4())
         self.title = title
         self.description = description
@@ -28,10 +43,57 @@ class Task:
         self.due_date = due_date
         self.completed_at = None
         self.tags = tags or []
+        self.version = 1
+        self._saved_version = 1
+        self._changes = {}
+
+    def __setattr__(self, name, value):
+        changes = self.__dict__.get("_changes")
+        if changes is not None and not name.startswith("_") and name not in self.UNTRACKED_FIELDS:
+            old_value = self.__dict__.get(name)
+            if old_value != value:
+                if not changes and self._on_dirty is not None:
+                    self._on_dirty(self)
+                changes.setdefault(name, old_value)
+                self.__dict__["version"] += 1
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # Copies and pickles don't belong to the storage that tracks this task
+        state = self.__dict__.copy()
+        state["_changes"] = dict(self._changes or {})
+        state["_on_dirty"] = None
+        return state
+
+    @classmethod
+    def from_fields(cls, fields):
+        """Build an already saved task from its field values, without tracking them.
+
+        ``fields`` must hold every field ``__init__`` sets; it is used as is.
+        """
+        task = cls.__new__(cls)
+        task.__dict__.update(fields, _changes={}, _on_dirty=None, _saved_version=fields["version"])
+        return task
+
+    @property
+    def saved_version(self):
+        return self.__dict__.get("_saved_version", self.version)
+
+    @property
+    def is_dirty(self):
+        return bool(self._changes)
+
+    def get_changes(self):
+        """Return ``{field: (old_value, new_value)}`` for fields changed since the last clear."""
+        return {name: (old_value, self.__dict__[name]) for name, old_value in self._changes.items()}
+
+    def clear_changes(self):
+        self._changes = {}
+        self._saved_version = self.version
 
     def update(self, **kwargs):
         for key, value in kwargs.items():
-            if hasattr(self, key):
+            if key in self.__dict__ and not key.startswith("_"):
                 setattr(self, key, value)
         self.updated_at = datetime.now()
 
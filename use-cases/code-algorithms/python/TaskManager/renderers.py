@@ -0,0 +1,116 @@
+# task_manager/renderers.py
+import sys
+
+from models import TaskStatus, TaskPriority
+
+
+STATUS_SYMBOLS = {
+    TaskStatus.TODO: "[ ]",
+    TaskStatus.IN_PROGRESS: "[>]",
+    TaskStatus.REVIEW: "[?]",
+    TaskStatus.DONE: "[✓]"
+}
+
+PRIORITY_SYMBOLS = {
+    TaskPriority.LOW: "!",
+    TaskPriority.MEDIUM: "!!",
+    TaskPriority.HIGH: "!!!",
+    TaskPriority.URGENT: "!!!!"
+}
+
+SEPARATOR = "-" * 50
+
+CSV_FIELDS = ["id", "title", "description", "status", "priority", "due_date",
+              "tags", "created_at", "updated_at", "completed_at"]
+
+# Flush to the output stream once this many characters are buffered
+BUFFER_SIZE = 64 * 1024
+
+
+def format_task(task):
+    # isoformat() is much cheaper than strftime() and yields the same text here
+    due_str = f"Due: {task.due_date.date().isoformat()}" if task.due_date else "No due date"
+    tags_str = f"Tags: {', '.join(task.tags)}" if task.tags else "No tags"
+
+    return (
+        f"{STATUS_SYMBOLS[task.status]} {task.id[:8]} - {PRIORITY_SYMBOLS[task.priority]} {task.title}\n"
+        f"  {task.description}\n"
+        f"  {due_str} | {tags_str}\n"
+        f"  Created: {task.created_at.isoformat(' ', 'minutes')}"
+    )
+
+
+def iter_table(tasks):
+    """Yield the human-readable listing, one task block and separator at a time."""
+    for task in tasks:
+        yield format_task(task)
+        yield SEPARATOR
+
+
+def iter_jsonl(tasks):
+    """Yield one JSON document per task."""
+    from storage import TaskEncoder
+
+    encoder = TaskEncoder()
+    for task in tasks:
+        yield encoder.encode(task)
+
+
+def iter_csv(tasks):
+    """Yield a CSV header followed by one row per task."""
+    import csv
+
+    class _LastRow:
+        def write(self, row):
+            self.row = row
+
+    last_row = _LastRow()
+    writer = csv.writer(last_row, lineterminator="")
+    writer.writerow(CSV_FIELDS)
+    yield last_row.row
+    for task in tasks:
+        writer.writerow([
+            task.id,
+            task.title,
+            task.description,
+            task.status.value,
+            task.priority.value,
+            task.due_date.isoformat() if task.due_date else "",
+            ",".join(task.tags),
+            task.created_at.isoformat(),
+            task.updated_at.isoformat(),
+            task.completed_at.isoformat() if task.completed_at else "",
+        ])
+        yield last_row.row
+
+
+RENDERERS = {
+    "table": iter_table,
+    "jsonl": iter_jsonl,
+    "csv": iter_csv,
+}
+
+
+def write_lines(lines, stream=None):
+    """Write lines through a single buffer instead of one print() per line.
+
+    Returns the number of lines written.
+    """
+    stream = stream or sys.stdout
+    buffer = []
+    buffered = 0
+    count = 0
+    for line in lines:
+        buffer.append(line)
+        buffered += len(line) + 1
+        count += 1
+        if buffered >= BUFFER_SIZE:
+            buffer.append("")
+            stream.write("\n".join(buffer))
+            buffer = []
+            buffered = 0
+    if buffer:
+        buffer.append("")
+        stream.write("\n".join(buffer))
+    stream.flush()
+    return count
@@ -0,0 +1,93 @@
+# task_manager/search_benchmark.py
+"""Measure full-text search latency on a large synthetic store.
+
+Builds a TextIndex over ``--tasks`` synthetic tasks, then runs each query of
+a fixed mix ``--repeat`` times with the CLI's default limit and prints the
+median and slowest time per query. Exits with status 1 if a query's median
+is over ``--budget-ms``:
+
+    python search_benchmark.py --tasks 1000000 --budget-ms 10
+
+Titles and descriptions draw words from a Zipf-like vocabulary, so a few
+words are in a large share of the tasks and most words are rare. Queries
+that combine several words each found in over a tenth of the tasks, or
+prefixes with thousands of completions, read many more postings than the
+rest of the mix.
+"""
+import argparse
+import gc
+import itertools
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from indexes import TextIndex
+
+COMMON_WORDS = ["report", "review", "release", "deploy", "design", "meeting", "invoice", "backup",
+                "budget", "draft", "email", "plan", "test", "fix", "update", "migrate", "alpha", "beta"]
+
+QUERIES = ["report", "report alpha", "review budget draft", "re*", "re* alpha", "fix* w12*",
+           "w1234", "report w1234", "alpha beta", "missingword"]
+
+DEFAULT_LIMIT = 20
+
+
+def make_tasks(count, seed=0, vocabulary_size=20_000):
+    """Return ``count`` objects with ``id``, ``title`` and ``description``, the same for a seed."""
+    rng = random.Random(seed)
+    vocabulary = COMMON_WORDS + [f"w{i}" for i in range(vocabulary_size)]
+    cumulative_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    tasks = []
+    for i in range(count):
+        words = rng.choices(vocabulary, cum_weights=cumulative_weights, k=rng.randint(3, 25))
+        split = rng.randint(2, 6)
+        tasks.append(SimpleNamespace(id=f"{i:08x}", title=" ".join(words[:split]),
+                                     description=" ".join(words[split:])))
+    return tasks
+
+
+def time_query(index, query, limit, repeat):
+    """Return ``(median seconds, slowest seconds, result count)`` for one query."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = index.search(query, limit)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), max(times), len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure full-text search latency")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tasks = make_tasks(args.tasks, args.seed)
+    index = TextIndex()
+    index.rebuild(tasks)
+    del tasks
+    # A long-running process keeps the index for its lifetime; without this
+    # the collector keeps rescanning its millions of objects mid-query
+    gc.freeze()
+    print(f"Indexed {args.tasks:,} tasks, {len(index.terms):,} terms, in {time.perf_counter() - start:.1f}s")
+
+    over_budget = []
+    for query in QUERIES:
+        median, slowest, found = time_query(index, query, args.limit, args.repeat)
+        print(f"{query!r:24} median {median * 1000:7.2f}ms  slowest {slowest * 1000:7.2f}ms  {found} results")
+        if median * 1000 > args.budget_ms:
+            over_budget.append(query)
+    if over_budget:
+        print(f"Over the {args.budget_ms}ms budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
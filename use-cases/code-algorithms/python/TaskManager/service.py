@@ -0,0 +1,223 @@
+"""
+HTTP API for the Task Manager.
+
+Every request is served from one resident TaskManager, so all clients share
+a single in-memory, indexed store instead of each running cli.py. Calls go
+through an AsyncTaskManager: the store is only touched from its writer
+thread, and writes that arrive together are committed together.
+
+By default tasks live in memory only. Set TASK_SERVICE_STORAGE to a path to
+use the journaled tasks.json store instead.
+
+Run it with:
+    uvicorn service:app
+
+FastAPI is only needed for this module; the rest of the package does not
+depend on it.
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+try:
+    from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, status
+    from pydantic import BaseModel, Field
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise ImportError("The task service needs FastAPI: pip install fastapi uvicorn") from e
+
+from async_task_manager import AsyncTaskManager
+from memory_storage import MemoryTaskStorage
+from models import TaskPriority, TaskStatus
+from storage import TaskStorage
+from task_priority import calculate_task_score
+
+
+# Scores depend on today's date, so cached results expire even without changes
+CACHE_SECONDS = 60
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+# ─── Schemas ─────────────────────────────────────────────────
+
+class TaskCreate(BaseModel):
+    title: str = Field(..., min_length=1)
+    description: str = ""
+    priority: int = Field(TaskPriority.MEDIUM.value, ge=1, le=4)
+    due_date: Optional[str] = Field(None, description="YYYY-MM-DD")
+    tags: List[str] = []
+
+
+class TaskResponse(BaseModel):
+    id: str
+    title: str
+    description: str
+    status: str
+    priority: int
+    due_date: Optional[datetime] = None
+    tags: List[str]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+def task_to_response(task):
+    return TaskResponse(
+        id=task.id,
+        title=task.title,
+        description=task.description,
+        status=task.status.value,
+        priority=task.priority.value,
+        due_date=task.due_date,
+        tags=list(task.tags),
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        completed_at=task.completed_at,
+    )
+
+
+# ─── Resident Store ──────────────────────────────────────────
+
+class ResidentTaskManager(AsyncTaskManager):
+    """The service's shared AsyncTaskManager.
+
+    Ranking tasks can mean scoring every one of them, so top-priority results
+    are cached per limit. A change only drops a cached ranking if it could alter
+    it: the task was in the ranking, or now scores at least as high as the
+    last task in it. The cache lives on the writer thread, like the change
+    events that maintain it.
+    """
+
+    def __init__(self, storage, **kwargs):
+        super().__init__(storage=storage, **kwargs)
+        self._top_priority = {}
+        storage.add_listener(self._on_change)
+
+    def _on_change(self, op, task, changes):
+        if op == "reset":
+            self._top_priority.clear()
+            return
+        score = calculate_task_score(task) if op != "delete" else None
+        for limit, (_, _, task_ids, lowest_score) in list(self._top_priority.items()):
+            if task.id in task_ids or (score is not None and score >= lowest_score):
+                del self._top_priority[limit]
+
+    def _top_priority_tasks(self, limit):
+        now = time.monotonic()
+        entry = self._top_priority.get(limit)
+        if entry is None or now - entry[0] > CACHE_SECONDS:
+            tasks = self.task_manager.get_top_priority_tasks(limit)
+            # While the ranking is short any new task belongs in it
+            lowest_score = calculate_task_score(tasks[-1]) if len(tasks) == limit else float("-inf")
+            entry = self._top_priority[limit] = (now, tasks, {task.id for task in tasks}, lowest_score)
+        return entry[1]
+
+    def top_priority_tasks(self, limit):
+        return self.run(self._top_priority_tasks, limit)
+
+
+resident_manager = None
+
+
+def get_manager():
+    """FastAPI dependency returning the process-wide task manager."""
+    global resident_manager
+    if resident_manager is None:
+        storage_path = os.environ.get("TASK_SERVICE_STORAGE")
+        storage = TaskStorage(storage_path) if storage_path else MemoryTaskStorage()
+        resident_manager = ResidentTaskManager(storage)
+    return resident_manager
+
+
+# ─── CREATE ──────────────────────────────────────────────────
+
+@router.post(
+    "/",
+    response_model=TaskResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a task"
+)
+async def create_task(task: TaskCreate, manager: ResidentTaskManager = Depends(get_manager)):
+    """Create a task and return it, including its generated id."""
+    task_id = await manager.create_task(
+        task.title, task.description, task.priority, task.due_date, task.tags
+    )
+    if task_id is None:
+        raise HTTPException(status_code=422, detail="Invalid due_date. Use YYYY-MM-DD")
+    return task_to_response(await manager.get_task_details(task_id))
+
+
+# ─── READ (List) ─────────────────────────────────────────────
+
+@router.get(
+    "/",
+    response_model=TaskPage,
+    summary="List tasks, one page at a time"
+)
+async def list_tasks(
+    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[int] = Query(None, ge=1, le=4),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    manager: ResidentTaskManager = Depends(get_manager),
+):
+    """
+    List tasks in id order.
+
+    Pages are addressed by cursor rather than offset: pass the `next_cursor`
+    of one page to get the next, so each page costs the same however deep
+    into the list it is. `next_cursor` is null on the last page.
+    """
+    tasks, next_cursor = await manager.list_tasks_page(
+        cursor, limit, status_filter.value if status_filter else None, priority
+    )
+    return TaskPage(items=[task_to_response(task) for task in tasks], next_cursor=next_cursor)
+
+
+# ─── READ (Summaries) ────────────────────────────────────────
+
+@router.get("/stats", summary="Task statistics")
+async def get_statistics(manager: ResidentTaskManager = Depends(get_manager)):
+    return await manager.get_statistics()
+
+
+@router.get(
+    "/top-priority",
+    response_model=List[TaskResponse],
+    summary="The most important tasks"
+)
+async def get_top_priority(
+    limit: int = Query(5, ge=1, le=100),
+    manager: ResidentTaskManager = Depends(get_manager),
+):
+    """Return tasks ranked by calculate_task_score, highest first."""
+    return [task_to_response(task) for task in await manager.top_priority_tasks(limit)]
+
+
+# ─── READ (Single Item) ─────────────────────────────────────
+
+@router.get(
+    "/{task_id}",
+    response_model=TaskResponse,
+    summary="Get a task by id or unique id prefix"
+)
+async def get_task(task_id: str, manager: ResidentTaskManager = Depends(get_manager)):
+    try:
+        full_id = await manager.resolve_task_id(task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    task = await manager.get_task_details(full_id) if full_id else None
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return task_to_response(task)
+
+
+app = FastAPI(title="Task Manager")
+app.include_router(router)
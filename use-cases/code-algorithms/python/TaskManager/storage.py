@@ -1,20 +1,59 @@
 # task_manager/storage.py
+import copy
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
+import instrumentation
 from models import Task, TaskPriority, TaskStatus
+from indexes import DueCalendarIndex, TagIndex, TaskCountsIndex, TaskIdIndex, TextIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; fall back to unlocked access
+    fcntl = None
+
+DATETIME_FIELDS = ('created_at', 'updated_at', 'due_date', 'completed_at')
+
+
+def encode_field(key, value):
+    """Convert a task field to its JSON representation."""
+    if value is None:
+        return None
+    if key in ('priority', 'status'):
+        return value.value
+    if key in DATETIME_FIELDS:
+        return value.isoformat()
+    if key == 'tags':
+        return list(value)
+    return value
+
+
+def decode_field(key, value):
+    """Convert a JSON value back to a task field."""
+    if key == 'priority':
+        return TaskPriority(value)
+    if key == 'status':
+        return TaskStatus(value)
+    if key in DATETIME_FIELDS:
+        return datetime.fromisoformat(value) if value else None
+    if key == 'tags':
+        return value or []
+    return value
+
+
+class ArchivedTaskError(ValueError):
+    """Raised when a task read from the archive is modified; archived tasks are read-only."""
+
 
 class TaskEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Task):
-            task_dict = obj.__dict__.copy()
-            task_dict['priority'] = obj.priority.value
-            task_dict['status'] = obj.status.value
-            # Convert datetime objects to ISO format strings
-            for key in ['created_at', 'updated_at', 'due_date', 'completed_at']:
-                if task_dict.get(key) is not None:
-                    task_dict[key] = task_dict[key].isoformat()
-            return task_dict
+            return {
+                key: encode_field(key, value)
+                for key, value in obj.__dict__.items()
+                if not key.startswith('_')
+            }
         return super().default(obj)
 
 class TaskDecoder(json.JSONDecoder):
@@ -23,79 +62,612 @@ class TaskDecoder(json.JSONDecoder):
 
     def object_hook(self, obj):
         if 'id' in obj and 'title' in obj:
-            task = Task(obj['title'], obj.get('description', ''))
-            task.id = obj['id']
-            task.priority = TaskPriority(obj['priority'])
-            task.status = TaskStatus(obj['status'])
+            # Decoded values are the saved state, so they bypass change tracking
+            get = obj.get
+            created_at = get('created_at')
+            created_at = datetime.fromisoformat(created_at) if created_at else datetime.now()
+            updated_at = get('updated_at')
+            due_date = get('due_date')
+            completed_at = get('completed_at')
+            return Task.from_fields({
+                'id': obj['id'],
+                'title': obj['title'],
+                'description': get('description', ''),
+                'priority': TaskPriority(obj['priority']),
+                'status': TaskStatus(obj['status']),
+                'created_at': created_at,
+                'updated_at': datetime.fromisoformat(updated_at) if updated_at else created_at,
+                'due_date': datetime.fromisoformat(due_date) if due_date else None,
+                'completed_at': datetime.fromisoformat(completed_at) if completed_at else None,
+                'tags': get('tags') or [],
+                'version': get('version', 1),
+            })
+        return obj
 
-            # Convert ISO format strings to datetime objects
-            for key in ['created_at', 'updated_at', 'completed_at']:
-                if obj.get(key):
-                    setattr(task, key, datetime.fromisoformat(obj[key]))
+class TaskStorage:
+    """JSON task store that is safe to share between processes.
 
-            if obj.get('due_date'):
-                task.due_date = datetime.fromisoformat(obj['due_date'])
+    The snapshot file (``tasks.json``) is rewritten only on compaction; every
+    other mutation appends a record to a journal next to it: the whole task for
+    new tasks, and only the changed fields (see ``Task.get_changes``) for
+    updates. Mutations run under an advisory lock and first replay whatever
+    other writers appended, so concurrent CLI invocations don't lose each
+    other's changes.
 
-            task.tags = obj.get('tags', [])
-            return task
-        return obj
+    Listeners registered with ``add_listener`` receive every change, local or
+    replayed, as ``callback(op, task, changes)`` where ``op`` is ``"put"``,
+    ``"patch"`` (with ``{field: (old, new)}`` changes), ``"delete"`` or
+    ``"reset"`` (after a full reload; ``task`` is ``None``).
+    """
 
-class TaskStorage:
-    def __init__(self, storage_path="tasks.json"):
+    # Fold the journal back into the snapshot once it grows past this
+    COMPACT_AFTER_RECORDS = 1000
+
+    # Indexes kept current from the change feed, by attribute name. The full-text
+    # index is not one of them: it is built on the first search (see text_index).
+    INDEXES = (("id_index", TaskIdIndex), ("counts_index", TaskCountsIndex),
+               ("due_calendar", DueCalendarIndex), ("tag_index", TagIndex))
+
+    def __init__(self, storage_path="tasks.json", archive_path=None):
         self.storage_path = storage_path
+        self.journal_path = storage_path + ".journal"
+        self.lock_path = storage_path + ".lock"
+        self.archive_path = archive_path or storage_path + ".archive"
         self.tasks = {}
+        self._archive = None
+        self._listeners = []
+        for name, index_class in self.INDEXES:
+            setattr(self, name, index_class())
+        self._text_index = None
+        self._added = set()
+        self._removed = {}
+        self._dirty_ids = set()
+        self._generation = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._lock_file = None
+        self._lock_depth = 0
+        self._transaction_depth = 0
         self.load()
 
+    def _get_archive(self, create=False):
+        # Segments are only opened when a query can actually match them.
+        if self._archive is None:
+            if not create and not os.path.isdir(self.archive_path):
+                return None
+            from archive import TaskArchive
+            self._archive = TaskArchive(self.archive_path)
+        return self._archive
+
+    def _track(self, task):
+        # The task reports its first change, so commits never scan every task
+        task._on_dirty = self._mark_dirty
+        return task
+
+    def _mark_dirty(self, task):
+        self._dirty_ids.add(task.id)
+
+    @staticmethod
+    def _committed_state(task):
+        # Indexes have only seen committed values, so a task deleted with
+        # unsaved edits must leave them as it was last committed
+        if not task._changes:
+            return task
+        committed = copy.copy(task)
+        committed.__dict__.update(task._changes, _changes={})
+        return committed
+
+    @property
+    def text_index(self):
+        # Tokenizing every task is the most expensive rebuild, and most
+        # commands never search, so the index is built on first use and kept
+        # current from then on
+        if self._text_index is None:
+            with instrumentation.phase("storage.build_text_index"):
+                index = TextIndex()
+                index.rebuild(self.tasks.values())
+            self._text_index = index
+        return self._text_index
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, op, task, changes=None):
+        if op == "reset":
+            with instrumentation.phase("storage.rebuild_indexes"):
+                for name, _ in self.INDEXES:
+                    getattr(self, name).rebuild(self.tasks.values())
+            self._text_index = None
+        else:
+            for name, _ in self.INDEXES:
+                getattr(self, name).on_change(op, task, changes)
+            if self._text_index is not None:
+                self._text_index.on_change(op, task, changes)
+        for callback in self._listeners:
+            callback(op, task, changes)
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        # Reentrant advisory lock on a sidecar file; the outermost holder decides the mode.
+        if self._lock_depth == 0 and fcntl is not None:
+            self._lock_file = open(self.lock_path, 'a')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and self._lock_file is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _snapshot_generation(self):
+        try:
+            stat = os.stat(self.storage_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
     def load(self):
-        if os.path.exists(self.storage_path):
+        with instrumentation.phase("storage.load"):
             try:
-                with open(self.storage_path, 'r') as f:
-                    tasks_data = json.load(f, cls=TaskDecoder)
-                    if isinstance(tasks_data, list):
-                        for task in tasks_data:
-                            self.tasks[task.id] = task
+                with self._locked(exclusive=False):
+                    self._load_snapshot()
+                    self._read_journal()
             except Exception as e:
                 print(f"Error loading tasks: {e}")
+            self._notify("reset", None)
 
-    def save(self):
+    def _load_snapshot(self):
+        self.tasks = {}
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._generation = self._snapshot_generation()
+        if self._generation is None:
+            return
+        with instrumentation.phase("storage.decode_snapshot"):
+            with open(self.storage_path, 'r') as f:
+                tasks_data = json.load(f, cls=TaskDecoder)
+            if isinstance(tasks_data, list):
+                for task in tasks_data:
+                    self.tasks[task.id] = self._track(task)
+                instrumentation.count("tasks_decoded", len(tasks_data))
+            instrumentation.count("bytes_read", self._generation[2])
+
+    def _apply_fields(self, task, fields, skip=()):
+        # Remote values bypass change tracking so they aren't written back as local edits
+        changes = {}
+        for key, value in fields.items():
+            if key in skip:
+                continue
+            old_value = task.__dict__.get(key)
+            if old_value != value:
+                changes[key] = (old_value, value)
+                task.__dict__[key] = value
+        return changes
+
+    def _merge_version(self, task, remote_version):
+        # Versions only go up: the newer of the two saved versions, plus the
+        # local changes that are not saved yet
+        base = max(task.saved_version, remote_version)
+        version = base + task.version - task.saved_version
+        task.__dict__["_saved_version"] = base
+        if version == task.version:
+            return {}
+        old_version, task.__dict__["version"] = task.version, version
+        return {"version": (old_version, version)}
+
+    def _read_journal(self, keep=None, notify=False):
+        """Replay journal records appended since the last read.
+
+        ``keep`` maps task ids with unsaved local edits to their dirty fields
+        (``None`` for tasks added or deleted locally); those edits win.
+        """
+        keep = keep or {}
         try:
-            with open(self.storage_path, 'w') as f:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Only consume complete lines; a writer may be mid-append
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        records_before = self._journal_records
+        with instrumentation.phase("storage.replay_journal"):
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line, cls=TaskDecoder)
+                except ValueError as e:
+                    print(f"Skipping corrupt journal record: {e}")
+                    continue
+                self._journal_records += 1
+                self._replay(record, keep, notify)
+            self._journal_offset += end
+        instrumentation.count("bytes_read", end)
+        instrumentation.count("journal_records_read", self._journal_records - records_before)
+
+    def _replay(self, record, keep, notify):
+        op = record["op"]
+        task_id = record["task"].id if op == "put" else record["id"]
+        if task_id in keep and keep[task_id] is None:
+            return
+        local = self.tasks.get(task_id)
+
+        if op == "delete":
+            if local is not None:
+                del self.tasks[task_id]
+                if notify:
+                    self._notify("delete", self._committed_state(local))
+            return
+
+        if op == "put":
+            remote = record["task"]
+            if local is None or task_id not in keep:
+                self.tasks[task_id] = self._track(remote)
+                if notify:
+                    if local is not None:
+                        self._notify("delete", local)
+                    self._notify("put", remote)
+                return
+            fields = {key: value for key, value in remote.__dict__.items() if not key.startswith('_')}
+        else:
+            if local is None:
+                return
+            fields = {key: decode_field(key, value) for key, value in record["fields"].items()}
+            fields["version"] = record["version"]
+
+        fields.pop("id", None)
+        remote_version = fields.pop("version")
+        changes = self._apply_fields(local, fields, skip=keep.get(task_id, ()))
+        changes.update(self._merge_version(local, remote_version))
+        if notify and changes:
+            self._notify("patch", local, changes)
+
+    def refresh(self, keep=None):
+        """Pick up changes made by other processes.
+
+        A cheap stat of the snapshot decides whether a full reload is needed;
+        otherwise only the unseen tail of the journal is read. Tasks listed in
+        ``keep`` have unsaved local edits that are not overwritten.
+        """
+        keep = keep or {}
+        journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        if self._snapshot_generation() == self._generation and journal_size >= self._journal_offset:
+            self._read_journal(keep, notify=True)
+            return
+
+        local = {task_id: self.tasks.get(task_id) for task_id in keep}
+        self._load_snapshot()
+        self._read_journal()
+        for task_id, task in local.items():
+            fresh = self.tasks.get(task_id)
+            if task is None or keep[task_id] is None:
+                if task is None:
+                    self.tasks.pop(task_id, None)
+                else:
+                    self.tasks[task_id] = task
+            elif fresh is not None:
+                # Keep the caller's object, bring in fields edited elsewhere
+                fields = {key: value for key, value in fresh.__dict__.items() if not key.startswith('_')}
+                remote_version = fields.pop("version")
+                self._apply_fields(task, fields, skip=keep[task_id])
+                self._merge_version(task, remote_version)
+                self.tasks[task_id] = task
+        self._notify("reset", None)
+
+    def _collect_changes(self):
+        """Return ``{task_id: dirty fields}``; ``None`` marks a task added or deleted locally."""
+        changes = dict.fromkeys(self._added)
+        changes.update(dict.fromkeys(self._removed))
+        for task_id in self._dirty_ids:
+            task = self.tasks.get(task_id)
+            if task is not None and task._changes and task_id not in changes:
+                changes[task_id] = set(task._changes)
+        return changes
+
+    def _append_journal(self, changes):
+        events = []
+        for task_id in changes:
+            if task_id in self._removed:
+                events.append(("delete", self._removed[task_id], None))
+                continue
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue  # deleted by another process meanwhile
+            if task_id in self._added:
+                events.append(("put", task, None))
+            else:
+                events.append(("patch", task, task.get_changes()))
+
+        if events:
+            self._write_journal(self._encode_records(events))
+
+        for task_id in changes:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task.clear_changes()
+        self._added.clear()
+        self._removed.clear()
+        self._dirty_ids.clear()
+        for op, task, task_changes in events:
+            self._notify(op, task, task_changes)
+
+    def _encode_records(self, events):
+        """Encode the ``(op, task, changes)`` events of one commit as journal records."""
+        records = []
+        encoder = TaskEncoder()
+        for op, task, task_changes in events:
+            if op == "delete":
+                records.append({"op": "delete", "id": task.id})
+            elif op == "put":
+                records.append({"op": "put", "task": encoder.default(task)})
+            else:
+                records.append({
+                    "op": "patch",
+                    "id": task.id,
+                    "version": task.version,
+                    "fields": {key: encode_field(key, new) for key, (old, new) in task_changes.items()}
+                })
+        return records
+
+    def _write_journal(self, records):
+        with instrumentation.phase("storage.write_journal"):
+            data = "".join(json.dumps(record) + "\n" for record in records).encode('utf-8')
+            # One write per commit keeps appends from interleaving with other writers
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._journal_offset += len(data)
+        self._journal_records += len(records)
+        instrumentation.count("bytes_written", len(data))
+        instrumentation.count("journal_records_written", len(records))
+
+    def _write_snapshot(self):
+        tmp_path = self.storage_path + ".tmp"
+        with instrumentation.phase("storage.write_snapshot"):
+            with open(tmp_path, 'w') as f:
                 json.dump(list(self.tasks.values()), f, cls=TaskEncoder, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+                instrumentation.count("bytes_written", f.tell())
+            os.replace(tmp_path, self.storage_path)
+        instrumentation.count("tasks_encoded", len(self.tasks))
+        with open(self.journal_path, 'w'):
+            pass
+        self._generation = self._snapshot_generation()
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    def compact(self):
+        """Rewrite the snapshot with the current tasks and truncate the journal."""
+        with self._locked():
+            self._commit()
+            self._write_snapshot()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the lock across a read-modify-write and commit once at the end."""
+        with self._locked():
+            if self._transaction_depth == 0:
+                self.refresh(keep=self._collect_changes())
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._commit()
+
+    def _commit(self):
+        with instrumentation.phase("storage.commit"):
+            changes = self._collect_changes()
+            self.refresh(keep=changes)
+            if changes:
+                self._append_journal(changes)
+            if self._journal_records > max(self.COMPACT_AFTER_RECORDS, len(self.tasks)):
+                self._write_snapshot()
+
+    def save(self):
+        if self._transaction_depth:
+            return  # committed when the outermost transaction ends
+        try:
+            with self._locked():
+                self._commit()
         except Exception as e:
             print(f"Error saving tasks: {e}")
 
     def add_task(self, task):
-        self.tasks[task.id] = task
+        self.tasks[task.id] = self._track(task)
+        self._added.add(task.id)
         self.save()
         return task.id
 
+    def _remove_task(self, task_id):
+        task = self.tasks.pop(task_id)
+        task._on_dirty = None
+        if task_id in self._added:
+            self._added.discard(task_id)
+        else:
+            self._removed[task_id] = self._committed_state(task)
+        return task
+
     def get_task(self, task_id):
-        return self.tasks.get(task_id)
+        """Return a task by id, looking in the archive if it is not a hot task."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            archive = self._get_archive()
+            task = archive.get_task(task_id) if archive is not None else None
+            if task is not None:
+                task._on_dirty = self._reject_archived_edit
+        return task
+
+    def _reject_archived_edit(self, task):
+        raise ArchivedTaskError(f"Task {task.id} is archived and cannot be changed")
+
+    def _count_scan(self):
+        # A query that has to look at every hot task rather than an index
+        instrumentation.count("scans")
+        instrumentation.count("tasks_scanned", len(self.tasks))
+
+    def find_task_ids(self, prefix, limit=None):
+        instrumentation.count("index_hits")
+        matches = self.id_index.find(prefix, limit)
+        archive = self._get_archive()
+        if archive is not None:
+            matches = sorted(set(matches).union(archive.find_ids(prefix, limit)))[:limit]
+        return matches
+
+    def search_tasks(self, query, limit=None, status=None, priority=None):
+        """Full-text search over hot (not archived) tasks, ranked by relevance."""
+        def accept(task_id):
+            task = self.tasks[task_id]
+            return ((status is None or task.status == status)
+                    and (priority is None or task.priority == priority))
+
+        filtered = status is not None or priority is not None
+        instrumentation.count("index_hits")
+        ranked = self.text_index.search(query, limit, accept if filtered else None)
+        return [self.tasks[task_id] for _, task_id in ranked]
+
+    def page_tasks(self, after=None, limit=50, status=None, priority=None):
+        """Return one page of hot tasks in id order, for cursor-based pagination.
+
+        Returns ``(tasks, next_cursor)``: up to ``limit`` tasks with ids after
+        ``after`` that match the filters, and the cursor for the following
+        page, or None when there are no more tasks.
+        """
+        page = []
+        instrumentation.count("index_hits")
+        for task_id in self.id_index.iter_after(after):
+            if len(page) == limit:
+                return page, page[-1].id
+            task = self.tasks[task_id]
+            if status is not None and task.status != status:
+                continue
+            if priority is not None and task.priority != priority:
+                continue
+            page.append(task)
+        return page, None
 
     def update_task(self, task_id, **kwargs):
-        task = self.get_task(task_id)
-        if task:
-            task.update(**kwargs)
-            self.save()
-            return True
-        return False
+        with self.transaction():
+            task = self.get_task(task_id)
+            if task:
+                task.update(**kwargs)
+                return True
+            return False
 
     def delete_task(self, task_id):
-        if task_id in self.tasks:
-            del self.tasks[task_id]
-            self.save()
-            return True
-        return False
+        with self.transaction():
+            if task_id in self.tasks:
+                self._remove_task(task_id)
+                return True
+            return False
+
+    def get_all_tasks(self, include_archived=False):
+        tasks = list(self.tasks.values())
+        if include_archived:
+            tasks.extend(self.get_archived_tasks())
+        return tasks
+
+    def get_tasks_by_status(self, status, include_archived=None):
+        # Archived tasks are all done, so a done filter includes them by default.
+        self._count_scan()
+        tasks = [task for task in self.tasks.values() if task.status == status]
+        if include_archived is None:
+            include_archived = status == TaskStatus.DONE
+        if include_archived:
+            tasks.extend(self.get_archived_tasks(status=status))
+        return tasks
+
+    def get_tasks_by_priority(self, priority, include_archived=False):
+        self._count_scan()
+        tasks = [task for task in self.tasks.values() if task.priority == priority]
+        if include_archived:
+            tasks.extend(self.get_archived_tasks(priority=priority))
+        return tasks
+
+    def iter_tasks(self, status=None, priority=None, overdue=False, include_archived=None):
+        """Lazily yield tasks matching every given filter.
 
-    def get_all_tasks(self):
-        return list(self.tasks.values())
+        As with get_tasks_by_status, a done filter includes archived tasks
+        unless ``include_archived`` says otherwise. Overdue tasks come from the
+        due calendar, most overdue first.
+        """
+        if overdue:
+            instrumentation.count("index_hits")
+            tasks = (self.tasks[task_id] for task_id in self.due_calendar.iter_due_before(datetime.now()))
+        else:
+            self._count_scan()
+            tasks = self.tasks.values()
+        for task in tasks:
+            if status is not None and task.status != status:
+                continue
+            if priority is not None and task.priority != priority:
+                continue
+            yield task
 
-    def get_tasks_by_status(self, status):
-        return [task for task in self.tasks.values() if task.status == status]
+        if include_archived is None:
+            include_archived = status == TaskStatus.DONE
+        if include_archived and not overdue:
+            archive = self._get_archive()
+            if archive is not None and status in (None, TaskStatus.DONE):
+                for task in archive.iter_tasks():
+                    if task.id not in self.tasks and (priority is None or task.priority == priority):
+                        yield task
 
-    def get_tasks_by_priority(self, priority):
-        return [task for task in self.tasks.values() if task.priority == priority]
+    def get_tasks_by_tag(self, tag):
+        instrumentation.count("index_hits")
+        return [self.tasks[task_id] for task_id in self.tag_index.task_ids.get(tag, ())]
 
     def get_overdue_tasks(self):
-        return [task for task in self.tasks.values() if task.is_overdue()]
+        return list(self.iter_tasks(overdue=True))
+
+    def get_tasks_due_before(self, moment):
+        """Return open tasks due before ``moment``, earliest day first."""
+        instrumentation.count("index_hits")
+        return [self.tasks[task_id] for task_id in self.due_calendar.iter_due_before(moment)]
+
+    def archive_completed_tasks(self, completed_before):
+        """Move tasks completed before the cutoff into a new archive segment."""
+        with self.transaction():
+            self._count_scan()
+            to_archive = [
+                task for task in self.tasks.values()
+                if task.status == TaskStatus.DONE
+                and task.completed_at and task.completed_at < completed_before
+            ]
+            if not to_archive:
+                return 0
+
+            self._get_archive(create=True).append(to_archive)
+            for task in to_archive:
+                self._remove_task(task.id)
+            return len(to_archive)
+
+    def get_archived_tasks(self, status=None, priority=None):
+        archive = self._get_archive()
+        if archive is None or (status is not None and status != TaskStatus.DONE):
+            return []
+        # A crash between writing a segment and saving the hot file can leave
+        # a task in both places; the hot copy wins.
+        return [
+            task for task in archive.iter_tasks()
+            if task.id not in self.tasks
+            and (priority is None or task.priority == priority)
+        ]
 
+    def get_archive_statistics(self):
+        archive = self._get_archive()
+        if archive is None:
+            return None
+        return archive.get_statistics()
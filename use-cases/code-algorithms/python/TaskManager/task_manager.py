@@ -1,13 +1,25 @@
-import argparse
 from datetime import datetime, timedelta
 
+import instrumentation
+from indexes import DueCalendarIndex, TagIndex, TaskCountsIndex
 from models import TaskPriority, Task, TaskStatus
 from storage import TaskStorage
+from task_priority import (DUE_SOON_DAYS, calculate_task_score, get_top_priority_tasks,
+                           score_ceiling_without_due_date)
+
+
+# Indexes get_statistics reads, by storage attribute name
+STATISTICS_INDEXES = (("counts_index", TaskCountsIndex), ("due_calendar", DueCalendarIndex),
+                      ("tag_index", TagIndex))
+
+# Number of tags listed in the statistics
+TOP_TAGS = 10
 
 
 class TaskManager:
-    def __init__(self, storage_path="tasks.json"):
-        self.storage = TaskStorage(storage_path)
+    def __init__(self, storage_path="tasks.json", storage=None):
+        # Pass a storage (such as MemoryTaskStorage) to use it instead of the JSON file
+        self.storage = storage if storage is not None else TaskStorage(storage_path)
 
     def create_task(self, title, description="", priority_value=2,
                    due_date_str=None, tags=None):
@@ -24,19 +36,50 @@ class TaskManager:
         task_id = self.storage.add_task(task)
         return task_id
 
-    def list_tasks(self, status_filter=None, priority_filter=None, show_overdue=False):
+    def list_tasks(self, status_filter=None, priority_filter=None, show_overdue=False,
+                   include_archived=False):
         if show_overdue:
             return self.storage.get_overdue_tasks()
 
+        archived = {"include_archived": True} if include_archived else {}
+
         if status_filter:
             status = TaskStatus(status_filter)
-            return self.storage.get_tasks_by_status(status)
+            return self.storage.get_tasks_by_status(status, **archived)
 
         if priority_filter:
             priority = TaskPriority(priority_filter)
-            return self.storage.get_tasks_by_priority(priority)
+            return self.storage.get_tasks_by_priority(priority, **archived)
+
+        return self.storage.get_all_tasks(**archived)
+
+    def iter_tasks(self, status_filter=None, priority_filter=None, show_overdue=False,
+                   include_archived=False):
+        """Like list_tasks, but yields matching tasks without building a list."""
+        if show_overdue:
+            return self.storage.iter_tasks(overdue=True)
+        status = TaskStatus(status_filter) if status_filter else None
+        priority = TaskPriority(priority_filter) if priority_filter and not status else None
+        return self.storage.iter_tasks(status, priority, include_archived=include_archived or None)
 
-        return self.storage.get_all_tasks()
+    def search(self, query, status_filter=None, priority_filter=None, limit=None):
+        """Find tasks whose title or description match every term of the query.
+
+        Terms ending in ``*`` match as prefixes. Results are ordered by relevance.
+        """
+        status = TaskStatus(status_filter) if status_filter else None
+        priority = TaskPriority(priority_filter) if priority_filter else None
+        return self.storage.search_tasks(query, limit, status, priority)
+
+    def list_tasks_page(self, cursor=None, limit=50, status_filter=None, priority_filter=None):
+        """Return ``(tasks, next_cursor)`` for one page of hot tasks in id order.
+
+        Pass the returned cursor back to get the next page; it is None after
+        the last page.
+        """
+        status = TaskStatus(status_filter) if status_filter else None
+        priority = TaskPriority(priority_filter) if priority_filter else None
+        return self.storage.page_tasks(cursor, limit, status, priority)
 
     def update_task_status(self, task_id, new_status_value):
         new_status = TaskStatus(new_status_value)
@@ -64,6 +107,17 @@ class TaskManager:
     def delete_task(self, task_id):
         return self.storage.delete_task(task_id)
 
+    def resolve_task_id(self, task_id_prefix):
+        """Expand a unique id prefix to a full task id, or None if nothing matches."""
+        matches = self.storage.find_task_ids(task_id_prefix, limit=5)
+        if len(matches) > 1:
+            raise ValueError(
+                f"Ambiguous task id '{task_id_prefix}' matches: "
+                + ", ".join(match[:12] for match in matches)
+                + (", ..." if len(matches) == 5 else "")
+            )
+        return matches[0] if matches else None
+
     def get_task_details(self, task_id):
         return self.storage.get_task(task_id)
 
@@ -71,7 +125,8 @@ class TaskManager:
         task = self.storage.get_task(task_id)
         if task:
             if tag not in task.tags:
-                task.tags.append(tag)
+                # Reassign so the change is tracked and persisted as a field delta
+                task.tags = task.tags + [tag]
                 self.storage.save()
             return True
         return False
@@ -79,40 +134,175 @@ class TaskManager:
     def remove_tag_from_task(self, task_id, tag):
         task = self.storage.get_task(task_id)
         if task and tag in task.tags:
-            task.tags.remove(tag)
+            task.tags = [existing for existing in task.tags if existing != tag]
             self.storage.save()
             return True
         return False
 
-    def get_statistics(self):
+    def archive_completed_tasks(self, older_than_days=30):
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        return self.storage.archive_completed_tasks(cutoff)
+
+    def _select_tasks(self, query):
+        # Bulk operations only touch hot tasks; archived segments are read-only
+        status_filter = query.get("status_filter")
+        priority_filter = query.get("priority_filter")
+        with instrumentation.phase("manager.select"):
+            matches = list(self.storage.iter_tasks(
+                TaskStatus(status_filter) if status_filter else None,
+                TaskPriority(priority_filter) if priority_filter else None,
+                overdue=query.get("show_overdue", False),
+                include_archived=False
+            ))
+            # Go through get_task, which hands out tasks that are safe to modify
+            return [self.storage.get_task(task.id) for task in matches]
+
+    def bulk_update(self, query, **changes):
+        """Apply changes to every task matching the query in one storage transaction.
+
+        ``query`` holds the list_tasks filters (``status_filter``,
+        ``priority_filter``, ``show_overdue``); unlike list_tasks they are
+        combined. ``changes`` take the same values as the single-task updates:
+        a status value, a priority value, a YYYY-MM-DD ``due_date``, or any other
+        task field. Returns the number of tasks updated.
+        """
+        if "status" in changes:
+            changes["status"] = TaskStatus(changes["status"])
+        if "priority" in changes:
+            changes["priority"] = TaskPriority(changes["priority"])
+        if changes.get("due_date"):
+            changes["due_date"] = datetime.strptime(changes["due_date"], "%Y-%m-%d")
+
+        with self.storage.transaction():
+            tasks = self._select_tasks(query)
+            for task in tasks:
+                fields = dict(changes)
+                if fields.get("status") == TaskStatus.DONE and task.status != TaskStatus.DONE:
+                    del fields["status"]
+                    task.mark_as_done()
+                task.update(**fields)
+        return len(tasks)
+
+    def bulk_add_tag(self, query, tag):
+        """Add a tag to every matching task; returns the number of tasks changed."""
+        changed = 0
+        with self.storage.transaction():
+            for task in self._select_tasks(query):
+                if tag not in task.tags:
+                    task.tags = task.tags + [tag]
+                    changed += 1
+        return changed
+
+    def bulk_delete(self, query):
+        """Delete every matching task; returns the number of tasks deleted."""
+        with self.storage.transaction():
+            tasks = self._select_tasks(query)
+            for task in tasks:
+                self.storage.delete_task(task.id)
+        return len(tasks)
+
+    def get_due_calendar(self, start=None, days=30):
+        """Return ``{day: {"count": n, "task_ids": [...]}}`` for open tasks due on each day.
+
+        ``start`` is a date, datetime or YYYY-MM-DD string and defaults to today.
+        Every day of the range is present, including days with nothing due.
+        """
+        if start is None:
+            start = datetime.now().date()
+        elif isinstance(start, str):
+            start = datetime.strptime(start, "%Y-%m-%d").date()
+        elif isinstance(start, datetime):
+            start = start.date()
+
+        calendar = {}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            task_ids = list(self.storage.due_calendar.day(day))
+            calendar[day] = {"count": len(task_ids), "task_ids": task_ids}
+        return calendar
+
+    def get_top_priority_tasks(self, limit=5):
+        """Return the highest scoring hot tasks, as task_priority ranks them.
+
+        Only open tasks due within DUE_SOON_DAYS earn a due date bonus, and the
+        due calendar lists those without a scan. If enough of them outscore
+        anything the remaining tasks could reach, the rest are never scored;
+        tasks with equal scores are then ordered by due date rather than by
+        storage order.
+        """
+        with instrumentation.phase("manager.top_priority"):
+            # A spare day covers the clock moving on while the candidates are scored
+            due_soon = self.storage.get_tasks_due_before(datetime.now() + timedelta(days=DUE_SOON_DAYS + 2))
+            ranked = get_top_priority_tasks(due_soon, limit)
+            ceiling = max(
+                (score_ceiling_without_due_date(priority)
+                 for priority, count in self.storage.counts_index.by_priority.items() if count),
+                default=0
+            )
+            if len(ranked) == limit and calculate_task_score(ranked[-1]) > ceiling:
+                return ranked
+            instrumentation.count("scans")
+            tasks = self.storage.get_all_tasks()
+            instrumentation.count("tasks_scanned", len(tasks))
+            return get_top_priority_tasks(tasks, limit)
+
+    def _statistics_indexes(self):
+        # Storage keeps these indexes current; build them from scratch if it does not
+        indexes = [getattr(self.storage, name, None) for name, _ in STATISTICS_INDEXES]
+        if all(isinstance(index, index_class) for index, (_, index_class) in zip(indexes, STATISTICS_INDEXES)):
+            instrumentation.count("index_hits")
+            return indexes
         tasks = self.storage.get_all_tasks()
-        total = len(tasks)
+        instrumentation.count("scans")
+        instrumentation.count("tasks_scanned", len(tasks))
+        indexes = []
+        for _, index_class in STATISTICS_INDEXES:
+            index = index_class()
+            index.rebuild(tasks)
+            indexes.append(index)
+        return indexes
 
-        # Count by status
-        status_counts = {status.value: 0 for status in TaskStatus}
-        for task in tasks:
-            status_counts[task.status.value] += 1
+    def get_statistics(self):
+        with instrumentation.phase("manager.statistics"):
+            return self._get_statistics()
+
+    def _get_statistics(self):
+        counts, calendar, tag_index = self._statistics_indexes()
 
-        # Count by priority
-        priority_counts = {priority.name: 0 for priority in TaskPriority}
-        for task in tasks:
-            priority_counts[task.priority.name] += 1
+        status_counts = {status.value: count for status, count in counts.by_status.items()}
+        priority_counts = {priority.name: count for priority, count in counts.by_priority.items()}
+        total = sum(status_counts.values())
 
-        # Count overdue
-        overdue_count = len([task for task in tasks if task.is_overdue()])
+        now = datetime.now()
+        overdue_count = calendar.count_due_before(now)
 
         # Count completed in last 7 days
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        completed_recently = len([
-            task for task in tasks
-            if task.completed_at and task.completed_at >= seven_days_ago
-        ])
+        seven_days_ago = now - timedelta(days=7)
+        completed_recently = counts.count_completed_since(seven_days_ago)
+
+        # Merge the precomputed counters of archived (always done) tasks
+        get_archive_statistics = getattr(self.storage, "get_archive_statistics", None)
+        archived = get_archive_statistics() if get_archive_statistics is not None else None
+        # Only a storage with an archive has counters to merge
+        if isinstance(archived, dict):
+            total += archived["total"]
+            status_counts[TaskStatus.DONE.value] += archived["total"]
+            for priority_name, count in archived["by_priority"].items():
+                priority_counts[priority_name] += count
+            # Archive counters are kept per day, so the boundary day counts in full
+            since_day = seven_days_ago.date().isoformat()
+            completed_recently += sum(
+                count for day, count in archived["completed_by_day"].items()
+                if day >= since_day
+            )
 
         return {
             "total": total,
             "by_status": status_counts,
             "by_priority": priority_counts,
             "overdue": overdue_count,
-            "completed_last_week": completed_recently
+            "completed_last_week": completed_recently,
+            # Most used tags, counting open (not done) tasks
+            "by_tag": dict(tag_index.top_open(TOP_TAGS))
         }
 
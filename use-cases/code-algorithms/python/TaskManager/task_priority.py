@@ -1,31 +1,51 @@
 from datetime import datetime
 
+import instrumentation
 from models import TaskStatus, TaskPriority
 
+# Base priority weights
+PRIORITY_WEIGHTS = {
+    TaskPriority.LOW: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.HIGH: 4,
+    TaskPriority.URGENT: 6
+}
+
+# Due date bands as (most days until due, bonus), checked in order
+DUE_DATE_BANDS = (
+    (-1, 35),  # Overdue tasks
+    (0, 20),   # Due today
+    (2, 15),   # Due in next 2 days
+    (7, 10),   # Due in next week
+)
+
+# Tasks due further out than this get no due date bonus
+DUE_SOON_DAYS = DUE_DATE_BANDS[-1][0]
+
+TAG_BONUS = 8
+RECENT_UPDATE_BONUS = 5
+
+
+def due_date_bonus(days_until_due):
+    for max_days, bonus in DUE_DATE_BANDS:
+        if days_until_due <= max_days:
+            return bonus
+    return 0
+
+
+def score_ceiling_without_due_date(priority):
+    """The highest score a task of this priority can reach without a due date bonus."""
+    return PRIORITY_WEIGHTS.get(priority, 0) * 10 + TAG_BONUS + RECENT_UPDATE_BONUS
+
+
 def calculate_task_score(task):
     """Calculate a priority score for a task based on multiple factors."""
-    # Base priority weights
-    priority_weights = {
-        TaskPriority.LOW: 1,
-        TaskPriority.MEDIUM: 2,
-        TaskPriority.HIGH: 4,
-        TaskPriority.URGENT: 6
-    }
-
     # Calculate base score from priority
-    score = priority_weights.get(task.priority, 0) * 10
+    score = PRIORITY_WEIGHTS.get(task.priority, 0) * 10
 
     # Add due date factor (higher score for tasks due sooner)
     if task.due_date:
-        days_until_due = (task.due_date - datetime.now()).days
-        if days_until_due < 0:  # Overdue tasks
-            score += 35
-        elif days_until_due == 0:  # Due today
-            score += 20
-        elif days_until_due <= 2:  # Due in next 2 days
-            score += 15
-        elif days_until_due <= 7:  # Due in next week
-            score += 10
+        score += due_date_bonus((task.due_date - datetime.now()).days)
 
     # Reduce score for tasks that are completed or in review
     if task.status == TaskStatus.DONE:
@@ -35,18 +55,20 @@ def calculate_task_score(task):
 
     # Boost score for tasks with certain tags
     if any(tag in ["blocker", "critical", "urgent"] for tag in task.tags):
-        score += 8
+        score += TAG_BONUS
 
     # Boost score for recently updated tasks
     days_since_update = (datetime.now() - task.updated_at).days
     if days_since_update < 1:
-        score += 5
+        score += RECENT_UPDATE_BONUS
 
     return score
 
 def sort_tasks_by_importance(tasks):
     """Sort tasks by calculated importance score (highest first)."""
-    task_scores = [(calculate_task_score(task), task) for task in tasks]
+    with instrumentation.phase("priority.score"):
+        task_scores = [(calculate_task_score(task), task) for task in tasks]
+    instrumentation.count("tasks_scored", len(task_scores))
     # Use key parameter to tell sorted() to only compare the scores (first element of tuple)
     sorted_tasks = [task for _, task in sorted(task_scores, key=lambda x: x[0], reverse=True)]
     return sorted_tasks
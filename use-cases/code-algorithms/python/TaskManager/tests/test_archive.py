@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from models import Task, TaskStatus, TaskPriority
+from storage import ArchivedTaskError, TaskStorage
+from task_manager import TaskManager
+
+
+class TaskArchiveTest(unittest.TestCase):
+    def setUp(self):
+        """Set up a storage file with old completed, recent completed and open tasks."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+        self.now = datetime.now()
+
+        storage = TaskStorage(self.storage_path)
+        self.old_done = Task("Old Done", priority=TaskPriority.HIGH)
+        self.old_done.mark_as_done()
+        self.old_done.completed_at = self.now - timedelta(days=60)
+        self.recent_done = Task("Recent Done")
+        self.recent_done.mark_as_done()
+        self.open_task = Task("Open Task", priority=TaskPriority.HIGH)
+        for task in [self.old_done, self.recent_done, self.open_task]:
+            storage.add_task(task)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_archive_moves_old_completed_tasks_out_of_hot_set(self):
+        """Test that only tasks completed before the cutoff are archived."""
+        storage = TaskStorage(self.storage_path)
+        archived = storage.archive_completed_tasks(self.now - timedelta(days=30))
+
+        self.assertEqual(archived, 1)
+        self.assertNotIn(self.old_done.id, storage.tasks)
+
+        # The hot file no longer contains the archived task
+        reloaded = TaskStorage(self.storage_path)
+        self.assertEqual(set(reloaded.tasks), {self.recent_done.id, self.open_task.id})
+
+    def test_archive_is_not_opened_without_matching_filter(self):
+        """Test that listing open tasks never touches the archive segments."""
+        TaskStorage(self.storage_path).archive_completed_tasks(self.now - timedelta(days=30))
+
+        storage = TaskStorage(self.storage_path)
+        todo_tasks = storage.get_tasks_by_status(TaskStatus.TODO)
+
+        self.assertEqual([task.id for task in todo_tasks], [self.open_task.id])
+        self.assertIsNone(storage._archive)
+
+    def test_archived_tasks_are_queried_transparently(self):
+        """Test that done and include_archived queries return archived tasks."""
+        TaskStorage(self.storage_path).archive_completed_tasks(self.now - timedelta(days=30))
+        task_manager = TaskManager(self.storage_path)
+
+        done_ids = {task.id for task in task_manager.list_tasks(status_filter="done")}
+        self.assertEqual(done_ids, {self.old_done.id, self.recent_done.id})
+
+        high_ids = {task.id for task in task_manager.list_tasks(priority_filter=3)}
+        self.assertEqual(high_ids, {self.open_task.id})
+
+        high_ids = {task.id for task in task_manager.list_tasks(priority_filter=3, include_archived=True)}
+        self.assertEqual(high_ids, {self.open_task.id, self.old_done.id})
+
+        self.assertEqual(len(task_manager.list_tasks(include_archived=True)), 3)
+
+    def test_archived_tasks_are_found_by_id(self):
+        """Test that id and id prefix lookups fall back to the archive."""
+        TaskStorage(self.storage_path).archive_completed_tasks(self.now - timedelta(days=30))
+        task_manager = TaskManager(self.storage_path)
+
+        full_id = task_manager.resolve_task_id(self.old_done.id[:8])
+        self.assertEqual(full_id, self.old_done.id)
+        task = task_manager.get_task_details(full_id)
+        self.assertEqual(task.title, "Old Done")
+        self.assertIsNone(task_manager.get_task_details("no-such-task"))
+
+        # Archived tasks are read-only
+        with self.assertRaises(ArchivedTaskError):
+            task_manager.update_task_priority(full_id, 4)
+        with self.assertRaises(ArchivedTaskError):
+            task_manager.add_tag_to_task(full_id, "reopened")
+        self.assertFalse(task_manager.delete_task(full_id))
+
+    def test_statistics_merge_archive_counters(self):
+        """Test that get_statistics includes archived tasks via the manifest counters."""
+        task_manager = TaskManager(self.storage_path)
+        before = task_manager.get_statistics()
+
+        task_manager.archive_completed_tasks(older_than_days=30)
+        after = task_manager.get_statistics()
+
+        self.assertEqual(before, after)
+        self.assertEqual(after["total"], 3)
+        self.assertEqual(after["by_status"]["done"], 2)
+        self.assertEqual(after["by_priority"]["HIGH"], 2)
+
+    def test_archive_segments_are_append_only(self):
+        """Test that each archive run writes a new compressed segment."""
+        storage = TaskStorage(self.storage_path)
+        storage.archive_completed_tasks(self.now - timedelta(days=30))
+        storage.archive_completed_tasks(self.now + timedelta(days=1))
+
+        segments = sorted(name for name in os.listdir(storage.archive_path) if name.endswith(".gz"))
+        self.assertEqual(segments, ["segment-00001.jsonl.gz", "segment-00002.jsonl.gz"])
+        self.assertEqual(storage.get_archive_statistics()["total"], 2)
+        self.assertEqual(len(storage.get_tasks_by_status(TaskStatus.DONE)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
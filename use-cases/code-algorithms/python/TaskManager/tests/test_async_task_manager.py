@@ -0,0 +1,84 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from async_task_manager import AsyncTaskManager
+from memory_storage import MemoryTaskStorage
+from models import TaskStatus
+from storage import TaskStorage
+
+
+class AsyncTaskManagerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    async def test_calls_return_task_manager_results(self):
+        """Test that awaited calls return what the TaskManager methods return."""
+        async with AsyncTaskManager(storage=MemoryTaskStorage()) as manager:
+            task_id = await manager.create_task("Async task", priority_value=3)
+            self.assertTrue(await manager.update_task_status(task_id, "review"))
+            task = await manager.get_task_details(task_id)
+            stats = await manager.get_statistics()
+
+        self.assertEqual(task.status, TaskStatus.REVIEW)
+        self.assertEqual(stats["total"], 1)
+
+    async def test_calendar_and_top_priority_reads(self):
+        """Test the awaitable due calendar and top priority queries."""
+        today = date.today()
+        async with AsyncTaskManager(storage=MemoryTaskStorage()) as manager:
+            urgent_id = await manager.create_task("Urgent", priority_value=4,
+                                                  due_date_str=today.isoformat())
+            low_id = await manager.create_task("Low", priority_value=1)
+            calendar = await manager.get_due_calendar(today, days=3)
+            top = await manager.get_top_priority_tasks(limit=2)
+
+        self.assertEqual(list(calendar), [today + timedelta(days=offset) for offset in range(3)])
+        self.assertEqual(calendar[today], {"count": 1, "task_ids": [urgent_id]})
+        self.assertEqual([task.id for task in top], [urgent_id, low_id])
+
+    async def test_concurrent_mutations_are_group_committed(self):
+        """Test that mutations arriving together are written in a single commit."""
+        storage = TaskStorage(self.storage_path)
+        commits = []
+        commit = storage._commit
+        storage._commit = lambda: (commits.append(1), commit())
+
+        async with AsyncTaskManager(storage=storage, commit_window=0.05) as manager:
+            task_ids = await asyncio.gather(*(manager.create_task(f"Task {i}") for i in range(20)))
+
+        self.assertEqual(len(set(task_ids)), 20)
+        self.assertLessEqual(len(commits), 2)
+        self.assertEqual(len(TaskStorage(self.storage_path).tasks), 20)
+
+    async def test_back_pressure_limits_pending_calls(self):
+        """Test that calls beyond max_pending wait instead of queueing."""
+        async with AsyncTaskManager(storage=MemoryTaskStorage(), max_pending=2) as manager:
+            calls = [asyncio.ensure_future(manager.create_task(f"Task {i}")) for i in range(10)]
+            await asyncio.sleep(0)
+            self.assertLessEqual(manager._queue.qsize(), 2)
+            await asyncio.gather(*calls)
+            self.assertEqual(len(await manager.list_tasks()), 10)
+
+    async def test_errors_are_raised_to_the_caller(self):
+        """Test that an exception in one call fails only that call."""
+        async with AsyncTaskManager(storage=MemoryTaskStorage()) as manager:
+            results = await asyncio.gather(
+                manager.create_task("Valid"),
+                manager.update_task_status("missing", "not-a-status"),
+                return_exceptions=True
+            )
+
+        self.assertIsInstance(results[0], str)
+        self.assertIsInstance(results[1], ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
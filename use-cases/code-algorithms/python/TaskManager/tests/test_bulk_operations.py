@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from models import TaskStatus, TaskPriority
+from storage import TaskStorage
+from task_manager import TaskManager
+
+
+class BulkOperationsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+        self.task_manager = TaskManager(self.storage_path)
+        self.low_ids = [self.task_manager.create_task(f"Low {i}", priority_value=1) for i in range(5)]
+        self.high_ids = [self.task_manager.create_task(f"High {i}", priority_value=3) for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_bulk_update_commits_once(self):
+        """Test that a bulk update touches every match with a single journal write."""
+        storage = self.task_manager.storage
+        with patch.object(storage, "_append_journal", wraps=storage._append_journal) as append:
+            count = self.task_manager.bulk_update({"priority_filter": 1}, status="done", priority=2)
+
+        self.assertEqual(count, 5)
+        append.assert_called_once()
+        reloaded = TaskStorage(self.storage_path)
+        for task_id in self.low_ids:
+            task = reloaded.get_task(task_id)
+            self.assertEqual(task.status, TaskStatus.DONE)
+            self.assertIsNotNone(task.completed_at)
+            self.assertEqual(task.priority, TaskPriority.MEDIUM)
+        for task_id in self.high_ids:
+            self.assertEqual(reloaded.get_task(task_id).status, TaskStatus.TODO)
+
+    def test_bulk_update_combines_filters(self):
+        """Test that status and priority filters must both match."""
+        self.task_manager.update_task_status(self.high_ids[0], "in_progress")
+        count = self.task_manager.bulk_update(
+            {"status_filter": "todo", "priority_filter": 3}, due_date="2030-01-01")
+        self.assertEqual(count, 2)
+
+    def test_bulk_add_tag(self):
+        """Test that tags are added once and the count reports changed tasks."""
+        self.task_manager.add_tag_to_task(self.high_ids[0], "sprint")
+        count = self.task_manager.bulk_add_tag({"priority_filter": 3}, "sprint")
+
+        self.assertEqual(count, 2)
+        reloaded = TaskStorage(self.storage_path)
+        for task_id in self.high_ids:
+            self.assertEqual(reloaded.get_task(task_id).tags, ["sprint"])
+
+    def test_bulk_delete_updates_indexes(self):
+        """Test that a bulk delete removes tasks from storage and its indexes."""
+        count = self.task_manager.bulk_delete({"priority_filter": 1})
+
+        self.assertEqual(count, 5)
+        self.assertEqual(sorted(TaskStorage(self.storage_path).tasks), sorted(self.high_ids))
+        self.assertEqual(self.task_manager.storage.id_index.ids, sorted(self.high_ids))
+        self.assertEqual(self.task_manager.search("low"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
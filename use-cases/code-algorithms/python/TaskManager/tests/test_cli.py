@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import cli
+from renderers import RENDERERS
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# This package's modules, whose own import time counts against the budget
+OWN_MODULES = {name[:-3] for name in os.listdir(PACKAGE_DIR) if name.endswith(".py")}
+
+# The package's own modules may take this many times as long to import as a
+# bare `import argparse` measured on the same machine in the same run
+STARTUP_BUDGET_FACTOR = 5
+
+
+def import_times(code, env=None, top_level=False):
+    """Run code under -X importtime; return {module: (self ms, cumulative ms)}.
+
+    Nested imports are reported too, so self times can be added up across
+    every module without counting any import twice; with top_level, only
+    the modules code imported directly are.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PACKAGE_DIR,
+                            capture_output=True, text=True, check=True, env=env)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below the module that triggered them
+        if own.strip().isdigit() and not (top_level and name[1:].startswith(" ")):
+            times[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return times
+
+
+class ParserTest(unittest.TestCase):
+    def test_format_choices_match_renderers(self):
+        """Test that the --format choices listed in cli.py are the available renderers."""
+        self.assertEqual(cli.FORMAT_CHOICES, list(RENDERERS))
+
+    def test_builds_only_the_selected_command(self):
+        """Test that a run parses its own command and still rejects unknown ones."""
+        parser = cli.build_parser(["priority", "abc", "3"])
+        args = parser.parse_args(["priority", "abc", "3"])
+        self.assertEqual((args.command, args.task_id, args.priority), ("priority", "abc", 3))
+
+        args = cli.build_parser(["list"]).parse_args(["list", "-s", "todo", "-f", "csv"])
+        self.assertEqual((args.status, args.format, args.overdue), ("todo", "csv", False))
+
+        with self.assertRaises(SystemExit):
+            cli.build_parser(["lsit"]).parse_args(["lsit"])
+
+
+class StartupTest(unittest.TestCase):
+    def test_cli_import_defers_the_storage_stack(self):
+        """Test that importing cli does not import the task manager or storage."""
+        times = import_times("import cli", top_level=True)
+        self.assertIn("cli", times)
+        for module in ("task_manager", "storage", "indexes", "renderers", "json"):
+            self.assertNotIn(module, times)
+
+    def test_startup_import_budget(self):
+        """Test that parsing a command and importing TaskManager stays within budget.
+
+        Only the self time of this package's modules is counted, against a
+        bare argparse import timed in the same run, so neither the standard
+        library nor the speed of the machine decides the result. Bytecode is
+        cached in a temporary directory first, so compiling is not counted.
+        """
+        code = ("import cli; cli.build_parser(['list']).parse_args(['list']); "
+                "import task_manager")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ, PYTHONPYCACHEPREFIX=cache_dir)
+            env.pop("PYTHONDONTWRITEBYTECODE", None)
+            import_times(code, env)
+            # The quickest of a few runs, so a busy machine does not fail the test
+            own = min(
+                sum(times[module][0] for module in OWN_MODULES if module in times)
+                for times in (import_times(code, env) for _ in range(3))
+            )
+            baseline = min(import_times("import argparse", env)["argparse"][1] for _ in range(3))
+        self.assertLess(own, STARTUP_BUDGET_FACTOR * baseline)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,346 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from datetime import datetime, timedelta
+
+from indexes import DueCalendarIndex, TagIndex, TaskCountsIndex, TaskIdIndex, TextIndex
+from memory_storage import MemoryTaskStorage
+from models import Task, TaskPriority, TaskStatus
+from task_priority import calculate_task_score, get_top_priority_tasks
+from storage import TaskStorage
+from task_manager import TaskManager
+
+
+class TaskIdIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TaskIdIndex()
+        for task_id in ["abc123", "abd456", "b00000"]:
+            self.index.add(task_id)
+
+    def test_find_unique_prefix(self):
+        """Test that a unique prefix resolves to exactly one id."""
+        self.assertEqual(self.index.find("abc"), ["abc123"])
+        self.assertEqual(self.index.find("b"), ["b00000"])
+
+    def test_find_ambiguous_and_missing_prefix(self):
+        """Test that shared prefixes return every match and unknown prefixes none."""
+        self.assertEqual(self.index.find("ab"), ["abc123", "abd456"])
+        self.assertEqual(self.index.find("ab", limit=1), ["abc123"])
+        self.assertEqual(self.index.find("zz"), [])
+
+    def test_iter_after(self):
+        """Test that iteration resumes strictly after the given id."""
+        self.assertEqual(list(self.index.iter_after()), ["abc123", "abd456", "b00000"])
+        self.assertEqual(list(self.index.iter_after("abc123")), ["abd456", "b00000"])
+        self.assertEqual(list(self.index.iter_after("abc")), ["abc123", "abd456", "b00000"])
+
+    def test_add_and_remove_keep_ids_sorted(self):
+        """Test incremental maintenance of the sorted id list."""
+        self.index.add("aaa000")
+        self.index.add("aaa000")
+        self.index.remove("abd456")
+        self.index.remove("missing")
+        self.assertEqual(self.index.ids, ["aaa000", "abc123", "b00000"])
+
+
+class TextIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.add("t1", TextIndex.tokenize("Fix login bug") + TextIndex.tokenize("Users cannot log in"))
+        self.index.add("t2", TextIndex.tokenize("Write docs") + TextIndex.tokenize("Document the login flow and login errors"))
+        self.index.add("t3", TextIndex.tokenize("Plan sprint"))
+
+    def test_search_requires_every_term(self):
+        """Test that all query terms must match."""
+        self.assertEqual([task_id for _, task_id in self.index.search("login bug")], ["t1"])
+        self.assertEqual(self.index.search("login sprint"), [])
+        self.assertEqual(self.index.search("unknown"), [])
+
+    def test_prefix_terms(self):
+        """Test that a trailing * matches every term with that prefix."""
+        self.assertEqual({task_id for _, task_id in self.index.search("doc*")}, {"t2"})
+        self.assertEqual({task_id for _, task_id in self.index.search("log*")}, {"t1", "t2"})
+
+    def test_ranking_and_limit(self):
+        """Test that more frequent matches rank first and limit truncates."""
+        ranked = [task_id for _, task_id in self.index.search("login")]
+        self.assertEqual(ranked, ["t2", "t1"])
+        self.assertEqual([task_id for _, task_id in self.index.search("login", limit=1)], ["t2"])
+
+    def test_edit_then_delete_in_one_transaction(self):
+        """Test that a task edited and deleted before committing leaves no stale entries."""
+        storage = MemoryTaskStorage()
+        task_id = storage.add_task(Task("alpha report", "first draft", tags=["work"]))
+        storage.add_task(Task("alpha review"))
+
+        with storage.transaction():
+            task = storage.get_task(task_id)
+            task.title = "zeta"
+            task.tags = ["home"]
+            task.mark_as_done()
+            storage.delete_task(task_id)
+
+        self.assertEqual([task.title for task in storage.search_tasks("alpha")], ["alpha review"])
+        self.assertEqual(storage.search_tasks("draft"), [])
+        self.assertEqual(storage.counts_index.by_status[TaskStatus.DONE], 0)
+        self.assertEqual(storage.tag_index.task_ids, {})
+
+    def test_remove_drops_unused_terms(self):
+        """Test that removing a document prunes its postings and vocabulary."""
+        self.index.remove("t3")
+        self.assertNotIn("sprint", self.index.postings)
+        self.assertNotIn("sprint", self.index.terms)
+        self.assertNotIn("sprint", self.index.impacts)
+        self.assertNotIn("t3", self.index.doc_lengths)
+
+    def test_top_k_matches_full_ranking(self):
+        """Randomized check that pruned top-k searches return the head of the full ranking."""
+        rng = random.Random(31)
+        words = ["alpha", "alpine", "beta", "bet", "gamma", "delta", "deltas", "report"]
+        index = TextIndex()
+        for step in range(300):
+            task_id = f"t{rng.randrange(80):02d}"
+            if rng.random() < 0.2:
+                index.remove(task_id)
+            else:
+                index.add(task_id, rng.choices(words, weights=[8, 2, 6, 1, 4, 3, 1, 9], k=rng.randint(1, 6)))
+            query = " ".join(rng.sample(["alpha", "al*", "beta", "bet*", "gamma", "delta*", "report", "r*"],
+                                        rng.randint(1, 3)))
+            accept = (lambda task_id: task_id[-1] != "3") if step % 2 else None
+            ranked = index.search(query, accept=accept)
+            for limit in (1, 3, 10):
+                self.assertEqual(index.search(query, limit, accept), ranked[:limit], query)
+
+
+class TaskCountsIndexTest(unittest.TestCase):
+    def setUp(self):
+        now = datetime.now()
+        self.storage = MemoryTaskStorage([
+            Task("Overdue", due_date=now - timedelta(days=1)),
+            Task("Later", priority=TaskPriority.HIGH, due_date=now + timedelta(days=3)),
+            Task("No due date", priority=TaskPriority.LOW),
+        ])
+        self.counts = self.storage.counts_index
+        self.calendar = self.storage.due_calendar
+
+    def assert_matches_scan(self):
+        """The incremental indexes must equal a rebuild from the current tasks."""
+        tasks = self.storage.get_all_tasks()
+        rebuilt = TaskCountsIndex()
+        rebuilt.rebuild(tasks)
+        for attribute in ("by_status", "by_priority", "completed"):
+            self.assertEqual(getattr(self.counts, attribute), getattr(rebuilt, attribute))
+        rebuilt = DueCalendarIndex()
+        rebuilt.rebuild(tasks)
+        self.assertEqual(self.calendar.buckets, rebuilt.buckets)
+        self.assertEqual(self.calendar.days, rebuilt.days)
+
+    def test_counts_follow_changes(self):
+        """Test counters and due buckets across patches, completion and deletes."""
+        now = datetime.now()
+        self.assertEqual(self.calendar.count_due_before(now), 1)
+
+        overdue_id = self.storage.get_all_tasks()[0].id
+        self.storage.get_task(overdue_id).mark_as_done()
+        self.storage.save()
+        later_id = self.storage.get_all_tasks()[1].id
+        self.storage.update_task(later_id, priority=TaskPriority.URGENT, due_date=now - timedelta(hours=1))
+        self.storage.delete_task(self.storage.get_all_tasks()[2].id)
+
+        self.assertEqual(self.counts.by_status[TaskStatus.DONE], 1)
+        self.assertEqual(self.counts.by_priority[TaskPriority.URGENT], 1)
+        self.assertEqual(self.counts.by_priority[TaskPriority.LOW], 0)
+        self.assertEqual(self.calendar.count_due_before(datetime.now()), 1)
+        self.assertEqual([task.id for task in self.storage.get_overdue_tasks()], [later_id])
+        self.assertEqual(self.counts.count_completed_since(now - timedelta(days=7)), 1)
+        self.assert_matches_scan()
+
+    def test_page_tasks_walks_ids_in_order(self):
+        """Test cursor pagination over the id index with a filter."""
+        for i in range(5):
+            self.storage.add_task(Task(f"Extra {i}", priority=TaskPriority.LOW))
+
+        seen = []
+        page, cursor = self.storage.page_tasks(limit=2, priority=TaskPriority.LOW)
+        while True:
+            seen.extend(task.id for task in page)
+            if cursor is None:
+                break
+            page, cursor = self.storage.page_tasks(cursor, limit=2, priority=TaskPriority.LOW)
+
+        low_ids = [task.id for task in self.storage.get_tasks_by_priority(TaskPriority.LOW)]
+        self.assertEqual(seen, sorted(low_ids))
+
+
+class TagIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.task_manager = TaskManager(storage=MemoryTaskStorage())
+        self.storage = self.task_manager.storage
+
+    def test_tag_index_follows_changes(self):
+        """Test tag membership and open counts through tagging, completion and deletes."""
+        first = self.task_manager.create_task("First", tags=["work", "q1"])
+        second = self.task_manager.create_task("Second", tags=["work"])
+        third = self.task_manager.create_task("Third", tags=["home"])
+        self.task_manager.add_tag_to_task(third, "work")
+        self.task_manager.remove_tag_from_task(first, "q1")
+        self.task_manager.update_task_status(second, "done")
+        self.task_manager.delete_task(third)
+
+        index = self.storage.tag_index
+        self.assertEqual(index.task_ids, {"work": {first, second}})
+        self.assertEqual(index.open_counts, {"work": 1})
+        self.assertEqual((index.tags_by_count, index.counts), ({1: {"work"}}, [1]))
+        self.assertEqual(sorted(task.id for task in self.storage.get_tasks_by_tag("work")),
+                         sorted([first, second]))
+
+        rebuilt = TagIndex()
+        rebuilt.rebuild(self.storage.get_all_tasks())
+        self.assertEqual(rebuilt.task_ids, index.task_ids)
+        self.assertEqual(rebuilt.open_counts, index.open_counts)
+        self.assertEqual(rebuilt.tags_by_count, index.tags_by_count)
+
+    def test_repeated_tag_counts_once(self):
+        """Test that a tag listed twice on one task is counted once."""
+        task_id = self.task_manager.create_task("Task", tags=["work", "work"])
+        index = self.storage.tag_index
+        self.assertEqual(index.open_counts, {"work": 1})
+        self.assertEqual(index.top_open(5), [("work", 1)])
+
+        self.task_manager.remove_tag_from_task(task_id, "work")
+        self.assertEqual((index.task_ids, index.open_counts, index.counts), ({}, {}, []))
+
+    def test_top_open_reads_count_buckets(self):
+        """Test that top_open agrees with ranking every tag, ties broken by name."""
+        for i in range(30):
+            self.task_manager.create_task(f"Task {i}", tags=[f"t{i % 7}", f"u{i % 3}", f"v{i % 11}"])
+        for task in self.storage.get_all_tasks()[::4]:
+            self.task_manager.update_task_status(task.id, "done")
+
+        index = self.storage.tag_index
+        ranked = sorted(index.open_counts.items(), key=lambda item: (-item[1], item[0]))
+        for limit in (0, 1, 5, 12, 100):
+            self.assertEqual(index.top_open(limit), ranked[:limit])
+        self.assertEqual(index.counts, sorted(index.tags_by_count))
+
+    def test_statistics_list_top_tags(self):
+        """Test that by_tag lists the most used tags on open tasks, most used first."""
+        for tags in (["a", "b"], ["b"], ["b", "c"], ["c"]):
+            self.task_manager.create_task("Task", tags=tags)
+        done = self.task_manager.create_task("Done", tags=["a", "z"])
+        self.task_manager.update_task_status(done, "done")
+
+        by_tag = self.task_manager.get_statistics()["by_tag"]
+
+        self.assertEqual(list(by_tag.items()), [("b", 3), ("c", 2), ("a", 1)])
+
+
+class DueCalendarTest(unittest.TestCase):
+    def setUp(self):
+        self.task_manager = TaskManager(storage=MemoryTaskStorage())
+
+    def test_calendar_counts_open_tasks_per_day(self):
+        """Test per-day buckets, including empty days and completed tasks."""
+        first = self.task_manager.create_task("First", due_date_str="2030-01-01")
+        second = self.task_manager.create_task("Second", due_date_str="2030-01-01")
+        third = self.task_manager.create_task("Third", due_date_str="2030-01-03")
+        self.task_manager.update_task_status(second, "done")
+        self.task_manager.update_task_due_date(third, "2030-01-02")
+
+        calendar = self.task_manager.get_due_calendar("2030-01-01", days=3)
+
+        self.assertEqual(list(calendar), [datetime(2030, 1, d).date() for d in (1, 2, 3)])
+        self.assertEqual(calendar[datetime(2030, 1, 1).date()], {"count": 1, "task_ids": [first]})
+        self.assertEqual(calendar[datetime(2030, 1, 2).date()]["task_ids"], [third])
+        self.assertEqual(calendar[datetime(2030, 1, 3).date()]["count"], 0)
+
+    def test_top_priority_matches_full_scan(self):
+        """Test that the calendar-driven ranking returns the same scores as a scan."""
+        now = datetime.now()
+        for i in range(40):
+            task_id = self.task_manager.create_task(f"Task {i}", priority_value=i % 4 + 1)
+            if i % 3:
+                self.task_manager.storage.update_task(task_id, due_date=now + timedelta(days=i % 12 - 3))
+
+        for limit in (1, 5, 20):
+            expected = get_top_priority_tasks(self.task_manager.storage.get_all_tasks(), limit)
+            ranked = self.task_manager.get_top_priority_tasks(limit)
+            self.assertEqual(
+                [calculate_task_score(task) for task in ranked],
+                [calculate_task_score(task) for task in expected]
+            )
+
+
+class ShortIdResolutionTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_index_follows_storage_mutations(self):
+        """Test that adds, deletes and reloads keep the id index current."""
+        storage = TaskStorage(self.storage_path)
+        first = storage.add_task(Task("First"))
+        second = storage.add_task(Task("Second"))
+        storage.delete_task(first)
+
+        self.assertEqual(storage.id_index.ids, [second])
+        self.assertEqual(TaskStorage(self.storage_path).id_index.ids, [second])
+
+    def test_resolve_task_id(self):
+        """Test prefix resolution through TaskManager, including ambiguity."""
+        task_manager = TaskManager(self.storage_path)
+        first = Task("First")
+        first.id = "1234aaaa-0000"
+        second = Task("Second")
+        second.id = "1234bbbb-0000"
+        task_manager.storage.add_task(first)
+        task_manager.storage.add_task(second)
+
+        self.assertEqual(task_manager.resolve_task_id("1234a"), first.id)
+        self.assertEqual(task_manager.resolve_task_id(second.id), second.id)
+        self.assertIsNone(task_manager.resolve_task_id("9999"))
+        with self.assertRaises(ValueError):
+            task_manager.resolve_task_id("1234")
+
+
+class TaskSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.task_manager = TaskManager(os.path.join(self.temp_dir, "tasks.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_search_follows_updates_and_deletes(self):
+        """Test that the text index is maintained on add, update and delete."""
+        task_id = self.task_manager.create_task("Fix login bug", "Users cannot log in")
+        other_id = self.task_manager.create_task("Review login page")
+
+        self.assertEqual(len(self.task_manager.search("login")), 2)
+
+        self.task_manager.storage.update_task(task_id, title="Fix signup bug")
+        self.assertEqual([task.id for task in self.task_manager.search("login")], [other_id])
+        self.assertEqual([task.id for task in self.task_manager.search("signup")], [task_id])
+
+        self.task_manager.delete_task(other_id)
+        self.assertEqual(self.task_manager.search("login"), [])
+
+    def test_search_combines_with_filters(self):
+        """Test that status and priority filters narrow the search results."""
+        done_id = self.task_manager.create_task("Deploy release", priority_value=3)
+        self.task_manager.create_task("Deploy hotfix", priority_value=1)
+        self.task_manager.update_task_status(done_id, "done")
+
+        self.assertEqual([task.id for task in self.task_manager.search("deploy", status_filter="done")], [done_id])
+        self.assertEqual([task.id for task in self.task_manager.search("deploy", priority_filter=3)], [done_id])
+        self.assertEqual(len(self.task_manager.search("deploy", status_filter="todo")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import cli
+import instrumentation
+from models import Task
+from storage import TaskStorage
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+
+    def tearDown(self):
+        instrumentation.finish(stream=io.StringIO())
+        shutil.rmtree(self.temp_dir)
+
+    def test_records_nothing_until_started(self):
+        """Test that phases and counters are no-ops while instrumentation is off."""
+        instrumentation.reset()
+        with instrumentation.phase("storage.load"):
+            instrumentation.count("tasks_decoded", 3)
+        self.assertFalse(instrumentation.enabled)
+        self.assertEqual(instrumentation.counters, {})
+        self.assertNotIn("storage.load", instrumentation.phases)
+
+    def test_storage_phases_and_counters(self):
+        """Test that loading, filtering and saving are timed and counted."""
+        storage = TaskStorage(self.storage_path)
+        storage.add_task(Task("First"))
+        storage.compact()
+
+        trace_path = os.path.join(self.temp_dir, "trace.json")
+        instrumentation.start(summary=True, trace_path=trace_path)
+        storage = TaskStorage(self.storage_path)
+        storage.add_task(Task("Second"))
+        list(storage.iter_tasks())
+        list(storage.iter_tasks(overdue=True))
+        summary = io.StringIO()
+        instrumentation.finish(stream=summary)
+
+        totals = instrumentation.report()
+        self.assertEqual(totals["counters"]["tasks_decoded"], 1)
+        self.assertEqual(totals["counters"]["scans"], 1)
+        self.assertEqual(totals["counters"]["index_hits"], 1)
+        self.assertGreater(totals["counters"]["bytes_written"], 0)
+        for name in ("storage.load", "storage.decode_snapshot", "storage.commit", "storage.write_journal"):
+            self.assertEqual(totals["phases"][name]["calls"], 1)
+        self.assertTrue(summary.getvalue().startswith("profile: total "))
+        self.assertIn("tasks_decoded=1", summary.getvalue())
+
+        with open(trace_path) as f:
+            trace = json.load(f)
+        names = {event["name"] for event in trace["traceEvents"] if event["ph"] == "X"}
+        self.assertIn("storage.decode_snapshot", names)
+        self.assertEqual(trace["summary"]["counters"], totals["counters"])
+
+    def test_cli_profile_options(self):
+        """Test --profile, --trace and --cprofile before a command."""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            with redirect_stdout(io.StringIO()):
+                cli.main(["create", "Profile me", "-p", "3"])
+                cli.main(["--trace", "trace.json", "--cprofile", "run.prof", "list"])
+        finally:
+            os.chdir(cwd)
+
+        with open(os.path.join(self.temp_dir, "trace.json")) as f:
+            phases = json.load(f)["summary"]["phases"]
+        for name in ("cli.list", "cli.open_storage", "cli.render", "storage.load"):
+            self.assertIn(name, phases)
+        stats = pstats.Stats(os.path.join(self.temp_dir, "run.prof"))
+        self.assertTrue(any(function == "run_command" for _, _, function in stats.stats))
+
+    def test_options_before_the_command(self):
+        """Test that option values before the command are not taken for the command."""
+        self.assertEqual(cli.find_command(["--trace", "list", "show", "abc"]), "show")
+        self.assertEqual(cli.find_command(["--trace=out.json", "--profile", "stats"]), "stats")
+        args = cli.build_parser(["--cprofile", "x.prof", "stats"]).parse_args(["--cprofile", "x.prof", "stats"])
+        self.assertEqual((args.command, args.cprofile, args.profile), ("stats", "x.prof", False))
+
+
+if __name__ == '__main__':
+    unittest.main()
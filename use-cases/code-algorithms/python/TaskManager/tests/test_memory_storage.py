@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from memory_storage import MemoryTaskStorage
+from models import Task, TaskPriority, TaskStatus
+from storage import TaskStorage
+from task_manager import TaskManager
+
+
+class MemoryTaskStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def test_changes_never_touch_the_filesystem(self):
+        """Test that creating, updating and deleting tasks writes no files."""
+        task_manager = TaskManager(storage=MemoryTaskStorage())
+        task_id = task_manager.create_task("In memory", priority_value=3)
+        task_manager.update_task_status(task_id, "in_progress")
+        task_manager.delete_task(task_manager.create_task("Temporary"))
+
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertEqual(len(task_manager.list_tasks()), 1)
+        self.assertEqual(task_manager.storage.get_task(task_id).status, TaskStatus.IN_PROGRESS)
+
+    def test_commits_skip_encoding(self):
+        """Test that adds, patches and deletes are committed without encoding tasks."""
+        storage = MemoryTaskStorage()
+        with patch("storage.TaskEncoder.default", side_effect=AssertionError("encoded")), \
+                patch("storage.encode_field", side_effect=AssertionError("encoded")):
+            task_id = storage.add_task(Task("Unencoded", tags=["a"]))
+            storage.update_task(task_id, priority=TaskPriority.HIGH, tags=["b"])
+            storage.delete_task(storage.add_task(Task("Temporary")))
+
+        self.assertEqual(storage.get_task(task_id).tags, ["b"])
+        self.assertEqual(storage.counts_index.by_priority[TaskPriority.HIGH], 1)
+        self.assertEqual(len(storage.tasks), 1)
+
+    def test_indexes_follow_changes(self):
+        """Test that the id and text indexes are kept current."""
+        storage = MemoryTaskStorage([Task("Water the plants")])
+        task_id = storage.add_task(Task("Write report"))
+
+        self.assertEqual(storage.find_task_ids(task_id[:8]), [task_id])
+        self.assertEqual([task.id for task in storage.search_tasks("report")], [task_id])
+
+        storage.update_task(task_id, title="Write summary")
+        self.assertEqual(storage.search_tasks("report"), [])
+        self.assertEqual([task.id for task in storage.search_tasks("summary")], [task_id])
+
+    def test_fork_is_isolated_in_both_directions(self):
+        """Test that changes after a fork are only visible on the side that made them."""
+        parent = MemoryTaskStorage([Task("Shared")])
+        task_id = next(iter(parent.tasks))
+        child = parent.fork()
+
+        child.update_task(task_id, priority=TaskPriority.URGENT, title="Child title")
+        parent.update_task(task_id, status=TaskStatus.DONE)
+        child_only = child.add_task(Task("Child only"))
+
+        self.assertEqual(parent.get_task(task_id).priority, TaskPriority.MEDIUM)
+        self.assertEqual(parent.get_task(task_id).title, "Shared")
+        self.assertEqual(child.get_task(task_id).status, TaskStatus.TODO)
+        self.assertIsNone(parent.get_task(child_only))
+        self.assertEqual(parent.search_tasks("child"), [])
+        self.assertEqual(len(child.search_tasks("child")), 2)
+
+    def test_periodic_snapshot_is_readable_by_task_storage(self):
+        """Test that snapshot_every writes a JSON snapshot TaskStorage can load."""
+        snapshot_path = os.path.join(self.temp_dir, "snapshot.json")
+        storage = MemoryTaskStorage(snapshot_path=snapshot_path, snapshot_every=2)
+        storage.add_task(Task("First"))
+        self.assertFalse(os.path.exists(snapshot_path))
+        storage.add_task(Task("Second"))
+
+        self.assertEqual(len(TaskStorage(snapshot_path).tasks), 2)
+        self.assertEqual(len(MemoryTaskStorage(snapshot_path=snapshot_path).tasks), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
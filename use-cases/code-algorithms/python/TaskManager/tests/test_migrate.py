@@ -0,0 +1,176 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from migrate import JsonArrayReader, MigrationError, migrate
+from models import Task, TaskPriority
+from storage import TaskStorage
+
+
+class Interrupted(Exception):
+    pass
+
+
+def encoded_tasks(storage):
+    return {task.id: (task.title, task.priority, task.tags, task.due_date, task.version)
+            for task in storage.get_all_tasks()}
+
+
+class JsonArrayReaderTest(unittest.TestCase):
+    def test_small_chunks_and_multibyte_text(self):
+        """Test that elements split across chunks, even mid-character, parse correctly."""
+        data = json.dumps([{"id": "1", "title": "café ☕"}, {"id": "2"}, {"id": "3", "title": "ü"}])
+        f = io.BytesIO(data.encode("utf-8"))
+
+        reader = JsonArrayReader(f, chunk_size=3)
+        first = next(iter(reader))
+        offset = reader.offset()
+
+        self.assertEqual(first["title"], "café ☕")
+        resumed = list(JsonArrayReader(f, offset, chunk_size=3))
+        self.assertEqual([item["id"] for item in resumed], ["2", "3"])
+
+    def test_offsets_are_byte_positions(self):
+        """Test that offset() counts bytes of multi-byte text after every element and chunk size."""
+        items = [{"id": str(i), "title": "é" * i + "☕"} for i in range(20)]
+        data = json.dumps(items).encode("utf-8")
+        ends = [data.index(json.dumps(item).encode("utf-8")) + len(json.dumps(item).encode("utf-8"))
+                for item in items]
+        for chunk_size in (1, 5, 64, 4096):
+            reader = JsonArrayReader(io.BytesIO(data), chunk_size=chunk_size)
+            self.assertEqual([reader.offset() for _ in reader], ends)
+
+    def test_rejects_truncated_array(self):
+        """Test that a file cut off mid-array raises instead of ending quietly."""
+        f = io.BytesIO(b'[{"id": "1"}, {"id": ')
+        with self.assertRaises(MigrationError):
+            list(JsonArrayReader(f, chunk_size=4))
+
+
+class MigrateTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.temp_dir, "tasks.json")
+        storage = TaskStorage(self.source_path)
+        self.ids = [storage.add_task(Task(f"Task {i}", tags=[f"t{i % 3}"])) for i in range(25)]
+        storage.compact()
+        # Leave some changes in the journal only
+        storage.update_task(self.ids[0], priority=TaskPriority.URGENT)
+        storage.delete_task(self.ids[1])
+        storage.add_task(Task("Journal only"))
+        self.expected = encoded_tasks(storage)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def test_round_trip_through_sqlite_and_jsonl(self):
+        """Test json -> sqlite -> jsonl -> json preserves every task and applies the journal."""
+        self.assertEqual(migrate(self.source_path, self.path("tasks.db"), batch_size=4, progress=None), 25)
+        migrate(self.path("tasks.db"), self.path("tasks.jsonl"), batch_size=7, progress=None)
+        migrate(self.path("tasks.jsonl"), self.path("copy.json"), batch_size=5, progress=None)
+
+        self.assertEqual(encoded_tasks(TaskStorage(self.path("copy.json"))), self.expected)
+        self.assertFalse(os.path.exists(self.path("copy.json.migration")))
+
+    def test_gzip_round_trip_and_resume(self):
+        """Test the gzip format as a destination resumed mid-way and as a source."""
+        destination = self.path("tasks.jsonl.gz")
+
+        def fail_after_two_batches(count, fraction, rate):
+            if count == 8:
+                raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            migrate(self.source_path, destination, batch_size=4, progress=fail_after_two_batches)
+        self.assertEqual(migrate(self.source_path, destination, batch_size=4, progress=None), 25)
+        migrate(destination, self.path("copy.json"), batch_size=6, progress=None)
+        self.assertEqual(encoded_tasks(TaskStorage(self.path("copy.json"))), self.expected)
+
+        # A file gzipped in one member resumes by skipping the lines already read
+        with gzip.open(destination, "rb") as f:
+            lines = f.read()
+        single = self.path("single.jsonl.gz")
+        with gzip.open(single, "wb") as f:
+            f.write(lines)
+        with self.assertRaises(Interrupted):
+            migrate(single, self.path("single.db"), batch_size=4, progress=fail_after_two_batches)
+        self.assertEqual(migrate(single, self.path("single.db"), batch_size=4, progress=None), 25)
+
+    def test_resume_after_interruption(self):
+        """Test that a rerun continues after the last committed batch."""
+        destination = self.path("tasks.jsonl")
+        calls = []
+
+        def fail_after_two_batches(count, fraction, rate):
+            calls.append(count)
+            if len(calls) == 2:
+                raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            migrate(self.source_path, destination, batch_size=4, progress=fail_after_two_batches)
+
+        resumed_counts = []
+        count = migrate(self.source_path, destination, batch_size=4,
+                        progress=lambda count, fraction, rate: resumed_counts.append(count))
+
+        self.assertEqual(count, 25)
+        self.assertEqual(resumed_counts[0], 12)
+        migrate(destination, self.path("copy.json"), progress=None)
+        self.assertEqual(encoded_tasks(TaskStorage(self.path("copy.json"))), self.expected)
+
+    def test_resume_with_journal_only_tasks(self):
+        """Test a resumed migration of tasks the journal adds, patches and re-puts."""
+        source = self.path("journal.json")
+        storage = TaskStorage(source)
+        storage.compact()  # an empty snapshot; every task is in the journal
+        ids = [storage.add_task(Task(f"Journal {i}")) for i in range(10)]
+        storage.update_task(ids[2], title="Patched")
+        storage.delete_task(ids[3])
+        storage.add_task(self._copy_of(storage.get_task(ids[4])))
+        expected = encoded_tasks(storage)
+        calls = []
+
+        def fail_after_one_batch(count, fraction, rate):
+            calls.append(count)
+            raise Interrupted()
+
+        destination = self.path("journal.jsonl")
+        with self.assertRaises(Interrupted):
+            migrate(source, destination, batch_size=3, progress=fail_after_one_batch)
+        self.assertEqual(migrate(source, destination, batch_size=3, progress=None), 9)
+        migrate(destination, self.path("copy.json"), progress=None)
+        self.assertEqual(encoded_tasks(TaskStorage(self.path("copy.json"))), expected)
+
+    @staticmethod
+    def _copy_of(task):
+        copy = Task(task.title)
+        copy.id = task.id
+        return copy
+
+    def test_refuses_to_overwrite_or_mix_sources(self):
+        """Test the safety checks around existing destinations and changed sources."""
+        destination = self.path("tasks.db")
+        migrate(self.source_path, destination, progress=None)
+        with self.assertRaises(MigrationError):
+            migrate(self.source_path, destination, progress=None)
+        self.assertEqual(migrate(self.source_path, destination, restart=True, progress=None), 25)
+
+        def interrupt(count, fraction, rate):
+            raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            migrate(self.source_path, destination, batch_size=4, restart=True, progress=interrupt)
+        TaskStorage(self.source_path).add_task(Task("Changed source"))
+        with self.assertRaises(MigrationError):
+            migrate(self.source_path, destination, progress=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime
+
+from models import Task, TaskStatus, TaskPriority
+
+
+class TaskChangeTrackingTest(unittest.TestCase):
+    def test_new_task_is_clean(self):
+        """Test that a freshly constructed task has no pending changes."""
+        task = Task("New Task")
+        self.assertFalse(task.is_dirty)
+        self.assertEqual(task.get_changes(), {})
+
+    def test_assignments_are_recorded_with_old_values(self):
+        """Test that field assignments record the value they replaced."""
+        task = Task("Task", priority=TaskPriority.LOW)
+        version = task.version
+
+        task.priority = TaskPriority.HIGH
+        task.priority = TaskPriority.URGENT
+
+        self.assertEqual(task.get_changes(), {"priority": (TaskPriority.LOW, TaskPriority.URGENT)})
+        self.assertEqual(task.version, version + 2)
+
+    def test_unchanged_assignment_is_not_recorded(self):
+        """Test that assigning the current value does not dirty the task."""
+        task = Task("Task")
+        task.title = "Task"
+        self.assertFalse(task.is_dirty)
+
+    def test_update_records_only_known_fields(self):
+        """Test that update() tracks the fields it sets and ignores unknown keys."""
+        task = Task("Task")
+        task.update(description="New description", not_a_field=1)
+
+        changes = task.get_changes()
+        self.assertEqual(set(changes), {"description", "updated_at"})
+        self.assertFalse(hasattr(task, "not_a_field"))
+
+    def test_mark_as_done_and_clear_changes(self):
+        """Test that mark_as_done produces a minimal change set that can be cleared."""
+        task = Task("Task")
+        task.mark_as_done()
+
+        self.assertEqual(set(task.get_changes()), {"status", "completed_at", "updated_at"})
+        self.assertEqual(task.get_changes()["status"], (TaskStatus.TODO, TaskStatus.DONE))
+
+        task.clear_changes()
+        self.assertFalse(task.is_dirty)
+
+    def test_from_fields_is_clean_and_tracks_later_changes(self):
+        """Test that a task built from saved fields starts clean and is tracked afterwards."""
+        task = Task("Task", tags=["a"])
+        task.priority = TaskPriority.HIGH
+        fields = {key: value for key, value in vars(task).items() if not key.startswith("_")}
+
+        restored = Task.from_fields(fields)
+        self.assertFalse(restored.is_dirty)
+        self.assertEqual(restored.saved_version, task.version)
+
+        restored.title = "Renamed"
+        self.assertEqual(restored.get_changes(), {"title": ("Task", "Renamed")})
+        self.assertEqual(restored.version, task.version + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
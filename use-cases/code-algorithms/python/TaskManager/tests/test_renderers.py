@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime
+
+from models import Task, TaskStatus, TaskPriority
+from renderers import format_task, iter_table, iter_jsonl, iter_csv, write_lines, SEPARATOR
+
+
+class RenderersTest(unittest.TestCase):
+    def setUp(self):
+        self.task = Task("Write report", "Quarterly numbers", TaskPriority.HIGH,
+                         datetime(2024, 1, 31), ["work", "q1"])
+        self.task.created_at = datetime(2024, 1, 2, 9, 5, 30)
+        self.other = Task("Plain task")
+        self.other.status = TaskStatus.DONE
+
+    def test_format_task(self):
+        """Test the human-readable block for a single task."""
+        self.assertEqual(
+            format_task(self.task),
+            f"[ ] {self.task.id[:8]} - !!! Write report\n"
+            "  Quarterly numbers\n"
+            "  Due: 2024-01-31 | Tags: work, q1\n"
+            "  Created: 2024-01-02 09:05"
+        )
+        self.assertIn("No due date | No tags", format_task(self.other))
+
+    def test_iter_table_is_lazy(self):
+        """Test that the table renderer consumes tasks one at a time."""
+        def tasks():
+            yield self.task
+            raise AssertionError("renderer read ahead")
+
+        lines = iter_table(tasks())
+        self.assertTrue(next(lines).startswith("[ ]"))
+        self.assertEqual(next(lines), SEPARATOR)
+
+    def test_iter_jsonl(self):
+        """Test that every task becomes one parseable JSON line."""
+        lines = list(iter_jsonl([self.task, self.other]))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["tags"], ["work", "q1"])
+        self.assertEqual(json.loads(lines[1])["status"], "done")
+
+    def test_iter_csv(self):
+        """Test that CSV output has a header and quotes embedded separators."""
+        rows = list(csv.reader(iter_csv([self.task])))
+        self.assertEqual(rows[0][:3], ["id", "title", "description"])
+        self.assertEqual(rows[1][1], "Write report")
+        self.assertEqual(rows[1][6], "work,q1")
+
+    def test_write_lines_buffers_output(self):
+        """Test that write_lines batches lines into few writes and counts them."""
+        class CountingStream(io.StringIO):
+            writes = 0
+
+            def write(self, text):
+                CountingStream.writes += 1
+                return super().write(text)
+
+        stream = CountingStream()
+        count = write_lines((f"line {i}" for i in range(1000)), stream)
+
+        self.assertEqual(count, 1000)
+        self.assertEqual(CountingStream.writes, 1)
+        self.assertEqual(stream.getvalue().splitlines()[-1], "line 999")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+try:
+    from fastapi.testclient import TestClient
+except ImportError:
+    TestClient = None
+
+from memory_storage import MemoryTaskStorage
+
+
+@unittest.skipIf(TestClient is None, "FastAPI is not installed")
+class TaskServiceTest(unittest.TestCase):
+    def setUp(self):
+        import service
+
+        self.manager = service.ResidentTaskManager(MemoryTaskStorage())
+        service.app.dependency_overrides[service.get_manager] = lambda: self.manager
+        self.addCleanup(service.app.dependency_overrides.clear)
+        self.client = TestClient(service.app)
+
+    def create(self, title, **fields):
+        response = self.client.post("/tasks/", json={"title": title, **fields})
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_create_and_get_task(self):
+        """Test creating a task and fetching it by a short id prefix."""
+        created = self.create("Write docs", priority=3, due_date="2030-01-31", tags=["docs"])
+
+        response = self.client.get(f"/tasks/{created['id'][:8]}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Write docs")
+        self.assertEqual(response.json()["priority"], 3)
+        self.assertEqual(self.client.get("/tasks/missing").status_code, 404)
+
+    def test_invalid_due_date_is_rejected(self):
+        """Test that a malformed due date returns 422 and creates nothing."""
+        response = self.client.post("/tasks/", json={"title": "Bad", "due_date": "31/01/2030"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.client.get("/tasks/stats").json()["total"], 0)
+
+    def test_cursor_pagination_visits_every_task_once(self):
+        """Test that following next_cursor walks all matching tasks in id order."""
+        for i in range(7):
+            self.create(f"Task {i}", priority=4 if i % 2 else 1)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "priority": 4}
+            if cursor:
+                params["cursor"] = cursor
+            page = self.client.get("/tasks/", params=params).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_stats_and_top_priority_follow_changes(self):
+        """Test that cached summaries are refreshed after a new task is created."""
+        self.create("Low", priority=1)
+        self.assertEqual(self.client.get("/tasks/stats").json()["total"], 1)
+
+        urgent = self.create("Urgent", priority=4)
+        self.assertEqual(self.client.get("/tasks/stats").json()["total"], 2)
+        top = self.client.get("/tasks/top-priority", params={"limit": 1}).json()
+        self.assertEqual([task["id"] for task in top], [urgent["id"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
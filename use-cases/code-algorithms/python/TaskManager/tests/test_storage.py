@@ -0,0 +1,226 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from journal_benchmark import check_store, run_writers
+from models import Task, TaskPriority
+from storage import TaskDecoder, TaskEncoder, TaskStorage, fcntl
+from task_manager import TaskManager
+
+
+WRITERS = 8
+TASKS_PER_WRITER = 25
+
+
+def _concurrent_writer(storage_path, shared_task_id, writer):
+    """Create tasks and tag one shared task from a separate process."""
+    task_manager = TaskManager(storage_path)
+    for i in range(TASKS_PER_WRITER):
+        task_id = task_manager.create_task(f"Writer {writer} task {i}")
+        task_manager.update_task_priority(task_id, 3)
+
+    storage = task_manager.storage
+    with storage.transaction():
+        shared = storage.get_task(shared_task_id)
+        shared.tags = shared.tags + [f"writer-{writer}"]
+
+
+class TaskStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage_path = os.path.join(self.temp_dir, "tasks.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_decoded_tasks_are_saved_and_clean(self):
+        """Test that decoding restores every field without recording changes."""
+        task = Task("Task", "Description", TaskPriority.HIGH, datetime(2030, 1, 31), ["a", "b"])
+        task.mark_as_done()
+
+        decoded = json.loads(json.dumps(task, cls=TaskEncoder), cls=TaskDecoder)
+
+        fields = lambda t: {key: value for key, value in vars(t).items() if not key.startswith("_")}
+        self.assertEqual(fields(decoded), fields(task))
+        self.assertFalse(decoded.is_dirty)
+        self.assertEqual(decoded.saved_version, task.version)
+
+    def test_mutations_append_to_journal(self):
+        """Test that a mutation appends to the journal instead of rewriting the snapshot."""
+        storage = TaskStorage(self.storage_path)
+        storage.add_task(Task("First"))
+        storage.compact()
+        snapshot_generation = storage._snapshot_generation()
+
+        storage.add_task(Task("Second"))
+
+        self.assertEqual(storage._snapshot_generation(), snapshot_generation)
+        with open(storage.journal_path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(len(TaskStorage(self.storage_path).tasks), 2)
+
+    def test_refresh_reads_only_journal_tail(self):
+        """Test that refresh picks up another writer's changes without a full reload."""
+        reader = TaskStorage(self.storage_path)
+        writer = TaskStorage(self.storage_path)
+        task = Task("From writer")
+        writer.add_task(task)
+        offset = reader._journal_offset
+
+        reader.refresh()
+
+        self.assertIn(task.id, reader.tasks)
+        self.assertGreater(reader._journal_offset, offset)
+
+        # A second refresh with nothing new reads nothing
+        offset = reader._journal_offset
+        reader.refresh()
+        self.assertEqual(reader._journal_offset, offset)
+
+    def test_text_index_is_built_on_first_search(self):
+        """Test that loading skips the full-text index until something searches."""
+        storage = TaskStorage(self.storage_path)
+        storage.add_task(Task("alpha report"))
+        self.assertIsNone(storage._text_index)
+
+        self.assertEqual([task.title for task in storage.search_tasks("alpha")], ["alpha report"])
+        storage.add_task(Task("alpha review"))
+        self.assertEqual(len(storage.search_tasks("alpha")), 2)
+
+        storage.load()
+        self.assertIsNone(storage._text_index)
+        self.assertEqual(len(storage.search_tasks("alpha")), 2)
+
+    def test_refresh_after_compaction_reloads_snapshot(self):
+        """Test that a compacted store is detected and reloaded."""
+        reader = TaskStorage(self.storage_path)
+        writer = TaskStorage(self.storage_path)
+        writer.add_task(Task("One"))
+        writer.delete_task(writer.add_task(Task("Two")))
+        writer.compact()
+
+        reader.refresh()
+
+        self.assertEqual(set(reader.tasks), set(writer.tasks))
+        self.assertEqual(reader._generation, writer._generation)
+
+    def test_save_keeps_other_writers_changes(self):
+        """Test that saving stale in-memory state does not drop another process's tasks."""
+        first = TaskStorage(self.storage_path)
+        second = TaskStorage(self.storage_path)
+        shared = Task("Shared")
+        first.add_task(shared)
+        second.refresh()
+
+        second.add_task(Task("Added by second"))
+        first.get_task(shared.id).priority = TaskPriority.URGENT
+        first.save()
+
+        reloaded = TaskStorage(self.storage_path)
+        self.assertEqual(len(reloaded.tasks), 2)
+        self.assertEqual(reloaded.get_task(shared.id).priority, TaskPriority.URGENT)
+
+    def test_updates_are_journaled_as_field_deltas(self):
+        """Test that an update writes only the changed fields and notifies listeners."""
+        storage = TaskStorage(self.storage_path)
+        task_id = storage.add_task(Task("Task"))
+        events = []
+        storage.add_listener(lambda op, task, changes: events.append((op, changes)))
+
+        storage.update_task(task_id, priority=TaskPriority.URGENT)
+
+        with open(storage.journal_path) as f:
+            record = json.loads(f.readlines()[-1])
+        self.assertEqual(record["op"], "patch")
+        self.assertEqual(set(record["fields"]), {"priority", "updated_at"})
+        self.assertEqual(events[0][0], "patch")
+        self.assertEqual(events[0][1]["priority"], (TaskPriority.MEDIUM, TaskPriority.URGENT))
+
+    def test_concurrent_edits_to_different_fields_merge(self):
+        """Test that two writers editing different fields of one task both win."""
+        first = TaskStorage(self.storage_path)
+        task_id = first.add_task(Task("Shared"))
+        second = TaskStorage(self.storage_path)
+
+        second.get_task(task_id).description = "From second"
+        second.save()
+        first.get_task(task_id).priority = TaskPriority.HIGH
+        first.save()
+
+        reloaded = TaskStorage(self.storage_path).get_task(task_id)
+        self.assertEqual(reloaded.description, "From second")
+        self.assertEqual(reloaded.priority, TaskPriority.HIGH)
+        self.assertEqual(first.get_task(task_id).description, "From second")
+
+    def test_concurrent_patches_keep_versions_increasing(self):
+        """Test that merging another writer's patch never lowers a task's version."""
+        first = TaskStorage(self.storage_path)
+        task_id = first.add_task(Task("Shared"))
+        second = TaskStorage(self.storage_path)
+
+        second.get_task(task_id).description = "From second"
+        second.save()
+        task = first.get_task(task_id)
+        task.priority = TaskPriority.HIGH
+        task.title = "Renamed"
+        task.description = "From first"
+        first.save()
+        second.get_task(task_id).title = "Renamed again"
+        second.save()
+
+        with open(first.journal_path) as f:
+            records = [json.loads(line) for line in f]
+        versions = [record["version"] for record in records if record["op"] == "patch"]
+        self.assertEqual(len(versions), 3)
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertEqual(first.get_task(task_id).version, versions[1])
+        self.assertEqual(TaskStorage(self.storage_path).get_task(task_id).version, versions[-1])
+
+    @unittest.skipIf(fcntl is None, "advisory file locking is not available")
+    def test_concurrent_writers_lose_no_updates(self):
+        """Stress test: several processes mutate the same store at once."""
+        storage = TaskStorage(self.storage_path)
+        shared_task_id = storage.add_task(Task("Shared"))
+
+        context = multiprocessing.get_context("fork")
+        writers = [
+            context.Process(target=_concurrent_writer, args=(self.storage_path, shared_task_id, writer))
+            for writer in range(WRITERS)
+        ]
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        reloaded = TaskStorage(self.storage_path)
+        self.assertEqual(len(reloaded.tasks), WRITERS * TASKS_PER_WRITER + 1)
+        created = [task for task in reloaded.tasks.values() if task.id != shared_task_id]
+        self.assertTrue(all(task.priority == TaskPriority.HIGH for task in created))
+        self.assertEqual(
+            sorted(reloaded.get_task(shared_task_id).tags),
+            sorted(f"writer-{writer}" for writer in range(WRITERS))
+        )
+
+    @unittest.skipIf(fcntl is None, "advisory file locking is not available")
+    def test_concurrent_appends_keep_journal_lines_whole(self):
+        """Test that large records appended from several processes never interleave."""
+        TaskStorage(self.storage_path)
+        # Records well over a pipe buffer, so a torn write would show
+        run_writers(self.storage_path, writers=4, commits=30, payload="x" * 8192)
+
+        check_store(self.storage_path, writers=4, commits=30)
+        with open(self.storage_path + ".journal") as f:
+            titles = [json.loads(line)["task"]["title"] for line in f]
+        for writer in range(4):
+            # Each writer's commits are in the journal in the order it made them
+            self.assertEqual([title for title in titles if title.startswith(f"writer {writer} ")],
+                             [f"writer {writer} commit {i}" for i in range(30)])
+
+
+if __name__ == '__main__':
+    unittest.main()
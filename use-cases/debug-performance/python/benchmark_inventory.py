@@ -0,0 +1,260 @@
+# benchmark_inventory.py
+"""
+Scaling benchmarks for inventory_analysis.
+
+Every engine is run on seeded synthetic catalogues of several sizes, price
+distributions and margin widths. Wall time, peak memory and the number of
+pairs found are written to JSON, and can be compared with a stored baseline:
+
+    python benchmark_inventory.py --output results.json
+    python benchmark_inventory.py --sizes 1000 10000 --baseline results.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import inventory_analysis
+from inventory_analysis import (
+    count_product_combinations,
+    find_product_combinations,
+    find_product_pairs_numpy,
+    find_product_pairs_parallel,
+)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+DISTRIBUTIONS = ("integer", "uniform", "normal", "lognormal")
+
+MARGINS = (0.5, 5, 50)
+
+TARGET_PRICE = 500
+
+# Engines that list every pair are skipped when a case has more pairs than this
+DEFAULT_MAX_PAIRS = 5_000_000
+
+# Timings this much slower than the baseline count as regressions
+DEFAULT_TOLERANCE = 0.25
+
+
+def make_catalogue(size, distribution, seed=0):
+    """
+    Build a reproducible list of products whose prices follow distribution.
+
+    Args:
+        size: Number of products
+        distribution: "integer" (whole prices from 5 to 500, with many ties),
+            "uniform" (prices from 5 to 500 in cents), "normal" (around 250)
+            or "lognormal" (skewed towards cheap products)
+        seed: Random seed; the same seed always gives the same catalogue
+
+    Returns:
+        List of dictionaries with 'id', 'name', and 'price' keys
+    """
+    rng = random.Random(f"{seed}:{distribution}:{size}")
+    if distribution == "integer":
+        draw = lambda: rng.randint(5, 500)
+    elif distribution == "uniform":
+        draw = lambda: round(rng.uniform(5, 500), 2)
+    elif distribution == "normal":
+        draw = lambda: max(1.0, round(rng.gauss(250, 75), 2))
+    elif distribution == "lognormal":
+        draw = lambda: round(rng.lognormvariate(5, 0.8), 2)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return [{'id': i, 'name': f'Product {i}', 'price': draw()} for i in range(size)]
+
+
+# name -> (run(products, target_price, price_margin), lists every pair, needs NumPy)
+ENGINES = {
+    "python": (lambda products, target, margin:
+               len(find_product_combinations(products, target, margin, progress=None)), True, False),
+    "numpy": (lambda products, target, margin:
+              len(find_product_pairs_numpy(products, target, margin)), True, True),
+    "parallel": (lambda products, target, margin:
+                 len(find_product_pairs_parallel(products, target, margin)), True, True),
+    "nearest100": (lambda products, target, margin:
+                   len(find_product_combinations(products, target, margin, limit=100)), False, False),
+    "count": (count_product_combinations, False, False),
+}
+
+
+def measure(run, repeat=3, memory=True):
+    """
+    Time run() and measure its peak memory.
+
+    Returns:
+        (seconds, peak_bytes, result): the best of repeat wall times, the peak
+        memory allocated during one extra run traced with tracemalloc (None
+        if memory is False), and what run() returned
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    peak_bytes = None
+    if memory:
+        # Traced separately: tracemalloc slows allocation-heavy code down
+        tracemalloc.start()
+        try:
+            run()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return min(times), peak_bytes, result
+
+
+def run_benchmarks(sizes=SIZES, distributions=DISTRIBUTIONS, margins=MARGINS, engines=None,
+                   target_price=TARGET_PRICE, seed=0, repeat=3, memory=True,
+                   max_pairs=DEFAULT_MAX_PAIRS, progress=None):
+    """
+    Run every engine on every combination of size, distribution and margin.
+
+    The number of matching pairs is counted first, without listing them, and
+    engines that list every pair skip cases with more than max_pairs pairs.
+    Engines that need NumPy are skipped when it is not installed. Peak
+    memory covers this process only, not the worker processes of the
+    parallel engine.
+
+    Args:
+        sizes, distributions, margins: The cases to run
+        engines: Names from ENGINES; all of them by default
+        target_price: The target combined price for every case
+        seed: Seed for make_catalogue
+        repeat: Timed runs per measurement; the fastest is recorded
+        memory: Also measure peak memory
+        max_pairs: Largest pair count an engine that lists pairs is run on
+        progress: Called as progress(done, total, result) after each
+            measurement; None for no progress reports
+
+    Returns:
+        List of result dictionaries with 'size', 'distribution', 'margin',
+        'engine', 'seconds', 'peak_bytes' and 'pairs', or 'skipped' giving
+        the reason an engine was not run
+    """
+    engines = list(ENGINES) if engines is None else list(engines)
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+
+    total = len(sizes) * len(distributions) * len(margins) * len(engines)
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            products = make_catalogue(size, distribution, seed)
+            for margin in margins:
+                expected = count_product_combinations(products, target_price, margin)
+                for engine in engines:
+                    run, lists_pairs, needs_numpy = ENGINES[engine]
+                    result = {
+                        'size': size,
+                        'distribution': distribution,
+                        'margin': margin,
+                        'engine': engine,
+                    }
+                    if needs_numpy and inventory_analysis.np is None:
+                        result['skipped'] = "NumPy is not installed"
+                    elif lists_pairs and expected > max_pairs:
+                        result['skipped'] = f"{expected} pairs is more than max_pairs"
+                    else:
+                        seconds, peak_bytes, pairs = measure(
+                            lambda: run(products, target_price, margin), repeat, memory)
+                        result.update(seconds=seconds, peak_bytes=peak_bytes, pairs=pairs)
+                    results.append(result)
+                    if progress is not None:
+                        progress(len(results), total, result)
+            del products
+    return results
+
+
+def _case(result):
+    return (result['engine'], result['size'], result['distribution'], result['margin'])
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results with a baseline from an earlier run.
+
+    Only cases measured in both are compared. A case regresses when it
+    takes more than (1 + tolerance) times its baseline time or peak memory,
+    or finds a different number of pairs.
+
+    Returns:
+        List of (result, baseline result, reason) for each regression
+    """
+    previous = {_case(result): result for result in baseline if 'skipped' not in result}
+    regressions = []
+    for result in results:
+        before = previous.get(_case(result))
+        if before is None or 'skipped' in result:
+            continue
+        if result['pairs'] != before['pairs']:
+            regressions.append((result, before, f"found {result['pairs']} pairs, not {before['pairs']}"))
+        if result['seconds'] > before['seconds'] * (1 + tolerance):
+            regressions.append((result, before, f"{result['seconds']:.3f}s, was {before['seconds']:.3f}s"))
+        if (result['peak_bytes'] is not None and before.get('peak_bytes') is not None
+                and result['peak_bytes'] > before['peak_bytes'] * (1 + tolerance)):
+            regressions.append((result, before, f"peak {result['peak_bytes']} bytes, was {before['peak_bytes']}"))
+    return regressions
+
+
+def print_result(done, total, result):
+    case = f"[{done}/{total}] {result['engine']:>10} n={result['size']:<9} {result['distribution']:<9} ±{result['margin']:<5}"
+    if 'skipped' in result:
+        print(f"{case} skipped: {result['skipped']}")
+    else:
+        memory = "" if result['peak_bytes'] is None else f" {result['peak_bytes'] / 2 ** 20:9.1f} MiB"
+        print(f"{case} {result['seconds']:9.4f}s{memory} {result['pairs']} pairs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark inventory_analysis on synthetic catalogues")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=DISTRIBUTIONS)
+    parser.add_argument("--margins", type=float, nargs="+", default=MARGINS)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--target", type=float, default=TARGET_PRICE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run for peak memory")
+    parser.add_argument("--max-pairs", type=int, default=DEFAULT_MAX_PAIRS)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.distributions, args.margins, args.engines,
+                             args.target, args.seed, args.repeat, not args.no_memory,
+                             args.max_pairs, None if args.quiet else print_result)
+    report = {
+        'python': platform.python_version(),
+        'numpy': None if inventory_analysis.np is None else inventory_analysis.np.__version__,
+        'machine': platform.platform(),
+        'target_price': args.target,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for result, _, reason in regressions:
+            print(f"REGRESSION {result['engine']} n={result['size']} "
+                  f"{result['distribution']} ±{result['margin']}: {reason}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
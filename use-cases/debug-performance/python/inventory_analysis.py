@@ -1,49 +1,1010 @@
 # inventory_analysis.py
-def find_product_combinations(products, target_price, price_margin=10):
+import os
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify, heappop, heappush, nsmallest
+from itertools import combinations, islice, product as cartesian_product
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for engine="numpy"
+    np = None
+
+# Memory the NumPy engine may use for the pairs of one block of products
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Bytes of intermediate arrays per candidate pair: positions, indexes, sums, differences
+BYTES_PER_PAIR = 48
+
+# Smaller catalogues are searched in this process: a pool costs more than it saves
+PARALLEL_MIN_PRODUCTS = 200_000
+
+# Ranges of products handed out per worker process, for load balancing
+PARALLEL_RANGES_PER_WORKER = 4
+
+
+def sort_by_price(products):
+    """
+    Order products by price.
+
+    Args:
+        products: List of dictionaries with a 'price' key
+
+    Returns:
+        (order, prices): the product indexes in price order, and their prices
+    """
+    order = sorted(range(len(products)), key=lambda i: products[i]['price'])
+    prices = [products[i]['price'] for i in order]
+    return order, prices
+
+
+def partner_range(prices, price, low, high, start=0):
+    """
+    Find the sorted prices that bring a product's price within [low, high].
+
+    The bisect bounds are computed as low - price and high - price, which can
+    round differently from the price + partner sum that is actually checked,
+    so the edges are nudged until they agree with that sum exactly.
+
+    Args:
+        prices: Prices sorted in ascending order
+        price: The price of the product looking for partners
+        low: Lowest acceptable combined price
+        high: Highest acceptable combined price
+        start: First position of prices to consider
+
+    Returns:
+        (lo, hi) such that low <= price + prices[q] <= high for lo <= q < hi
+    """
+    lo = first_sum_at_least(prices, price, low, start)
+    return lo, max(lo, first_sum_above(prices, price, high, start))
+
+
+def first_sum_at_least(prices, price, bound, start=0):
+    """Return the first position q >= start where price + prices[q] >= bound."""
+    q = bisect_left(prices, bound - price, start)
+    while q > start and bound <= price + prices[q - 1]:
+        q -= 1
+    while q < len(prices) and price + prices[q] < bound:
+        q += 1
+    return q
+
+
+def first_sum_above(prices, price, bound, start=0):
+    """Return the first position q >= start where price + prices[q] > bound."""
+    q = bisect_right(prices, bound - price, start)
+    while q > start and price + prices[q - 1] > bound:
+        q -= 1
+    while q < len(prices) and price + prices[q] <= bound:
+        q += 1
+    return q
+
+
+def make_pair(product1, product2, target_price):
+    """Build one result dictionary, as find_product_combinations returns them."""
+    combined_price = product1['price'] + product2['price']
+    return {
+        'product1': product1,
+        'product2': product2,
+        'combined_price': combined_price,
+        'price_difference': abs(target_price - combined_price)
+    }
+
+
+def print_progress(position, total):
+    print(f"Processing product {position+1} of {total}")
+
+
+def find_product_combinations(products, target_price, price_margin=10, engine="python", limit=None,
+                              progress=print_progress):
     """
     Find all pairs of products where the combined price is within
     the target_price ± price_margin range.
 
+    Products are sorted by price once; each product's partners then form a
+    contiguous run of the sorted prices, found with bisect, so only matching
+    pairs are ever visited: O(n log n + k log k) for k matches instead of
+    trying all n² pairs.
+
     Args:
         products: List of dictionaries with 'id', 'name', and 'price' keys
         target_price: The ideal combined price
         price_margin: Acceptable deviation from the target price
+        engine: "python", "numpy" to search with find_product_pairs_numpy, or
+            "parallel" for find_product_pairs_parallel
+        limit: Return only the first limit pairs. They are found by walking
+            outwards from the target price (see pairs_by_difference), so the
+            other pairs are never built: O(n log n + limit log n) time and
+            O(n + limit) memory, with either engine.
+        progress: Called as progress(position, total) every 100 products by
+            the python engine; None for no progress reports
 
     Returns:
-        List of dictionaries with product pairs and their combined price
-    """
-    results = []
-
-    # For each possible pair of products
-    for i in range(len(products)):
-        if i % 100 == 0:
-            print(f"Processing product {i+1} of {len(products)}")
-        for j in range(len(products)):
-            # Skip comparing a product with itself
-            if i != j:
-                product1 = products[i]
-                product2 = products[j]
-
-                # Calculate combined price
-                combined_price = product1['price'] + product2['price']
-
-                # Check if the combined price is within the target range
-                if (target_price - price_margin) <= combined_price <= (target_price + price_margin):
-                    # Avoid duplicates like (product1, product2) and (product2, product1)
-                    if not any(r['product1']['id'] == product2['id'] and
-                               r['product2']['id'] == product1['id'] for r in results):
-
-                        pair = {
-                            'product1': product1,
-                            'product2': product2,
-                            'combined_price': combined_price,
-                            'price_difference': abs(target_price - combined_price)
-                        }
-                        results.append(pair)
+        List of dictionaries with product pairs and their combined price.
+        Each pair appears once, with product1 the product that comes first
+        in the input list; pairs are sorted by price difference, then by
+        input position.
+    """
+    if limit is not None:
+        return [
+            make_pair(products[i], products[j], target_price)
+            for _, i, j in islice(pairs_by_difference(products, target_price, price_margin), limit)
+        ]
+    if engine == "numpy":
+        return find_product_pairs_numpy(products, target_price, price_margin).to_list()
+    if engine == "parallel":
+        return find_product_pairs_parallel(products, target_price, price_margin).to_list()
+    if engine != "python":
+        raise ValueError(f"Unknown engine: {engine}")
+
+    matches = []
+    for i, j in sweep_pairs(products, target_price, price_margin, progress):
+        combined_price = products[i]['price'] + products[j]['price']
+        matches.append((abs(target_price - combined_price), i, j, combined_price))
 
     # Sort by price difference from target
-    results.sort(key=lambda x: x['price_difference'])
-    return results
+    matches.sort()
+    return [
+        {
+            'product1': products[i],
+            'product2': products[j],
+            'combined_price': combined_price,
+            'price_difference': price_difference
+        }
+        for price_difference, i, j, combined_price in matches
+    ]
+
+
+def sweep_pairs(products, target_price, price_margin=10, progress=None):
+    """
+    Lazily yield the input indexes (i, j), i < j, of every pair in the margin.
+
+    Pairs come in the order the sort-and-sweep finds them: grouped by the
+    cheaper product, cheapest first. progress, if given, is called as
+    progress(position, total) every 100 products.
+    """
+    low = target_price - price_margin
+    high = target_price + price_margin
+    order, prices = sort_by_price(products)
+
+    for position, price in enumerate(prices):
+        if progress is not None and position % 100 == 0:
+            progress(position, len(prices))
+        # Only look ahead, so each unordered pair is found once
+        lo, hi = partner_range(prices, price, low, high, position + 1)
+        for partner in range(lo, hi):
+            i, j = order[position], order[partner]
+            yield (i, j) if i < j else (j, i)
+
+
+def iter_product_combinations(products, target_price, price_margin=10, ordered=True):
+    """
+    Yield the pairs find_product_combinations returns, one at a time.
+
+    Nothing is collected, so a caller writing pairs out (to a CSV file or
+    an HTTP response) can start at once, and memory stays O(n) however many
+    pairs there are.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+        ordered: Yield pairs closest to the target first, in the order
+            find_product_combinations returns them (see pairs_by_difference).
+            With False, pairs come in the order the sweep finds them, which
+            is cheaper: no heap, O(1) work per pair.
+
+    Yields:
+        Dictionaries like those find_product_combinations returns
+    """
+    if ordered:
+        pairs = ((i, j) for _, i, j in pairs_by_difference(products, target_price, price_margin))
+    else:
+        pairs = sweep_pairs(products, target_price, price_margin)
+    for i, j in pairs:
+        yield make_pair(products[i], products[j], target_price)
+
+
+def pairs_by_difference(products, target_price, price_margin=10):
+    """
+    Lazily yield the pairs find_product_combinations returns, in its order.
+
+    Products are sorted by price. For each product, its partners further up
+    the sorted order are walked in two directions from the partner that
+    brings the sum closest to the target: up through sums at or above the
+    target and down through sums below it, so each walk meets ever larger
+    price differences. A heap holding the next pair of every walk then
+    yields pairs closest first, and a walk ends at the edge of the margin.
+
+    Equal prices keep their input order when sorted, and each walk steps
+    through a run of equal prices in that order, so pairs with the same
+    difference come out ordered by input position too. (Different sums can
+    only have the same difference through float rounding, as with prices far
+    larger than their differences; such ties may come out of input order.)
+
+    Memory is O(n) however many pairs are yielded; each pair costs O(log n).
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+
+    Yields:
+        (price_difference, i, j): the input indexes of a pair, i < j
+    """
+    low = target_price - price_margin
+    high = target_price + price_margin
+    order, prices = sort_by_price(products)
+    n = len(prices)
+
+    # First position of the run of equal prices each position belongs to
+    run_start = list(range(n))
+    for position in range(1, n):
+        if prices[position] == prices[position - 1]:
+            run_start[position] = run_start[position - 1]
+
+    heap = []
+
+    def entry(a, b, step):
+        combined_price = prices[a] + prices[b]
+        if low <= combined_price <= high:
+            i, j = order[a], order[b]
+            if i > j:
+                i, j = j, i
+            return (abs(target_price - combined_price), i, j, a, b, step)
+        return None
+
+    def push(a, b, step):
+        next_entry = entry(a, b, step)
+        if next_entry is not None:
+            heappush(heap, next_entry)
+
+    def start_of_run(a, end):
+        # The walk down enters the run of equal prices ending before end at its first position
+        return max(run_start[end - 1], a + 1)
+
+    for a in range(n):
+        split = first_sum_at_least(prices, prices[a], target_price, a + 1)
+        if split < n:
+            heap.append(entry(a, split, 1))
+        if split - 1 > a:
+            heap.append(entry(a, start_of_run(a, split), -1))
+    heap = [first_entry for first_entry in heap if first_entry is not None]
+    heapify(heap)
+
+    while heap:
+        price_difference, i, j, a, b, step = heappop(heap)
+        yield price_difference, i, j
+        if step == 1:
+            if b + 1 < n:
+                push(a, b + 1, 1)
+        elif b + 1 < n and run_start[b + 1] == run_start[b]:
+            push(a, b + 1, -1)
+        elif run_start[b] - 1 > a:
+            push(a, start_of_run(a, run_start[b]), -1)
+
+
+def count_pairs_below(prices, bound, inclusive=False):
+    """
+    Count the pairs of sorted prices whose sum is below bound (or equal, if inclusive).
+
+    Two pointers: as the first price goes up, the last partner that keeps the
+    sum below bound can only move down, so this is O(n) for sorted prices.
+    """
+    total = 0
+    hi = len(prices)
+    for a, price in enumerate(prices):
+        # hi is the first position whose sum with price is past the bound
+        while hi > 0 and (price + prices[hi - 1] > bound if inclusive
+                          else price + prices[hi - 1] >= bound):
+            hi -= 1
+        if hi <= a + 1:
+            break
+        total += hi - (a + 1)
+    return total
+
+
+def count_product_combinations(products, target_price, price_margin=10):
+    """
+    Count the pairs find_product_combinations would return, without finding them.
+
+    O(n log n) for the sort and O(n) after it, however many pairs match.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+
+    Returns:
+        The number of pairs whose combined price is within target_price ± price_margin
+    """
+    _, prices = sort_by_price(products)
+    low = target_price - price_margin
+    high = target_price + price_margin
+    if low > high:
+        return 0
+    return count_pairs_below(prices, high, inclusive=True) - count_pairs_below(prices, low)
+
+
+def combined_price_histogram(products, bins=10, price_range=None):
+    """
+    Count pairs of products by combined price, like numpy.histogram of every pair sum.
+
+    Each bin is counted from the number of pairs below its edges (see
+    count_pairs_below), so this is O(n log n + bins * n) without visiting
+    any pair.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        bins: Number of equal-width bins, or a sequence of ascending bin edges
+        price_range: (lowest, highest) combined price covered by equal-width
+            bins; defaults to the cheapest and dearest pair
+
+    Returns:
+        (counts, edges): counts[k] is the number of pairs with
+        edges[k] <= combined price < edges[k + 1]; the last bin also
+        includes its upper edge
+    """
+    _, prices = sort_by_price(products)
+    if isinstance(bins, int):
+        if price_range is None:
+            if len(prices) < 2:
+                price_range = (0, 1)
+            else:
+                price_range = (prices[0] + prices[1], prices[-2] + prices[-1])
+        first, last = price_range
+        if first == last:
+            first, last = first - 0.5, last + 0.5
+        # numpy.histogram_bin_edges' arithmetic, so a pair on an edge lands in the same bin
+        step = (last - first) / bins
+        edges = [k * step + first for k in range(bins)] + [last]
+    else:
+        edges = list(bins)
+
+    below = [count_pairs_below(prices, edge) for edge in edges[:-1]]
+    below.append(count_pairs_below(prices, edges[-1], inclusive=True))
+    counts = [below[k + 1] - below[k] for k in range(len(edges) - 1)]
+    return counts, edges
+
+
+def _iter_triples(prices, low, high):
+    """Yield sorted positions (a, b, c), a < b < c, whose prices sum within [low, high]."""
+    n = len(prices)
+    for a in range(n - 2):
+        # As the second price goes up, the run of valid third prices moves down
+        lo = hi = n
+        for b in range(a + 1, n - 1):
+            price = prices[a] + prices[b]
+            while lo > 0 and low <= price + prices[lo - 1]:
+                lo -= 1
+            while hi > 0 and price + prices[hi - 1] > high:
+                hi -= 1
+            if hi <= b + 1:
+                break
+            for c in range(max(lo, b + 1), hi):
+                yield a, b, c
+
+
+def _iter_quadruples(prices, low, high):
+    """
+    Yield sorted positions (a, b, c, d), a < b < c < d, whose prices sum within [low, high].
+
+    Meet in the middle: every pair sum that could be half of a bundle is
+    sorted once, then each pair (c, d) looks up the pairs (a, b) that
+    complete it. A bundle's cheaper pair never sums to more than its
+    dearer one, so only pair sums ranked before (c, d) are searched, and
+    b < c picks the one split of the four positions that counts it.
+    """
+    n = len(prices)
+    if n < 4:
+        return
+    cheapest = prices[0] + prices[1]
+    dearest = prices[-2] + prices[-1]
+    pairs = sorted(
+        (prices[a] + prices[b], a, b)
+        for a in range(n - 1) for b in range(a + 1, n)
+        if prices[a] + prices[b] + dearest >= low and prices[a] + prices[b] + cheapest <= high
+    )
+    sums = [pair_sum for pair_sum, _, _ in pairs]
+    for rank, (pair_sum, c, d) in enumerate(pairs):
+        lo, hi = partner_range(sums, pair_sum, low, high)
+        for partner in range(lo, min(hi, rank)):
+            _, a, b = pairs[partner]
+            if b < c:
+                yield a, b, c, d
+
+
+def find_product_bundles(products, target_price, price_margin=10, size=3, limit=None):
+    """
+    Find bundles of size products whose combined price is within target_price ± price_margin.
+
+    Like find_product_combinations, this works on the products sorted by
+    price. Pairs come from the same sweep; for three products, each
+    cheapest product is combined with a second one while two pointers track
+    the run of valid third products, O(n² + k); four products are found by
+    meeting in the middle over sorted pair sums, O(n² log n) plus the
+    candidate pairs visited, with O(n²) memory for the pair sums. Each
+    bundle is found once, whatever the order of its products.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+        size: Products per bundle: 2, 3 or 4
+        limit: Return only the limit bundles closest to the target price
+
+    Returns:
+        List of dictionaries with the bundle's 'products' (in input order),
+        'combined_price' and 'price_difference', sorted by price difference
+        and then by input position. Float prices are added cheapest first,
+        so the last digit of a combined price may differ from summing them
+        in another order.
+    """
+    low = target_price - price_margin
+    high = target_price + price_margin
+    if size == 2:
+        bundles = sweep_pairs(products, target_price, price_margin)
+    elif size in (3, 4):
+        order, prices = sort_by_price(products)
+        find = _iter_triples if size == 3 else _iter_quadruples
+        bundles = (tuple(sorted(order[position] for position in positions))
+                   for positions in find(prices, low, high))
+    else:
+        raise ValueError(f"Bundles of {size} products are not supported; use 2, 3 or 4")
+
+    def ranked():
+        for indexes in bundles:
+            prices = sorted(products[i]['price'] for i in indexes)
+            combined_price = (prices[0] + prices[1]) + (prices[2] + prices[3]) if size == 4 else sum(prices)
+            yield abs(target_price - combined_price), indexes, combined_price
+
+    matches = sorted(ranked()) if limit is None else nsmallest(limit, ranked())
+    return [
+        {
+            'products': [products[i] for i in indexes],
+            'combined_price': combined_price,
+            'price_difference': price_difference
+        }
+        for price_difference, indexes, combined_price in matches
+    ]
+
+
+class ProductPairs:
+    """
+    Product pairs found by find_product_pairs_numpy, held as parallel arrays.
+
+    first[k] and second[k] are the input indexes of the k-th pair (first <
+    second), with combined_prices and price_differences alongside. The
+    dictionaries find_product_combinations returns are only built on demand:
+    indexing or iterating builds them one at a time, and to_list() builds
+    them all.
+    """
+
+    def __init__(self, products, target_price, first, second, combined_prices, price_differences):
+        self.products = products
+        self.target_price = target_price
+        self.first = first
+        self.second = second
+        self.combined_prices = combined_prices
+        self.price_differences = price_differences
+
+    def __len__(self):
+        return len(self.first)
+
+    def __getitem__(self, k):
+        # Recomputed from the products, so prices keep their own type
+        return make_pair(self.products[self.first[k]], self.products[self.second[k]], self.target_price)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def to_list(self):
+        return list(self)
+
+
+def _clip_partner_ranges(sorted_prices, prices, low, high, lo, hi, start):
+    """Vectorised version of the edge corrections in partner_range."""
+    n = len(sorted_prices)
+    while True:
+        move = (lo > start) & (low <= prices + sorted_prices[np.maximum(lo - 1, 0)])
+        if not move.any():
+            break
+        lo -= move
+    while True:
+        move = (lo < n) & (prices + sorted_prices[np.minimum(lo, n - 1)] < low)
+        if not move.any():
+            break
+        lo += move
+    hi = np.maximum(hi, lo)
+    while True:
+        move = (hi < n) & (prices + sorted_prices[np.minimum(hi, n - 1)] <= high)
+        if not move.any():
+            break
+        hi += move
+    while True:
+        move = (hi > lo) & (prices + sorted_prices[np.maximum(hi - 1, 0)] > high)
+        if not move.any():
+            break
+        hi -= move
+    return lo, hi
+
+
+def find_product_pairs_numpy(products, target_price, price_margin=10,
+                             max_block_bytes=DEFAULT_BLOCK_BYTES, sort=True):
+    """
+    Find the same pairs as find_product_combinations, using NumPy.
+
+    Prices are copied into one float64 array and sorted. Every product's run
+    of partners is found at once with searchsorted; products are then
+    expanded into pairs a block at a time, with each block sized so that its
+    intermediate arrays stay under max_block_bytes. Integer prices are exact
+    up to 2**53.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+        max_block_bytes: Memory ceiling for the intermediate arrays of a block
+        sort: Order pairs as find_product_combinations does; with False they
+            come in no particular order, which saves a sort of every pair
+
+    Returns:
+        ProductPairs holding the input indexes of each pair
+    """
+    if np is None:
+        raise ImportError("The numpy engine needs NumPy: pip install numpy")
+
+    low = target_price - price_margin
+    high = target_price + price_margin
+    sorted_prices, order = _sorted_price_arrays(products)
+    pairs = _expand_pairs(sorted_prices, order, low, high, 0, len(products), max_block_bytes)
+    return _rank_pairs(products, target_price, *pairs, sort=sort)
+
+
+def _sorted_price_arrays(products):
+    """Return (sorted prices, input index of each) as NumPy arrays."""
+    n = len(products)
+    index_type = np.int32 if n < 2 ** 31 else np.int64
+    prices = np.fromiter((product['price'] for product in products), dtype=np.float64, count=n)
+    order = np.argsort(prices, kind="stable").astype(index_type)
+    return prices[order], order
+
+
+def _expand_pairs(sorted_prices, order, low, high, begin, end, max_block_bytes):
+    """
+    Find the pairs whose cheaper product is at sorted positions begin..end-1.
+
+    Returns (first, second, combined_prices) arrays, first < second being
+    input indexes.
+    """
+    # Only look ahead, so each unordered pair is found once
+    prices = sorted_prices[begin:end]
+    start = np.arange(begin + 1, end + 1, dtype=np.int64)
+    lo = np.maximum(np.searchsorted(sorted_prices, low - prices, "left"), start)
+    hi = np.searchsorted(sorted_prices, high - prices, "right")
+    lo, hi = _clip_partner_ranges(sorted_prices, prices, low, high, lo, hi, start)
+    counts = hi - lo
+
+    # Split the products into blocks of at most max_pairs pairs (a product
+    # with more partners than that gets a block of its own)
+    max_pairs = max(1, max_block_bytes // BYTES_PER_PAIR)
+    ends = np.cumsum(counts)
+    firsts, seconds, sums = [], [], []
+    block_start = 0
+    while block_start < len(prices):
+        offset = ends[block_start - 1] if block_start else 0
+        block_end = max(block_start + 1, int(np.searchsorted(ends, offset + max_pairs, "right")))
+        block_counts = counts[block_start:block_end]
+        total = int(block_counts.sum())
+        if total:
+            rows = np.repeat(np.arange(block_start, block_end), block_counts)
+            # Position of each pair within its row's run of partners
+            run_starts = np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+            columns = lo[rows] + (np.arange(total) - run_starts)
+            a = order[rows + begin]
+            b = order[columns]
+            firsts.append(np.minimum(a, b))
+            seconds.append(np.maximum(a, b))
+            sums.append(prices[rows] + sorted_prices[columns])
+        block_start = block_end
+
+    if not firsts:
+        empty = np.empty(0, dtype=order.dtype)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    return np.concatenate(firsts), np.concatenate(seconds), np.concatenate(sums)
+
+
+def _rank_pairs(products, target_price, first, second, combined_prices, sort=True):
+    price_differences = np.abs(target_price - combined_prices)
+    if sort:
+        ranking = np.lexsort((second, first, price_differences))
+        first, second = first[ranking], second[ranking]
+        combined_prices, price_differences = combined_prices[ranking], price_differences[ranking]
+    return ProductPairs(products, target_price, first, second, combined_prices, price_differences)
+
+
+def _search_shared_prices(task):
+    """Process pool worker for find_product_pairs_parallel."""
+    prices_name, order_name, n, index_type, low, high, begin, end, max_block_bytes = task
+    prices_memory = shared_memory.SharedMemory(name=prices_name)
+    order_memory = shared_memory.SharedMemory(name=order_name)
+    try:
+        sorted_prices = np.ndarray((n,), dtype=np.float64, buffer=prices_memory.buf)
+        order = np.ndarray((n,), dtype=index_type, buffer=order_memory.buf)
+        pairs = _expand_pairs(sorted_prices, order, low, high, begin, end, max_block_bytes)
+        # The views must go before the segments can be closed
+        del sorted_prices, order
+        return pairs
+    finally:
+        prices_memory.close()
+        order_memory.close()
+
+
+def find_product_pairs_parallel(products, target_price, price_margin=10, workers=None,
+                                min_products=PARALLEL_MIN_PRODUCTS,
+                                max_block_bytes=DEFAULT_BLOCK_BYTES, sort=True):
+    """
+    find_product_pairs_numpy spread over a pool of processes.
+
+    The sorted prices are placed in shared memory once, instead of being
+    copied to every worker. The sorted positions are cut into ranges holding
+    about the same number of pairs, several per worker so that a slow range
+    does not hold up the rest; each worker expands its ranges into index
+    pair arrays exactly as find_product_pairs_numpy does. Sorting the merged
+    pairs into price-difference order happens in this process; pass
+    sort=False to skip it.
+
+    Catalogues smaller than min_products, or workers=1, are searched
+    without a pool, since starting one would cost more than it saves.
+
+    Args:
+        products: List of dictionaries with 'id', 'name', and 'price' keys
+        target_price: The ideal combined price
+        price_margin: Acceptable deviation from the target price
+        workers: Number of processes, os.cpu_count() by default
+        min_products: Smallest catalogue searched in parallel
+        max_block_bytes: Memory ceiling for the intermediate arrays of a
+            block, in each worker
+        sort: Order pairs as find_product_combinations does
+
+    Returns:
+        ProductPairs holding the input indexes of each pair
+    """
+    if np is None:
+        raise ImportError("The numpy engine needs NumPy: pip install numpy")
+    workers = workers or os.cpu_count() or 1
+    n = len(products)
+    if workers == 1 or n < max(min_products, 2):
+        return find_product_pairs_numpy(products, target_price, price_margin, max_block_bytes, sort)
+
+    low = target_price - price_margin
+    high = target_price + price_margin
+    sorted_prices, order = _sorted_price_arrays(products)
+
+    # Balance the ranges by pair count, which is cheap to find for every position
+    start = np.arange(1, n + 1, dtype=np.int64)
+    lo = np.maximum(np.searchsorted(sorted_prices, low - sorted_prices, "left"), start)
+    hi = np.maximum(np.searchsorted(sorted_prices, high - sorted_prices, "right"), lo)
+    ends = np.cumsum(hi - lo)
+    ranges = workers * PARALLEL_RANGES_PER_WORKER
+    cuts = np.searchsorted(ends, ends[-1] * np.arange(1, ranges) / ranges, "left")
+    bounds = sorted(set([0, n] + [int(cut) + 1 for cut in cuts if cut + 1 < n]))
+
+    prices_memory = shared_memory.SharedMemory(create=True, size=max(1, sorted_prices.nbytes))
+    order_memory = shared_memory.SharedMemory(create=True, size=max(1, order.nbytes))
+    try:
+        np.ndarray(sorted_prices.shape, sorted_prices.dtype, buffer=prices_memory.buf)[:] = sorted_prices
+        np.ndarray(order.shape, order.dtype, buffer=order_memory.buf)[:] = order
+        tasks = [
+            (prices_memory.name, order_memory.name, n, order.dtype.str, low, high, begin, end, max_block_bytes)
+            for begin, end in zip(bounds, bounds[1:])
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_search_shared_prices, tasks))
+    finally:
+        prices_memory.close()
+        prices_memory.unlink()
+        order_memory.close()
+        order_memory.unlink()
+
+    first, second, combined_prices = (np.concatenate(arrays) for arrays in zip(*results))
+    return _rank_pairs(products, target_price, first, second, combined_prices, sort=sort)
+
+
+class ProductPriceIndex:
+    """
+    Products grouped by price, for answering many pair queries on one catalogue.
+
+    The index keeps the distinct prices in a sorted list and, for each price,
+    the ids of the products that have it. Queries bisect the price list
+    instead of sorting the catalogue again, and products can be added,
+    removed or repriced without rebuilding the index.
+
+    Pairs are reported as find_product_combinations reports them, and in the
+    same order: product1 is the product that was added to the index first.
+    Product ids must be unique.
+    """
+
+    def __init__(self, products=()):
+        self.products = {}   # id -> product
+        self.prices = []     # distinct prices, ascending
+        self.buckets = {}    # price -> {id: None}
+        self._sequence = {}  # id -> order in which the product was added
+        self._next_sequence = 0
+        self._cumulative = None  # products priced below each position, built on demand
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, product_id):
+        return product_id in self.products
+
+    def _insert(self, product_id, price):
+        bucket = self.buckets.get(price)
+        if bucket is None:
+            bucket = self.buckets[price] = {}
+            insort(self.prices, price)
+        bucket[product_id] = None
+        self._cumulative = None
+
+    def _discard(self, product_id, price):
+        bucket = self.buckets[price]
+        del bucket[product_id]
+        if not bucket:
+            del self.buckets[price]
+            del self.prices[bisect_left(self.prices, price)]
+        self._cumulative = None
+
+    def add(self, product):
+        """Add a product dictionary; raises ValueError if its id is already indexed."""
+        product_id = product['id']
+        if product_id in self.products:
+            raise ValueError(f"Product {product_id} is already in the index")
+        self.products[product_id] = product
+        self._sequence[product_id] = self._next_sequence
+        self._next_sequence += 1
+        self._insert(product_id, product['price'])
+
+    def remove(self, product_id):
+        """Remove a product and return it; raises KeyError if it is not indexed."""
+        product = self.products.pop(product_id)
+        del self._sequence[product_id]
+        self._discard(product_id, product['price'])
+        return product
+
+    def reprice(self, product_id, price):
+        """Change a product's price, updating its dictionary in place."""
+        product = self.products[product_id]
+        self._discard(product_id, product['price'])
+        product['price'] = price
+        self._insert(product_id, price)
+
+    def _bucket_pairs(self, a, b, limit=None):
+        """
+        Yield the product id pairs priced prices[a] and prices[b], earlier-added first.
+
+        With a limit, only pairs of the limit earliest-added products of each
+        price are yielded; the first limit - 1 pairs in pairs() order are
+        always among them.
+        """
+        sequence = self._sequence
+        first = self.buckets[self.prices[a]]
+        second = self.buckets[self.prices[b]]
+        if limit is not None:
+            first = nsmallest(limit, first, key=sequence.__getitem__)
+            second = first if a == b else nsmallest(limit, second, key=sequence.__getitem__)
+        if a == b:
+            candidates = combinations(first, 2)
+        else:
+            candidates = cartesian_product(first, second)
+        # Buckets are in the order products got their price, not the order they were added
+        for id1, id2 in candidates:
+            yield (id1, id2) if sequence[id1] < sequence[id2] else (id2, id1)
+
+    def _make_pairs(self, matches, target_price):
+        matches.sort()
+        products = self.products
+        return [make_pair(products[id1], products[id2], target_price)
+                for _, _, _, id1, id2 in matches]
+
+    def _match(self, id1, id2, difference):
+        sequence = self._sequence
+        return (difference, sequence[id1], sequence[id2], id1, id2)
+
+    def pairs(self, target_price, price_margin=10):
+        """Return every pair within target_price ± price_margin, closest first."""
+        low = target_price - price_margin
+        high = target_price + price_margin
+        prices = self.prices
+        matches = []
+        for a, price in enumerate(prices):
+            # Partners priced at least as high, so each pair is found once
+            lo, hi = partner_range(prices, price, low, high, a)
+            for b in range(lo, hi):
+                difference = abs(target_price - (price + prices[b]))
+                matches.extend(self._match(id1, id2, difference) for id1, id2 in self._bucket_pairs(a, b))
+        return self._make_pairs(matches, target_price)
+
+    def count(self, target_price, price_margin=10):
+        """Return how many pairs pairs() would return, without building them."""
+        low = target_price - price_margin
+        high = target_price + price_margin
+        prices = self.prices
+        if self._cumulative is None:
+            self._cumulative = [0]
+            for price in prices:
+                self._cumulative.append(self._cumulative[-1] + len(self.buckets[price]))
+        cumulative = self._cumulative
+        total = 0
+        for a, price in enumerate(prices):
+            lo, hi = partner_range(prices, price, low, high, a)
+            if lo >= hi:
+                continue
+            size = len(self.buckets[price])
+            if lo == a:
+                total += size * (size - 1) // 2
+                lo += 1
+            total += size * (cumulative[hi] - cumulative[lo])
+        return total
+
+    def nearest(self, target_price, k=10):
+        """
+        Return the k pairs whose combined price is closest to target_price.
+
+        For each price, its partners are walked outwards from the one that
+        brings the sum closest to the target: downwards through sums below
+        the target and upwards through sums at or above it. A heap merges
+        these walks, so only prices that can contribute are looked at. Ties
+        are broken as in pairs(), so this is the first k pairs pairs() would
+        return for a wide enough margin; only the k + 1 earliest-added
+        products of each price can be among them, which bounds the work done
+        for prices shared by many products.
+        """
+        if k <= 0:
+            return []
+        prices = self.prices
+        heap = []
+
+        def push(a, b, step):
+            if a <= b < len(prices):
+                heappush(heap, (abs(target_price - (prices[a] + prices[b])), a, b, step))
+
+        for a, price in enumerate(prices):
+            split = first_sum_at_least(prices, price, target_price, a)
+            push(a, split, 1)
+            push(a, split - 1, -1)
+
+        matches = []
+        cutoff = None
+        while heap:
+            difference, a, b, step = heappop(heap)
+            if cutoff is not None and difference > cutoff:
+                break
+            matches.extend(self._match(id1, id2, difference)
+                           for id1, id2 in self._bucket_pairs(a, b, k + 1))
+            if len(matches) > 2 * k:
+                matches = nsmallest(k, matches)
+            if cutoff is None and len(matches) >= k:
+                # Keep going through pairs just as close, so ties resolve like pairs()
+                cutoff = difference
+            push(a, b + step, step)
+        return self._make_pairs(nsmallest(k, matches), target_price)
+
+
+class LiveProductPairs:
+    """
+    The pairs within one target_price ± price_margin, kept up to date as the catalogue changes.
+
+    Products live in a ProductPriceIndex. Adding, removing or repricing a
+    product only looks at that product's partners, which bisect finds in
+    the index's sorted prices, so a change costs O(log n + d) for a product
+    with d partners instead of a fresh find_product_combinations.
+
+    Subscribers are called as callback(added, removed) after every change
+    that adds or removes pairs, with lists of pair dictionaries like those
+    find_product_combinations returns, closest first. A removed pair's
+    combined_price is the one it had before the change.
+    """
+
+    def __init__(self, target_price, price_margin=10, products=()):
+        self.target_price = target_price
+        self.price_margin = price_margin
+        self.low = target_price - price_margin
+        self.high = target_price + price_margin
+        self.index = ProductPriceIndex()
+        self._pairs = set()  # (id1, id2), id1 added to the index first
+        self._subscribers = []
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, pair):
+        return self._key(*pair) in self._pairs
+
+    def subscribe(self, callback):
+        """Call callback(added, removed) after every change; returns callback."""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def _key(self, id1, id2):
+        sequence = self.index._sequence
+        return (id1, id2) if sequence[id1] < sequence[id2] else (id2, id1)
+
+    def _partner_pairs(self, product_id, price):
+        """Return the pairs product_id would be in, priced at price."""
+        index = self.index
+        prices = index.prices
+        lo, hi = partner_range(prices, price, self.low, self.high)
+        return {self._key(product_id, partner)
+                for b in range(lo, hi)
+                for partner in index.buckets[prices[b]]
+                if partner != product_id}
+
+    def _make_pairs(self, keys):
+        # Only built when someone is listening, from the prices as they are now
+        if not self._subscribers:
+            return []
+        products = self.index.products
+        sequence = self.index._sequence
+        pairs = [make_pair(products[id1], products[id2], self.target_price) for id1, id2 in keys]
+        pairs.sort(key=lambda pair: (pair['price_difference'],
+                                     sequence[pair['product1']['id']],
+                                     sequence[pair['product2']['id']]))
+        return pairs
+
+    def _publish(self, added, removed):
+        if added or removed:
+            for callback in list(self._subscribers):
+                callback(added, removed)
+
+    def add(self, product):
+        """Add a product and the pairs it makes; raises ValueError if its id is already indexed."""
+        self.index.add(product)
+        added = self._partner_pairs(product['id'], product['price'])
+        self._pairs |= added
+        self._publish(self._make_pairs(added), [])
+
+    def remove(self, product_id):
+        """Remove a product and its pairs, and return it; raises KeyError if it is not indexed."""
+        product = self.index.products[product_id]
+        removed = self._partner_pairs(product_id, product['price'])
+        removed_pairs = self._make_pairs(removed)
+        self._pairs -= removed
+        self.index.remove(product_id)
+        self._publish([], removed_pairs)
+        return product
+
+    def reprice(self, product_id, price):
+        """Change a product's price, updating its dictionary in place, and its pairs."""
+        old = self._partner_pairs(product_id, self.index.products[product_id]['price'])
+        new = self._partner_pairs(product_id, price)
+        removed_pairs = self._make_pairs(old - new)
+        self._pairs -= old - new
+        self._pairs |= new - old
+        self.index.reprice(product_id, price)
+        self._publish(self._make_pairs(new - old), removed_pairs)
+
+    def pairs(self):
+        """Return the current pairs, in the order find_product_combinations would."""
+        products = self.index.products
+        sequence = self.index._sequence
+        matches = sorted(
+            (abs(self.target_price - (products[id1]['price'] + products[id2]['price'])),
+             sequence[id1], sequence[id2], id1, id2)
+            for id1, id2 in self._pairs
+        )
+        return [make_pair(products[id1], products[id2], self.target_price)
+                for _, _, _, id1, id2 in matches]
+
 
 # Example usage
 if __name__ == "__main__":
@@ -62,9 +1023,9 @@ if __name__ == "__main__":
 
     # Measure execution time
     print(f"Finding product combinations for {len(product_list)} products")
-    start_time = time.time()
-    combinations = find_product_combinations(product_list, 500, 50)
-    end_time = time.time()
+    start_time = time.perf_counter()
+    pairs = find_product_combinations(product_list, 500, 50)
+    end_time = time.perf_counter()
 
-    print(f"Found {len(combinations)} product combinations")
+    print(f"Found {len(pairs)} product combinations")
     print(f"Execution time: {end_time - start_time:.2f} seconds")
\ No newline at end of file
@@ -0,0 +1,375 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from itertools import combinations
+from multiprocessing import shared_memory
+from unittest.mock import patch
+
+import benchmark_inventory
+import inventory_analysis
+from inventory_analysis import (
+    LiveProductPairs,
+    ProductPriceIndex,
+    combined_price_histogram,
+    count_product_combinations,
+    find_product_bundles,
+    find_product_combinations,
+    find_product_pairs_parallel,
+    first_sum_above,
+    first_sum_at_least,
+    iter_product_combinations,
+    partner_range,
+    sort_by_price,
+)
+
+
+def make_products(prices):
+    return [{'id': i, 'name': f'Product {i}', 'price': price} for i, price in enumerate(prices)]
+
+
+def brute_force_pairs(products, target_price, price_margin):
+    """The original nested loops: (product1 id, product2 id) in result order."""
+    matches = []
+    for i, j in combinations(range(len(products)), 2):
+        combined_price = products[i]['price'] + products[j]['price']
+        if target_price - price_margin <= combined_price <= target_price + price_margin:
+            matches.append((abs(target_price - combined_price), i, j))
+    matches.sort()
+    return [(products[i]['id'], products[j]['id']) for _, i, j in matches]
+
+
+def brute_force_bundles(products, target_price, price_margin, size):
+    matches = []
+    for indexes in combinations(range(len(products)), size):
+        prices = sorted(products[i]['price'] for i in indexes)
+        # Summed as find_product_bundles sums them, cheapest first
+        combined_price = (prices[0] + prices[1]) + (prices[2] + prices[3]) if size == 4 else sum(prices)
+        if target_price - price_margin <= combined_price <= target_price + price_margin:
+            matches.append((abs(target_price - combined_price), indexes))
+    matches.sort()
+    return [indexes for _, indexes in matches]
+
+
+def pair_ids(pairs):
+    return [(pair['product1']['id'], pair['product2']['id']) for pair in pairs]
+
+
+def random_prices(rng, n):
+    """Prices with plenty of duplicates and float sums that round at the margin edges."""
+    choices = [round(rng.uniform(0, 10), 1) for _ in range(6)] + [0.1, 0.2, 0.3, 0.7]
+    return [rng.choice(choices) if rng.random() < 0.5 else round(rng.uniform(0, 10), 2)
+            for _ in range(n)]
+
+
+def failing_search(task):
+    """Stands in for the pool worker; module level so the pool can pickle it."""
+    raise MemoryError()
+
+
+class PartnerRangeTest(unittest.TestCase):
+    def test_range_agrees_with_the_float_sum(self):
+        """Test that the bisect bounds are corrected to the sum that is actually compared."""
+        # 0.1 + 0.2 is 0.30000000000000004, yet 0.3 - 0.1 rounds to below 0.2
+        prices = [0.1, 0.2, 0.2, 0.3]
+        self.assertEqual(partner_range(prices, 0.1, 0.3, 0.3), (1, 1))
+        self.assertEqual(partner_range(prices, 0.1, 0.3, 0.30000000000000004), (1, 3))
+        self.assertEqual(partner_range(prices, 0.1, 0.30000000000000004, 0.30000000000000004, start=2), (2, 3))
+
+    def test_edges_agree_with_the_float_sum(self):
+        """Test that the single-edge searches the index shares make the same correction."""
+        prices = [0.1, 0.2, 0.2, 0.3]
+        self.assertEqual(first_sum_at_least(prices, 0.1, 0.3), 1)
+        self.assertEqual(first_sum_above(prices, 0.1, 0.3), 1)
+        self.assertEqual(first_sum_above(prices, 0.1, 0.30000000000000004), 3)
+        self.assertEqual(first_sum_at_least(prices, 0.1, 0.30000000000000004, start=2), 2)
+
+    def test_sort_by_price_keeps_input_order_for_ties(self):
+        order, prices = sort_by_price(make_products([3, 1, 3, 1]))
+        self.assertEqual(order, [1, 3, 0, 2])
+        self.assertEqual(prices, [1, 1, 3, 3])
+
+
+class FindProductCombinationsTest(unittest.TestCase):
+    def test_empty_and_single_product(self):
+        for products in ([], make_products([5])):
+            self.assertEqual(find_product_combinations(products, 10, 5), [])
+            self.assertEqual(find_product_combinations(products, 10, 5, limit=3), [])
+            self.assertEqual(count_product_combinations(products, 10, 5), 0)
+            self.assertEqual(list(iter_product_combinations(products, 10, 5)), [])
+
+    def test_float_boundary_prices(self):
+        """Test that sums rounding just inside or outside the margin match the nested loops."""
+        products = make_products([0.1, 0.2, 0.7, 0.2, 0.1, 0.3])
+        for target_price, price_margin in ((0.3, 0), (0.4, 0.1), (0.5, 0.2), (0.9, 0)):
+            expected = brute_force_pairs(products, target_price, price_margin)
+            pairs = find_product_combinations(products, target_price, price_margin)
+            self.assertEqual(pair_ids(pairs), expected)
+            self.assertEqual(count_product_combinations(products, target_price, price_margin), len(expected))
+
+    def test_matches_nested_loops(self):
+        """Randomized check of every pair mode against the original nested loops."""
+        rng = random.Random(41)
+        for _ in range(200):
+            products = make_products(random_prices(rng, rng.randint(0, 30)))
+            target_price = round(rng.uniform(0, 20), 1)
+            price_margin = rng.choice([0, 0.1, 0.5, 2, 5])
+            expected = brute_force_pairs(products, target_price, price_margin)
+
+            pairs = find_product_combinations(products, target_price, price_margin)
+            self.assertEqual(pair_ids(pairs), expected)
+            limit = rng.randint(1, 10)
+            self.assertEqual(pair_ids(find_product_combinations(
+                products, target_price, price_margin, limit=limit)), expected[:limit])
+            self.assertEqual(pair_ids(iter_product_combinations(products, target_price, price_margin)),
+                             expected)
+            self.assertEqual(sorted(pair_ids(iter_product_combinations(
+                products, target_price, price_margin, ordered=False))), sorted(expected))
+            self.assertEqual(count_product_combinations(products, target_price, price_margin), len(expected))
+
+    def test_progress_callback(self):
+        calls = []
+        find_product_combinations(make_products(range(250)), 100, 5,
+                                  progress=lambda position, total: calls.append((position, total)))
+        self.assertEqual(calls, [(0, 250), (100, 250), (200, 250)])
+
+    @unittest.skipIf(inventory_analysis.np is None, "NumPy is not installed")
+    def test_numpy_engine_matches_python_engine(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            products = make_products(random_prices(rng, rng.randint(0, 30)))
+            expected = brute_force_pairs(products, 10, 1)
+            pairs = find_product_combinations(products, 10, 1, engine="numpy")
+            self.assertEqual(pair_ids(pairs), expected)
+
+
+class CombinedPriceHistogramTest(unittest.TestCase):
+    @unittest.skipIf(inventory_analysis.np is None, "NumPy is not installed")
+    def test_matches_numpy_histogram_of_pair_sums(self):
+        """Test edges and counts against numpy.histogram of every pair sum."""
+        np = inventory_analysis.np
+        rng = random.Random(46)
+        for _ in range(100):
+            prices = random_prices(rng, rng.randint(2, 30))
+            if rng.random() < 0.3:
+                prices = [int(price) for price in prices]
+            sums = [a + b for a, b in combinations(prices, 2)]
+            bins = rng.choice([1, 3, 7, 10, 13])
+            price_range = rng.choice([None, (0, 10), (2.5, 11.3), (4, 4)])
+            counts, edges = combined_price_histogram(make_products(prices), bins, price_range)
+            expected_counts, expected_edges = np.histogram(sums, bins, price_range)
+            self.assertEqual(edges, expected_edges.tolist())
+            self.assertEqual(counts, expected_counts.tolist())
+
+    @unittest.skipIf(inventory_analysis.np is None, "NumPy is not installed")
+    def test_explicit_edges(self):
+        np = inventory_analysis.np
+        prices = [0.1, 0.2, 0.2, 0.3, 1.5, 2.25]
+        edges = [0.0, 0.3, 0.30000000000000004, 0.5, 2.0, 3.75]
+        sums = [a + b for a, b in combinations(prices, 2)]
+        counts, _ = combined_price_histogram(make_products(prices), edges)
+        self.assertEqual(counts, np.histogram(sums, edges)[0].tolist())
+
+
+@unittest.skipIf(inventory_analysis.np is None, "NumPy is not installed")
+class FindProductPairsParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        create_segment = shared_memory.SharedMemory
+
+        def record(*args, **kwargs):
+            segment = create_segment(*args, **kwargs)
+            if kwargs.get("create"):
+                self.created.append(segment.name)
+            return segment
+
+        patcher = patch.object(shared_memory, "SharedMemory", record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_segments_released(self, searches):
+        # Each search shares its prices and their order in two segments
+        self.assertEqual(len(self.created), 2 * searches)
+        for name in self.created:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_matches_python_engine(self):
+        """Test a pool search of a small catalogue against the python engine."""
+        rng = random.Random(47)
+        products = make_products(random_prices(rng, 120))
+        expected = pair_ids(find_product_combinations(products, 10, 1, engine="python"))
+
+        pairs = find_product_pairs_parallel(products, 10, 1, workers=2, min_products=0)
+        self.assertEqual(pair_ids(pairs.to_list()), expected)
+        unsorted = find_product_pairs_parallel(products, 10, 1, workers=2, min_products=0, sort=False)
+        self.assertEqual(sorted(pair_ids(unsorted.to_list())), sorted(expected))
+        self.assert_segments_released(searches=2)
+
+    def test_segments_released_when_a_worker_fails(self):
+        products = make_products(list(range(50)))
+        with patch.object(inventory_analysis, "_search_shared_prices", failing_search):
+            with self.assertRaises(MemoryError):
+                find_product_pairs_parallel(products, 40, 5, workers=2, min_products=0)
+        self.assert_segments_released(searches=1)
+
+
+class ProductPriceIndexTest(unittest.TestCase):
+    def test_queries_match_nested_loops_through_changes(self):
+        """Test pairs, count and nearest after adds, removals and repricing."""
+        rng = random.Random(43)
+        products = make_products(random_prices(rng, 25))
+        index = ProductPriceIndex(products)
+        catalogue = list(products)
+        next_id = len(products)
+        for _ in range(60):
+            action = rng.random()
+            if action < 0.3 or not catalogue:
+                product = {'id': next_id, 'name': f'Product {next_id}', 'price': random_prices(rng, 1)[0]}
+                next_id += 1
+                index.add(product)
+                catalogue.append(product)
+            elif action < 0.5:
+                product = catalogue.pop(rng.randrange(len(catalogue)))
+                self.assertIs(index.remove(product['id']), product)
+            else:
+                product = rng.choice(catalogue)
+                index.reprice(product['id'], random_prices(rng, 1)[0])
+
+            target_price = round(rng.uniform(0, 20), 1)
+            expected = brute_force_pairs(catalogue, target_price, 1)
+            self.assertEqual(pair_ids(index.pairs(target_price, 1)), expected)
+            self.assertEqual(index.count(target_price, 1), len(expected))
+            nearest = brute_force_pairs(catalogue, target_price, float("inf"))[:5]
+            self.assertEqual(pair_ids(index.nearest(target_price, 5)), nearest)
+
+    def test_duplicate_ids_are_rejected(self):
+        index = ProductPriceIndex(make_products([1, 2]))
+        with self.assertRaises(ValueError):
+            index.add({'id': 0, 'name': 'Again', 'price': 3})
+        with self.assertRaises(KeyError):
+            index.remove(5)
+
+
+class FindProductBundlesTest(unittest.TestCase):
+    def test_small_inventories(self):
+        for size in (2, 3, 4):
+            for n in range(size):
+                self.assertEqual(find_product_bundles(make_products([1] * n), n, 10, size), [])
+
+    def test_duplicate_prices_are_bundled_once(self):
+        bundles = find_product_bundles(make_products([5, 5, 5, 5, 5]), 15, 0, size=3)
+        self.assertEqual([tuple(p['id'] for p in b['products']) for b in bundles],
+                         list(combinations(range(5), 3)))
+
+    def test_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            find_product_bundles(make_products([1, 2, 3, 4, 5]), 10, 1, size=5)
+
+    def test_matches_brute_force(self):
+        """Randomized check of the two-pointer and meet-in-the-middle searches."""
+        rng = random.Random(48)
+        for _ in range(120):
+            products = make_products(random_prices(rng, rng.randint(0, 14)))
+            for size in (2, 3, 4):
+                target_price = round(rng.uniform(0, 10 * size), 1)
+                price_margin = rng.choice([0, 0.1, 1, 3])
+                expected = brute_force_bundles(products, target_price, price_margin, size)
+                bundles = find_product_bundles(products, target_price, price_margin, size)
+                self.assertEqual([tuple(p['id'] for p in b['products']) for b in bundles], expected)
+                limited = find_product_bundles(products, target_price, price_margin, size, limit=3)
+                self.assertEqual([tuple(p['id'] for p in b['products']) for b in limited], expected[:3])
+
+
+class LiveProductPairsTest(unittest.TestCase):
+    def setUp(self):
+        self.products = make_products([10, 20, 25, 30, 40])
+        self.live = LiveProductPairs(50, 5, self.products)
+        self.deltas = []
+        self.live.subscribe(lambda added, removed: self.deltas.append((pair_ids(added), pair_ids(removed))))
+
+    def test_reprice_across_the_range_boundary(self):
+        """Test the deltas as a product moves out of the margin and back onto its edge."""
+        self.assertEqual(pair_ids(self.live.pairs()), [(0, 4), (1, 3), (1, 2), (2, 3)])
+
+        # 20 + 35.5 and 25 + 35.5 leave the range; 10 + 35.5 = 45.5 joins it
+        self.live.reprice(3, 35.5)
+        self.assertEqual(self.deltas, [([(0, 3)], [(1, 3), (2, 3)])])
+        self.assertIn((3, 0), self.live)
+        self.assertNotIn((1, 3), self.live)
+
+        # 20 + 35 = 55 is exactly on the upper edge
+        self.live.reprice(3, 35)
+        self.assertEqual(self.deltas[-1], ([(1, 3)], []))
+
+        # Moving within the range changes nothing
+        self.live.reprice(4, 42)
+        self.assertEqual(len(self.deltas), 2)
+        self.assertEqual(pair_ids(self.live.pairs()), brute_force_pairs(self.products, 50, 5))
+
+    def test_add_and_remove(self):
+        self.live.add({'id': 9, 'name': 'New', 'price': 30})
+        self.assertEqual(self.deltas, [([(1, 9), (2, 9)], [])])
+        self.live.remove(1)
+        self.assertEqual(self.deltas[-1], ([], [(1, 3), (1, 9), (1, 2)]))
+        self.assertEqual(len(self.live), 3)
+
+    def test_matches_nested_loops_through_changes(self):
+        rng = random.Random(49)
+        live = LiveProductPairs(10, 0.5)
+        catalogue = []
+        for step in range(80):
+            if rng.random() < 0.4 or not catalogue:
+                product = {'id': step, 'name': f'Product {step}', 'price': random_prices(rng, 1)[0]}
+                live.add(product)
+                catalogue.append(product)
+            elif rng.random() < 0.3:
+                live.remove(catalogue.pop(rng.randrange(len(catalogue)))['id'])
+            else:
+                live.reprice(rng.choice(catalogue)['id'], random_prices(rng, 1)[0])
+            self.assertEqual(pair_ids(live.pairs()), brute_force_pairs(catalogue, 10, 0.5))
+
+
+class BenchmarkInventoryTest(unittest.TestCase):
+    def test_tiny_run_and_baseline_comparison(self):
+        """Run the benchmark script end to end on tiny catalogues and compare a run with itself."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            argv = ["--sizes", "50", "200", "--distributions", "integer", "uniform",
+                    "--margins", "5", "--repeat", "1", "--no-memory", "--quiet"]
+            self.assertEqual(benchmark_inventory.main(argv + ["--output", output]), 0)
+            with open(output) as f:
+                report = json.load(f)
+            results = report['results']
+            self.assertEqual(len(results), 2 * 2 * len(benchmark_inventory.ENGINES))
+            for result in results:
+                if 'skipped' not in result:
+                    products = benchmark_inventory.make_catalogue(result['size'], result['distribution'])
+                    expected = count_product_combinations(products, benchmark_inventory.TARGET_PRICE, 5)
+                    expected = min(expected, 100) if result['engine'] == "nearest100" else expected
+                    self.assertEqual(result['pairs'], expected, result)
+
+            # Timings this small are noise, so only the pair counts are held to the baseline
+            self.assertEqual(benchmark_inventory.main(
+                argv + ["--baseline", output, "--tolerance", "1000"]), 0)
+
+    def test_max_pairs_skips_engines_that_list_pairs(self):
+        results = benchmark_inventory.run_benchmarks(
+            sizes=[100], distributions=["integer"], margins=[50], engines=["python", "count"],
+            repeat=1, memory=True, max_pairs=0)
+        self.assertIn('skipped', results[0])
+        self.assertGreater(results[1]['pairs'], 0)
+        self.assertIsNotNone(results[1]['peak_bytes'])
+
+    def test_compare_reports_regressions(self):
+        before = {'engine': "count", 'size': 10, 'distribution': "integer", 'margin': 5,
+                  'seconds': 1.0, 'peak_bytes': 100, 'pairs': 3}
+        after = dict(before, seconds=2.0, pairs=4)
+        reasons = [reason for _, _, reason in benchmark_inventory.compare([after], [before], 0.25)]
+        self.assertEqual(len(reasons), 2)
+        self.assertEqual(benchmark_inventory.compare([before], [before], 0.25), [])
+
+
+if __name__ == '__main__':
+    unittest.main()